@@ -0,0 +1,235 @@
+"""
+Admission control for upstream Cortex calls.
+
+UpstreamLimiter caps how many agents:run calls run at once. Callers beyond
+the cap wait in a bounded queue with a deadline. Free slots are handed out
+round-robin across A2A client ids, so one noisy client cannot starve the
+others. The cap adapts to the upstream: every 429/503 lowers it by one and
+a run of successes raises it again (AIMD), so concurrency settles at the
+account's real ceiling instead of bouncing off it. retry_delay computes
+jittered exponential backoff for 429/503 responses, honouring the server's
+Retry-After header.
+"""
+import os
+import time
+import random
+import asyncio
+import contextlib
+from collections import OrderedDict, deque
+from email.utils import parsedate_to_datetime
+
+from a2a.server.agent_execution import RequestContext
+
+
+# Upstream statuses that mean "slow down and try again"
+RETRYABLE_STATUSES = (429, 503)
+
+
+class AdmissionRejected(Exception):
+    """The wait queue is full or the queue deadline passed."""
+
+
+class UpstreamLimiter:
+    """
+    Bounded concurrency with a fair, bounded wait queue.
+
+    Waiters are kept in one FIFO per client id. When a slot frees up it is
+    handed directly to the head waiter of the next client in round-robin
+    order, so the in-flight count never drops below the cap while anyone
+    is waiting.
+
+    `limit` is the current cap: it starts at max_inflight, drops by one on
+    each throttled call (never below 1) and grows by one after `limit`
+    consecutive successes (never above max_inflight).
+    """
+
+    def __init__(self, max_inflight: int = 8, max_queue: int = 100, queue_timeout: float = 30.0):
+        """
+        Args:
+            max_inflight: Upstream calls allowed to run at once
+            max_queue: Callers allowed to wait for a slot; more are rejected
+            queue_timeout: Seconds a caller may wait before it is rejected
+        """
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.limit = max_inflight
+        self.inflight = 0
+        self.waiting = 0
+        self._queues = OrderedDict()
+        self._successes = 0
+
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    @contextlib.asynccontextmanager
+    async def slot(self, client_id: str):
+        """Hold one upstream slot for the duration of the block."""
+        await self.acquire(client_id)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, client_id: str) -> None:
+        """
+        Wait for a free slot.
+
+        Raises:
+            AdmissionRejected: The queue is full or the wait exceeded queue_timeout
+        """
+        if self.inflight < self.limit and not self.waiting:
+            self.inflight += 1
+            self.admitted += 1
+            return
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected(f"Upstream queue full ({self.waiting} waiting)")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(client_id, deque()).append(waiter)
+        self.waiting += 1
+        self.queued += 1
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await waiter
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._remove(client_id, waiter)
+            if isinstance(e, TimeoutError):
+                self.timed_out += 1
+                raise AdmissionRejected(
+                    f"No upstream slot within {self.queue_timeout:g}s"
+                ) from None
+            raise
+        finally:
+            self.wait_seconds += time.monotonic() - start
+        self.admitted += 1
+
+    def release(self) -> None:
+        """Free a slot, handing it to the next waiting client if there is one."""
+        self.inflight -= 1
+        self._wake()
+
+    def on_success(self) -> None:
+        """Record an upstream call that was not throttled."""
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_inflight:
+            self._successes = 0
+            self.limit += 1
+            self._wake()
+
+    def on_throttled(self) -> None:
+        """Record a 429/503 from upstream: run one call fewer at a time."""
+        self.throttled += 1
+        self._successes = 0
+        self.limit = max(1, self.limit - 1)
+
+    def _wake(self) -> None:
+        while self.inflight < self.limit and self._queues:
+            client_id, queue = self._queues.popitem(last=False)
+            waiter = queue.popleft()
+            if queue:
+                # Back of the line: the next slot goes to another client
+                self._queues[client_id] = queue
+            self.waiting -= 1
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+
+    def snapshot(self) -> dict:
+        """Counters for logging and metrics."""
+        return {
+            "limit": self.limit,
+            "inflight": self.inflight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "throttled": self.throttled,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+    def _remove(self, client_id: str, waiter: asyncio.Future) -> None:
+        queue = self._queues.get(client_id)
+        if queue is None:
+            return
+        with contextlib.suppress(ValueError):
+            queue.remove(waiter)
+            self.waiting -= 1
+        if not queue:
+            del self._queues[client_id]
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(attempt: int, retry_after: float | None = None,
+                base: float = 0.5, cap: float = 20.0) -> float:
+    """
+    Backoff before retry number `attempt` (0-based).
+
+    Full jitter over an exponential window, so clients that were throttled
+    together do not retry together. `cap` bounds that window only; a
+    Retry-After from the server is a floor, even above `cap`: we never
+    come back sooner than asked.
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = retry_after + delay / 4
+    return delay
+
+
+def client_id_for(context: RequestContext) -> str:
+    """
+    A2A client id used for fair scheduling.
+
+    The authenticated user name when there is one, else the X-Client-Id
+    header, else a shared "anonymous" bucket.
+    """
+    call_context = getattr(context, "call_context", None)
+    if call_context is None:
+        return "anonymous"
+    user = call_context.user
+    if user.is_authenticated and user.user_name:
+        return user.user_name
+    headers = call_context.state.get("headers") or {}
+    return headers.get("x-client-id") or "anonymous"
+
+
+def build_limiter() -> UpstreamLimiter:
+    """
+    Create the upstream limiter from the environment.
+
+    Limits apply per worker process.
+
+    Environment:
+        UPSTREAM_MAX_INFLIGHT: Concurrent Cortex calls (default 8)
+        UPSTREAM_QUEUE_SIZE: Requests allowed to wait for a slot (default 100)
+        UPSTREAM_QUEUE_TIMEOUT_SECONDS: Longest wait for a slot (default 30)
+    """
+    return UpstreamLimiter(
+        max_inflight=int(os.getenv("UPSTREAM_MAX_INFLIGHT", "8")),
+        max_queue=int(os.getenv("UPSTREAM_QUEUE_SIZE", "100")),
+        queue_timeout=float(os.getenv("UPSTREAM_QUEUE_TIMEOUT_SECONDS", "30"))
+    )
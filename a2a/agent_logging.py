@@ -0,0 +1,166 @@
+"""
+Structured, non-blocking logging for the Snowflake Cortex A2A Agent.
+
+Log calls on the event loop only put a record on a bounded in-memory queue;
+a background QueueListener thread formats it (JSON by default) and writes
+it to stdout. A slow or blocked stdout (container log drivers, pipes)
+therefore never stalls a task. High-volume DEBUG lines are sampled and the
+user's query text is redacted unless explicitly allowed.
+
+Usage:
+    from agent_logging import get_logger
+    log = get_logger("executor")
+    log.info("📥 Received query", extra={"task_id": task_id, "query": text})
+"""
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import hashlib
+import logging
+import logging.handlers
+from datetime import datetime, timezone
+
+
+# Root of the agent's logger hierarchy
+ROOT_LOGGER = "cortex_a2a"
+
+# Attributes every LogRecord has; anything else came from `extra=`
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+# Fields that may contain user text
+REDACTED_FIELDS = ("query",)
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg and any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development, with `extra` fields as key=value."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = f"{self.formatTime(record, '%H:%M:%S')} {record.levelname:<7} {record.getMessage()}"
+        extras = [f"{key}={value}" for key, value in vars(record).items()
+                  if key not in _RECORD_FIELDS and not key.startswith("_")]
+        if extras:
+            line += "  " + " ".join(extras)
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class RedactFilter(logging.Filter):
+    """Replace user text fields with their length and a short hash."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for field in REDACTED_FIELDS:
+            value = getattr(record, field, None)
+            if isinstance(value, str):
+                digest = hashlib.sha256(value.encode("utf-8")).hexdigest()[:12]
+                setattr(record, field, f"<redacted {len(value)} chars sha256:{digest}>")
+        return True
+
+
+class SampleFilter(logging.Filter):
+    """Keep a fraction of DEBUG records; INFO and above always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or random.random() < self.rate
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full."""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Defer formatting to the writer thread; only merge args so the
+        # record no longer references caller objects
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def get_logger(name: str) -> logging.Logger:
+    """A logger under the agent's hierarchy, e.g. get_logger("executor")."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def setup_logging() -> logging.Logger:
+    """
+    Configure the agent's loggers from the environment (idempotent).
+
+    Environment:
+        LOG_LEVEL: Minimum level (default INFO)
+        LOG_FORMAT: `json` or `text` (default json)
+        LOG_ASYNC: Write from a background thread (default true); false writes inline
+        LOG_QUEUE_SIZE: Records buffered before new ones are dropped (default 10000)
+        LOG_DEBUG_SAMPLE_RATE: Fraction of DEBUG records kept (default 0.1)
+        LOG_QUERY_TEXT: Log user query text verbatim instead of redacting it (default false)
+    """
+    global _listener
+    root = logging.getLogger(ROOT_LOGGER)
+    if getattr(root, "_configured", False):
+        return root
+
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    root.propagate = False
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(TextFormatter() if os.getenv("LOG_FORMAT", "json").lower() == "text" else JsonFormatter())
+
+    if os.getenv("LOG_ASYNC", "true").lower() in ("1", "true", "yes"):
+        handler = DroppingQueueHandler(queue.Queue(int(os.getenv("LOG_QUEUE_SIZE", "10000"))))
+        _listener = logging.handlers.QueueListener(handler.queue, output)
+        _listener.start()
+        atexit.register(shutdown_logging)
+    else:
+        handler = output
+
+    handler.addFilter(SampleFilter(float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))))
+    if os.getenv("LOG_QUERY_TEXT", "false").lower() not in ("1", "true", "yes"):
+        handler.addFilter(RedactFilter())
+    root.addHandler(handler)
+    root._configured = True
+    return root
+
+
+def shutdown_logging() -> None:
+    """Flush queued records, stop the writer thread and detach the handlers."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    root = logging.getLogger(ROOT_LOGGER)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root._configured = False
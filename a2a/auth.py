@@ -1,66 +1,58 @@
 """
 Authentication module for Snowflake Cortex A2A Agent.
 Handles JWT generation using Key-Pair authentication.
+
+Key loading, fingerprinting and signing live in snowflake_client.auth,
+shared with the test scripts; this module adds the agent's tracing and
+logging around token refreshes.
 """
 import time
-import base64
-import jwt
-from cryptography.hazmat.primitives import serialization, hashes
+
+from snowflake_client.auth import TokenProvider, load_private_key, public_key_fingerprint, sign_jwt
+
+from agent_logging import get_logger
+from tracing import tracer
+
+log = get_logger("auth")
+
+__all__ = ["generate_snowflake_jwt", "SnowflakeTokenProvider"]
 
 
 def generate_snowflake_jwt(account: str, user: str, private_key_path: str) -> str:
     """
     Generates a secure, short-lived JWT for Snowflake API access.
-    
+
     The JWT issuer includes the public key fingerprint as required by Snowflake.
-    
+    Loads and fingerprints the key on every call; long-running services
+    should use SnowflakeTokenProvider instead.
+
     Args:
         account: Snowflake account locator (e.g., ABC12345)
         user: Snowflake username
         private_key_path: Path to the RSA private key file (.p8)
-    
+
     Returns:
         A signed JWT token string
-    
+
     Raises:
         ValueError: If private key file is not found
     """
-    
-    # Load Private Key
-    try:
-        with open(private_key_path, "rb") as key_file:
-            private_key = serialization.load_pem_private_key(
-                key_file.read(), 
-                password=None  # Add password here if your key is encrypted
-            )
-    except FileNotFoundError:
-        raise ValueError(f"Private Key not found at {private_key_path}")
+    private_key = load_private_key(private_key_path)
+    return sign_jwt(account, user, private_key, public_key_fingerprint(private_key), int(time.time()))
+
+
+class SnowflakeTokenProvider(TokenProvider):
+    """
+    Hands out a cached Snowflake JWT and refreshes it ahead of expiry.
 
-    # Compute public key fingerprint (SHA256)
-    public_key = private_key.public_key()
-    public_key_der = public_key.public_bytes(
-        encoding=serialization.Encoding.DER,
-        format=serialization.PublicFormat.SubjectPublicKeyInfo
-    )
-    
-    digest = hashes.Hash(hashes.SHA256())
-    digest.update(public_key_der)
-    fingerprint = base64.b64encode(digest.finalize()).decode('utf-8')
+    The shared snowflake_client TokenProvider, with each signature traced as a
+    `generate_snowflake_jwt` span and logged.
+    """
 
-    # Generate JWT claims
-    # Use uppercase for Account/User to avoid common 403 errors
-    qualified_name = f"{account.upper()}.{user.upper()}"
-    
-    # Snowflake requires the fingerprint in the issuer claim
-    issuer_with_fingerprint = f"{qualified_name}.SHA256:{fingerprint}"
-    
-    payload = {
-        "iss": issuer_with_fingerprint,
-        "sub": qualified_name,
-        "iat": int(time.time()),
-        "exp": int(time.time()) + 3600  # 1 hour expiration
-    }
-    
-    # Sign Token
-    token = jwt.encode(payload, private_key, algorithm="RS256")
-    return token
+    def _sign(self, issued_at: int) -> str:
+        with tracer.span("generate_snowflake_jwt", attributes={"key_loaded": self._private_key is not None}):
+            token = super()._sign(issued_at)
+        log.info("🔑 Signed Snowflake JWT", extra={
+            "refresh_count": self.refresh_count + 1, "lifetime_s": self.lifetime
+        })
+        return token
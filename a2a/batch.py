@@ -0,0 +1,92 @@
+"""
+Batch questions for the Snowflake Cortex A2A Agent.
+
+A message is a batch when it carries more than one text part, a data part
+with a `questions` list, a single text part holding a JSON list of
+questions, or `"skill": "batch_query_cortex_agent"` in its metadata. Each
+question is answered by its own Cortex call; the executor runs them
+concurrently under BatchPolicy.max_concurrency and returns one answer per
+question.
+"""
+import os
+import json
+from dataclasses import dataclass
+
+from a2a.types import DataPart, Message, TextPart
+
+
+BATCH_SKILL_ID = "batch_query_cortex_agent"
+
+
+@dataclass
+class BatchPolicy:
+    """
+    Limits for batch messages.
+
+    Attributes:
+        max_concurrency: Questions of one batch asked at the same time
+        max_questions: Largest batch accepted; bigger ones are rejected
+    """
+    max_concurrency: int = 5
+    max_questions: int = 50
+
+    @classmethod
+    def from_env(cls) -> "BatchPolicy":
+        """Build a policy from BATCH_* environment variables."""
+        return cls(
+            max_concurrency=int(os.getenv("BATCH_MAX_CONCURRENCY", "5")),
+            max_questions=int(os.getenv("BATCH_MAX_QUESTIONS", "50"))
+        )
+
+
+def _json_questions(text: str) -> list[str] | None:
+    """The questions in a JSON list of strings, or None if `text` is not one."""
+    text = text.strip()
+    if not text.startswith("["):
+        return None
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(value, list) and value and all(isinstance(item, str) for item in value):
+        return value
+    return None
+
+
+def extract_questions(message: Message | None) -> tuple[list[str], bool]:
+    """
+    Collect the questions in an incoming message.
+
+    Args:
+        message: The A2A message of the task
+
+    Returns:
+        (questions, is_batch): every non-empty question in order, and whether
+        the message should be answered as a batch
+    """
+    if message is None or not message.parts:
+        return [], False
+
+    texts = []
+    questions = []
+    from_list = False
+    for part in message.parts:
+        # A2A SDK wraps parts in a Part container with a 'root' attribute
+        actual_part = getattr(part, 'root', part)
+        if isinstance(actual_part, DataPart):
+            listed = actual_part.data.get("questions")
+            if isinstance(listed, list):
+                questions.extend(str(item) for item in listed)
+                from_list = True
+        elif isinstance(actual_part, TextPart) or hasattr(actual_part, 'text'):
+            texts.append(actual_part.text)
+
+    if len(texts) == 1 and not questions:
+        listed = _json_questions(texts[0])
+        if listed is not None:
+            texts = listed
+            from_list = True
+    questions = [question.strip() for question in texts + questions if question and question.strip()]
+
+    requested = (message.metadata or {}).get("skill") == BATCH_SKILL_ID
+    return questions, from_list or requested or len(questions) > 1
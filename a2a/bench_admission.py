@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Admission control benchmark for the Snowflake Cortex A2A Agent.
+
+Starts the local Cortex stand-in (cortex_stub.py) with a hard concurrency
+ceiling: calls above it get `429 Too Many Requests` with a Retry-After
+header, like a throttled Snowflake account. One noisy client floods the agent while a few quiet
+clients send occasional questions, first with admission control disabled
+(no cap, no retries), then with UPSTREAM_MAX_INFLIGHT at the ceiling.
+
+Without the limiter most of the flood fails; with it every task should
+complete, throughput should sit at the upstream ceiling and quiet clients
+should not wait behind the whole flood.
+
+Usage:
+    python bench_admission.py [--ceiling N] [--requests N] [--delay SECONDS]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+import httpx
+
+from bench_concurrency import free_port, start_server, write_temp_key
+from cortex_stub import StubConfig, build_stub_app
+
+
+async def ask(client: httpx.AsyncClient, url: str, client_id: str, query: str) -> tuple[str, float]:
+    """Send one message/send request and return (final state, latency)."""
+    payload = {
+        "jsonrpc": "2.0", "method": "message/send", "id": str(uuid.uuid4()),
+        "params": {"message": {"messageId": str(uuid.uuid4()), "role": "user",
+                               "parts": [{"kind": "text", "text": query}]}}
+    }
+    start = time.perf_counter()
+    response = await client.post(url, json=payload, headers={"X-Client-Id": client_id})
+    latency = time.perf_counter() - start
+    body = response.json()
+    if "error" in body:
+        return "failed", latency
+    result = body["result"]
+    state = result.get("status", {}).get("state") if result.get("kind") == "task" else "completed"
+    return state or "error", latency
+
+
+async def run_round(url: str, requests: int, quiet_clients: int) -> None:
+    async with httpx.AsyncClient(timeout=300.0) as client:
+        start = time.perf_counter()
+        flood = [ask(client, url, "noisy", f"incident {i}") for i in range(requests)]
+        quiet = []
+        for n in range(quiet_clients):
+            async def later(n=n):
+                await asyncio.sleep(0.2)
+                return await ask(client, url, f"quiet-{n}", f"status check {n}")
+            quiet.append(later())
+        results = await asyncio.gather(*flood, *quiet)
+        wall = time.perf_counter() - start
+
+    flood_results = results[:requests]
+    quiet_results = results[requests:]
+    completed = sum(1 for state, _ in flood_results if state == "completed")
+    print(f"   Flood: {completed}/{requests} completed in {wall:.2f}s "
+          f"({completed / wall:.1f} answers/s)")
+    if quiet_results:
+        worst = max(latency for _, latency in quiet_results)
+        states = {state for state, _ in quiet_results}
+        print(f"   Quiet clients: {', '.join(sorted(states))}, worst latency {worst:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark upstream admission control")
+    parser.add_argument("--ceiling", type=int, default=4, help="Concurrent calls the stub accepts")
+    parser.add_argument("--requests", type=int, default=40, help="Requests sent by the noisy client")
+    parser.add_argument("--quiet", type=int, default=3, help="Quiet clients sending one question each")
+    parser.add_argument("--inflight", type=int, help="UPSTREAM_MAX_INFLIGHT (default: the ceiling); "
+                        "set it higher to exercise 429 retries")
+    parser.add_argument("--delay", type=float, default=0.5, help="Stub Cortex answer latency in seconds")
+    args = parser.parse_args()
+    inflight = args.inflight or args.ceiling
+
+    cortex_port = free_port()
+    key_path = write_temp_key()
+    os.environ.update({
+        "SNOWFLAKE_API_BASE_URL": f"http://127.0.0.1:{cortex_port}",
+        "SNOWFLAKE_ACCOUNT_LOCATOR": "BENCH",
+        "SNOWFLAKE_ACCOUNT": "bench",
+        "SNOWFLAKE_USER": "BENCH_USER",
+        "PRIVATE_KEY_PATH": key_path,
+        "AGENT_DATABASE": "BENCH_DB",
+        "AGENT_SCHEMA": "BENCH_SCHEMA",
+        "AGENT_NAME": "BENCH_AGENT",
+        "TASK_STORE_PATH": os.path.join(tempfile.mkdtemp(), "tasks.db"),
+        "UPSTREAM_QUEUE_TIMEOUT_SECONDS": "120",
+    })
+
+    # Import after the environment is configured: main builds the app at import
+    import main as a2a_main
+
+    print("\n🚦 A2A Admission Control Benchmark")
+    print(f"   Stub ceiling: {args.ceiling} concurrent, latency: {args.delay}s, "
+          f"flood: {args.requests} requests + {args.quiet} quiet clients")
+    print("=" * 60)
+
+    rounds = [
+        ("No admission control", {"UPSTREAM_MAX_INFLIGHT": "100000", "UPSTREAM_RETRY_ATTEMPTS": "0"}),
+        (f"Limiter at {inflight} + retries", {"UPSTREAM_MAX_INFLIGHT": str(inflight),
+                                               "UPSTREAM_RETRY_ATTEMPTS": "3"}),
+    ]
+    try:
+        stub = StubConfig(latency=args.delay, token_rate=0, max_concurrency=args.ceiling, retry_after=1)
+        start_server(build_stub_app(stub), cortex_port)
+        for label, env in rounds:
+            os.environ.update(env)
+            app = a2a_main.create_app()
+            port = free_port()
+            start_server(app, port)
+            print(f"\n   {label}")
+            asyncio.run(run_round(f"http://127.0.0.1:{port}/", args.requests, args.quiet))
+            executor = app.state.executor
+            print(f"   Limiter: {executor.limiter.snapshot()}, retries: {executor.retries}")
+    finally:
+        os.remove(key_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for Snowflake JWT generation.
+
+Compares the per-call cost of generate_snowflake_jwt (reads the .p8 file,
+parses the PEM, fingerprints and signs on every call) with the cached
+SnowflakeTokenProvider, and checks that a burst of concurrent callers on a
+cold provider triggers exactly one refresh.
+
+Usage:
+    python bench_auth.py [--iterations N] [--burst N]
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from auth import SnowflakeTokenProvider, generate_snowflake_jwt
+from bench_concurrency import write_temp_key
+
+
+def per_call_ms(fn, iterations: int) -> float:
+    """Average wall time of `fn()` in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Snowflake JWT generation")
+    parser.add_argument("--iterations", type=int, default=50, help="Calls per measurement")
+    parser.add_argument("--burst", type=int, default=64, help="Concurrent callers on a cold provider")
+    args = parser.parse_args()
+
+    key_path = write_temp_key()
+    try:
+        print("\n🔐 Snowflake JWT Benchmark")
+        print("=" * 60)
+
+        uncached = per_call_ms(
+            lambda: generate_snowflake_jwt("BENCH", "BENCH_USER", key_path), args.iterations
+        )
+        print(f"   generate_snowflake_jwt:        {uncached:10.4f} ms/call")
+
+        provider = SnowflakeTokenProvider("BENCH", "BENCH_USER", key_path)
+        start = time.perf_counter()
+        provider.get_token()
+        cold = (time.perf_counter() - start) * 1000
+        print(f"   SnowflakeTokenProvider (cold): {cold:10.4f} ms")
+
+        cached = per_call_ms(provider.get_token, args.iterations * 1000)
+        print(f"   SnowflakeTokenProvider (warm): {cached:10.4f} ms/call")
+        print(f"   Speedup: {uncached / cached:,.0f}x")
+
+        # A burst against a cold provider must sign only once
+        provider = SnowflakeTokenProvider("BENCH", "BENCH_USER", key_path)
+        barrier = threading.Barrier(args.burst)
+        tokens = []
+
+        def caller():
+            barrier.wait()
+            tokens.append(provider.get_token())
+
+        threads = [threading.Thread(target=caller) for _ in range(args.burst)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        print(f"   Burst of {args.burst} callers: {provider.refresh_count} refresh, "
+              f"{len(set(tokens))} distinct token")
+    finally:
+        os.remove(key_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Batch skill benchmark for the Snowflake Cortex A2A Agent.
+
+Starts a local Cortex stand-in whose answer latency varies per question
+(uniform between --delay/2 and --delay) plus the A2A server, then sends N
+questions in one message/stream message and records when each answer
+artifact arrives. With fan-out the batch should take about as long as its
+slowest question, not the sum of all of them. Also checks that message/send
+with a JSON list returns one answer per question, in order.
+
+Usage:
+    python bench_batch.py [--questions N] [--delay SECONDS] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+from bench_concurrency import free_port, start_server, write_temp_key
+
+upstream_latencies = []
+
+
+def build_varied_cortex(delay: float) -> Starlette:
+    """agents:run stand-in that answers each question after a random delay."""
+
+    async def run_agent(request):
+        question = (await request.json())["messages"][0]["content"][0]["text"]
+        latency = random.uniform(delay / 2, delay)
+        upstream_latencies.append(latency)
+
+        async def events():
+            await asyncio.sleep(latency)
+            data = json.dumps({"text": f"Answer to: {question}"})
+            yield f"event: response.text.delta\ndata: {data}\n\n"
+            yield "event: done\ndata: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return Starlette(routes=[Route("/api/v2/databases/{db}/schemas/{schema}/agents/{name}:run", run_agent, methods=["POST"])])
+
+
+def message(parts: list[dict]) -> dict:
+    return {"messageId": str(uuid.uuid4()), "role": "user", "parts": parts}
+
+
+async def stream_batch(client: httpx.AsyncClient, url: str, questions: list[str]) -> tuple[list[float], float, str]:
+    """Send the questions as text parts via message/stream; return artifact arrival times."""
+    payload = {
+        "jsonrpc": "2.0", "method": "message/stream", "id": str(uuid.uuid4()),
+        "params": {"message": message([{"kind": "text", "text": q} for q in questions])}
+    }
+    arrivals = []
+    final_state = None
+    start = time.perf_counter()
+    async with client.stream("POST", url, json=payload) as response:
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            result = json.loads(line[5:]).get("result", {})
+            if result.get("kind") == "artifact-update":
+                arrivals.append(time.perf_counter() - start)
+            if result.get("final"):
+                final_state = result.get("status", {}).get("state")
+    return arrivals, time.perf_counter() - start, final_state
+
+
+async def send_batch(client: httpx.AsyncClient, url: str, questions: list[str]) -> list[str]:
+    """Send the questions as one JSON list via message/send; return the answers."""
+    payload = {
+        "jsonrpc": "2.0", "method": "message/send", "id": str(uuid.uuid4()),
+        "params": {"message": message([{"kind": "text", "text": json.dumps(questions)}])}
+    }
+    response = await client.post(url, json=payload)
+    response.raise_for_status()
+    return [part["text"] for part in response.json()["result"]["parts"]]
+
+
+async def run_benchmark(url: str, count: int) -> bool:
+    questions = [f"Question {i}: status of site {i}" for i in range(count)]
+    async with httpx.AsyncClient(timeout=120.0) as client:
+        arrivals, wall, state = await stream_batch(client, url, questions)
+        streamed_upstream = list(upstream_latencies)
+        answers = await send_batch(client, url, [f"Ordered {i}" for i in range(count)])
+
+    print(f"   Sum of upstream latencies: {sum(streamed_upstream) * 1000:8.1f} ms (sequential)")
+    print(f"   Slowest question:          {max(streamed_upstream) * 1000:8.1f} ms")
+    print(f"   Batch wall time:           {wall * 1000:8.1f} ms, final state: {state}")
+    print(f"   Artifacts: {len(arrivals)}/{count}, first after {arrivals[0] * 1000:.1f} ms, "
+          f"last after {arrivals[-1] * 1000:.1f} ms")
+
+    ordered = answers == [f"Answer to: Ordered {i}" for i in range(count)]
+    print(f"   message/send answers in order: {'✅' if ordered else '❌'} ({len(answers)} parts)")
+    return ordered and len(arrivals) == count and state == "completed"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batch (multi-question) skill")
+    parser.add_argument("--questions", type=int, default=10, help="Questions per batch")
+    parser.add_argument("--delay", type=float, default=1.0, help="Slowest stub Cortex latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=10, help="BATCH_MAX_CONCURRENCY")
+    args = parser.parse_args()
+
+    cortex_port = free_port()
+    a2a_port = free_port()
+    key_path = write_temp_key()
+
+    os.environ.update({
+        "SNOWFLAKE_API_BASE_URL": f"http://127.0.0.1:{cortex_port}",
+        "SNOWFLAKE_ACCOUNT_LOCATOR": "BENCH",
+        "SNOWFLAKE_ACCOUNT": "bench",
+        "SNOWFLAKE_USER": "BENCH_USER",
+        "PRIVATE_KEY_PATH": key_path,
+        "AGENT_DATABASE": "BENCH_DB",
+        "AGENT_SCHEMA": "BENCH_SCHEMA",
+        "AGENT_NAME": "BENCH_AGENT",
+        "TASK_STORE_PATH": os.path.join(tempfile.mkdtemp(), "tasks.db"),
+        "BATCH_MAX_CONCURRENCY": str(args.concurrency),
+        "UPSTREAM_MAX_INFLIGHT": str(max(args.concurrency, 8)),
+        "LOG_LEVEL": "WARNING",
+    })
+
+    # Import after the environment is configured: main builds the app at import
+    import main as a2a_main
+
+    print("\n📦 A2A Batch Skill Benchmark")
+    print(f"   {args.questions} questions, stub latency {args.delay / 2:g}-{args.delay:g}s, "
+          f"batch concurrency {args.concurrency}")
+    print("=" * 60)
+
+    try:
+        start_server(build_varied_cortex(args.delay), cortex_port)
+        start_server(a2a_main.app, a2a_port)
+        ok = asyncio.run(run_benchmark(f"http://127.0.0.1:{a2a_port}/", args.questions))
+    finally:
+        os.remove(key_path)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Answer cache benchmark for the Snowflake Cortex A2A Agent.
+
+Runs the A2A server with RESPONSE_CACHE_ENABLED against a local Cortex
+stand-in (cortex_stub.py), which counts agents:run calls, then:
+  1. sends N concurrent copies of one question (varying only case and
+     punctuation) and checks they cost a single upstream call;
+  2. repeats the question and compares hit latency with the miss;
+  3. sends a different freshness hint and checks it bypasses the entry;
+  4. makes every Cortex stream end with an `error` event and checks that
+     message/send and message/stream tasks fail and nothing is cached.
+
+Usage:
+    python bench_cache.py [--concurrency N] [--delay SECONDS] [--disk]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+
+import httpx
+
+from bench_concurrency import free_port, start_server, write_temp_key
+from cortex_stub import StubConfig, build_stub_app
+
+async def ask(client: httpx.AsyncClient, url: str, query: str, freshness: str | None = None) -> float:
+    """Send one message/send request and return its latency in seconds."""
+    message = {
+        "messageId": str(uuid.uuid4()),
+        "role": "user",
+        "parts": [{"kind": "text", "text": query}]
+    }
+    if freshness is not None:
+        message["metadata"] = {"freshness": freshness}
+    payload = {"jsonrpc": "2.0", "method": "message/send", "id": str(uuid.uuid4()),
+               "params": {"message": message}}
+    start = time.perf_counter()
+    response = await client.post(url, json=payload)
+    response.raise_for_status()
+    if "error" in response.json():
+        raise RuntimeError(response.json()["error"])
+    return time.perf_counter() - start
+
+
+async def final_state(client: httpx.AsyncClient, url: str, query: str, method: str) -> str:
+    """Send one message/send or message/stream request and return the task's final state."""
+    payload = {"jsonrpc": "2.0", "method": method, "id": str(uuid.uuid4()),
+               "params": {"message": {"messageId": str(uuid.uuid4()), "role": "user",
+                                      "parts": [{"kind": "text", "text": query}]}}}
+    if method == "message/send":
+        response = await client.post(url, json=payload)
+        body = response.json()
+        result = body["result"]
+        # A completed task replies with the agent's Message
+        return result.get("status", {}).get("state", "completed")
+    state = None
+    async with client.stream("POST", url, json=payload) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("data:"):
+                result = json.loads(line[5:])["result"]
+                if result.get("kind") == "status-update":
+                    state = result["status"]["state"]
+    return state
+
+
+async def run_benchmark(url: str, concurrency: int, stub) -> None:
+    stub_stats = stub.state.stats
+    variants = ["What data do you have access to?", "what data do you have access to",
+                "WHAT DATA DO YOU HAVE ACCESS TO ?", "What  data do you have access to!"]
+
+    async with httpx.AsyncClient(timeout=120.0) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            ask(client, url, variants[i % len(variants)]) for i in range(concurrency)
+        ])
+        wall = time.perf_counter() - start
+        print(f"   {concurrency} concurrent identical questions: {wall * 1000:8.1f} ms, "
+              f"{stub_stats.agent_runs} upstream call(s)")
+
+        hits = [await ask(client, url, variants[0]) for _ in range(20)]
+        print(f"   Cache hit latency (median of 20): {sorted(hits)[10] * 1000:8.1f} ms")
+
+        before = stub_stats.agent_runs
+        miss = await ask(client, url, variants[0], freshness="2026-10-17T06:00")
+        print(f"   New freshness hint: {miss * 1000:8.1f} ms, "
+              f"{stub_stats.agent_runs - before} upstream call(s)")
+
+        # Cortex `error` events mid-stream: the partial answer must not be cached
+        stub.state.config.stream_error_rate = 1.0
+        question = "Which cells are degraded?"
+        before = stub_stats.agent_runs
+        states = [await final_state(client, url, question, method)
+                  for method in ("message/send", "message/stream")]
+        stub.state.config.stream_error_rate = 0.0
+        recovered = await final_state(client, url, question, "message/send")
+        print(f"   Stream error event: send/stream tasks {states[0]}/{states[1]}, "
+              f"then {recovered} after {stub_stats.agent_runs - before} upstream call(s) (expect failed/failed, completed, 3)")
+        if states != ["failed", "failed"] or recovered != "completed" or stub_stats.agent_runs - before != 3:
+            raise SystemExit("❌ A Cortex error event did not fail the task, or its answer was cached")
+
+        stats = (await client.get(f"{url}cache/stats")).json()
+        print(f"   Counters: {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Cortex answer cache")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent identical questions")
+    parser.add_argument("--delay", type=float, default=1.0, help="Stub Cortex answer latency in seconds")
+    parser.add_argument("--disk", action="store_true", help="Enable the on-disk tier")
+    args = parser.parse_args()
+
+    cortex_port = free_port()
+    a2a_port = free_port()
+    key_path = write_temp_key()
+    tmp_dir = tempfile.mkdtemp()
+
+    os.environ.update({
+        "SNOWFLAKE_API_BASE_URL": f"http://127.0.0.1:{cortex_port}",
+        "SNOWFLAKE_ACCOUNT_LOCATOR": "BENCH",
+        "SNOWFLAKE_ACCOUNT": "bench",
+        "SNOWFLAKE_USER": "BENCH_USER",
+        "PRIVATE_KEY_PATH": key_path,
+        "AGENT_DATABASE": "BENCH_DB",
+        "AGENT_SCHEMA": "BENCH_SCHEMA",
+        "AGENT_NAME": "BENCH_AGENT",
+        "TASK_STORE_PATH": os.path.join(tmp_dir, "tasks.db"),
+        "RESPONSE_CACHE_ENABLED": "true",
+    })
+    if args.disk:
+        os.environ["RESPONSE_CACHE_PATH"] = os.path.join(tmp_dir, "responses.db")
+
+    # Import after the environment is configured: main builds the app at import
+    import main as a2a_main
+
+    print("\n⚡ A2A Answer Cache Benchmark")
+    print(f"   Stub Cortex latency: {args.delay}s, disk tier: {'on' if args.disk else 'off'}")
+    print("=" * 60)
+
+    try:
+        stub = build_stub_app(StubConfig(latency=args.delay, token_rate=0))
+        start_server(stub, cortex_port)
+        start_server(a2a_main.app, a2a_port)
+        asyncio.run(run_benchmark(f"http://127.0.0.1:{a2a_port}/", args.concurrency, stub))
+    finally:
+        os.remove(key_path)
+
+
+if __name__ == "__main__":
+    main()
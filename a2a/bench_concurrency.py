@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for the Snowflake Cortex A2A Agent.
+
+Starts the local Cortex stand-in (cortex_stub.py) with a fixed answer
+latency plus the A2A server, pointed at it, then compares one message/send
+round trip with N concurrent ones. With a non-blocking executor the concurrent batch should
+finish in roughly the time of a single call.
+
+Usage:
+    python bench_concurrency.py [--concurrency N] [--delay SECONDS]
+
+Examples:
+    python bench_concurrency.py
+    python bench_concurrency.py --concurrency 20 --delay 2
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+
+import httpx
+import uvicorn
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from cortex_stub import StubConfig, build_stub_app
+
+
+def free_port() -> int:
+    """Ask the OS for an unused local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def write_temp_key() -> str:
+    """Write a throwaway RSA key so the executor can sign JWTs."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+    fd, path = tempfile.mkstemp(suffix=".p8")
+    with os.fdopen(fd, "wb") as f:
+        f.write(pem)
+    return path
+
+
+def start_server(app, port: int) -> uvicorn.Server:
+    """Run a uvicorn server in a daemon thread and wait until it is up."""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def send_message(client: httpx.AsyncClient, url: str, query: str) -> float:
+    """Send one message/send request and return its latency in seconds."""
+    payload = {
+        "jsonrpc": "2.0",
+        "method": "message/send",
+        "id": str(uuid.uuid4()),
+        "params": {
+            "message": {
+                "messageId": str(uuid.uuid4()),
+                "role": "user",
+                "parts": [{"kind": "text", "text": query}]
+            }
+        }
+    }
+    start = time.perf_counter()
+    response = await client.post(url, json=payload)
+    response.raise_for_status()
+    body = response.json()
+    if "error" in body:
+        raise RuntimeError(body["error"])
+    return time.perf_counter() - start
+
+
+async def run_benchmark(a2a_url: str, concurrency: int) -> None:
+    async with httpx.AsyncClient(timeout=120.0) as client:
+        single = await send_message(client, a2a_url, "warm-up")
+        single = await send_message(client, a2a_url, "single")
+        print(f"   1 request:   {single * 1000:8.1f} ms")
+
+        # Discovery must stay responsive while the batch is in flight
+        start = time.perf_counter()
+        batch = asyncio.gather(*[
+            send_message(client, a2a_url, f"question {i}") for i in range(concurrency)
+        ])
+        await asyncio.sleep(0.1)
+        card_start = time.perf_counter()
+        (await client.get(f"{a2a_url}.well-known/agent.json")).raise_for_status()
+        card_latency = time.perf_counter() - card_start
+        latencies = await batch
+        wall = time.perf_counter() - start
+
+        print(f"   {concurrency} requests: {wall * 1000:8.1f} ms wall "
+              f"(max {max(latencies) * 1000:.1f} ms per request)")
+        print(f"   Agent card during load: {card_latency * 1000:.1f} ms")
+        print(f"   Wall time / single: {wall / single:.2f}x "
+              f"(serialized would be ~{concurrency}x)")
+
+
+def print_pool_stats(stats: dict) -> None:
+    print(f"   Upstream pool: {stats['checkouts']} checkouts, "
+          f"{stats['new_connections']} new connections, {stats['reused']} reused")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent A2A message/send calls")
+    parser.add_argument("--concurrency", type=int, default=10, help="Number of concurrent requests")
+    parser.add_argument("--delay", type=float, default=1.0, help="Stub Cortex answer latency in seconds")
+    args = parser.parse_args()
+
+    cortex_port = free_port()
+    a2a_port = free_port()
+    key_path = write_temp_key()
+
+    os.environ.update({
+        "SNOWFLAKE_API_BASE_URL": f"http://127.0.0.1:{cortex_port}",
+        "SNOWFLAKE_ACCOUNT_LOCATOR": "BENCH",
+        "SNOWFLAKE_ACCOUNT": "bench",
+        "SNOWFLAKE_USER": "BENCH_USER",
+        "PRIVATE_KEY_PATH": key_path,
+        "AGENT_DATABASE": "BENCH_DB",
+        "AGENT_SCHEMA": "BENCH_SCHEMA",
+        "AGENT_NAME": "BENCH_AGENT",
+        "TASK_STORE_PATH": os.path.join(tempfile.mkdtemp(), "tasks.db"),
+        # Measure the event loop, not the admission cap
+        "UPSTREAM_MAX_INFLIGHT": str(max(args.concurrency, 8)),
+    })
+
+    # Import after the environment is configured: main builds the app at import
+    import main as a2a_main
+
+    print("\n🔷 A2A Concurrency Benchmark")
+    print(f"   Stub Cortex latency: {args.delay}s, concurrency: {args.concurrency}")
+    print("=" * 60)
+
+    try:
+        start_server(build_stub_app(StubConfig(latency=args.delay, token_rate=0)), cortex_port)
+        start_server(a2a_main.app, a2a_port)
+        asyncio.run(run_benchmark(f"http://127.0.0.1:{a2a_port}/", args.concurrency))
+        print_pool_stats(a2a_main.app.state.executor.pool_stats.snapshot())
+    finally:
+        os.remove(key_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Logging benchmark for the Snowflake Cortex A2A Agent.
+
+Runs the A2A server against the local Cortex stand-in while stdout is
+a deliberately slow pipe (every write sleeps, like a backed-up container
+log driver), and compares task latency percentiles with inline logging
+(LOG_ASYNC=false, which blocks the event loop exactly like print() did)
+and with the queued logging pipeline (LOG_ASYNC=true).
+
+Usage:
+    python bench_logging.py [--requests N] [--concurrency N] [--write-ms MS]
+
+Examples:
+    python bench_logging.py
+    python bench_logging.py --requests 200 --concurrency 50 --write-ms 10
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+from agent_logging import setup_logging, shutdown_logging
+from bench_concurrency import free_port, send_message, start_server, write_temp_key
+from cortex_stub import StubConfig, build_stub_app
+
+
+class SlowPipe:
+    """A stdout stand-in whose writes block for `write_ms` and are discarded."""
+
+    def __init__(self, write_ms: float):
+        self.write_ms = write_ms
+        self.lines = 0
+
+    def write(self, text: str) -> int:
+        time.sleep(self.write_ms / 1000)
+        self.lines += text.count("\n")
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * pct / 100) - 1)]
+
+
+async def run_load(url: str, requests: int, concurrency: int) -> tuple[list[float], float]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> float:
+        async with semaphore:
+            return await send_message(client, url, f"question {i}")
+
+    async with httpx.AsyncClient(timeout=120.0) as client:
+        await send_message(client, url, "warm-up")
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*[one(i) for i in range(requests)])
+        return latencies, time.perf_counter() - start
+
+
+def measure(mode: str, url: str, args) -> None:
+    """Reconfigure logging onto a fresh slow pipe and run the load."""
+    shutdown_logging()
+    pipe = SlowPipe(args.write_ms)
+    os.environ["LOG_ASYNC"] = "true" if mode == "queued" else "false"
+    sys.stdout = pipe
+    try:
+        setup_logging()
+        latencies, wall = asyncio.run(run_load(url, args.requests, args.concurrency))
+        shutdown_logging()
+    finally:
+        sys.stdout = sys.__stdout__
+
+    print(f"   {mode:<7} p50 {percentile(latencies, 50) * 1000:7.1f} ms   "
+          f"p99 {percentile(latencies, 99) * 1000:7.1f} ms   "
+          f"max {max(latencies) * 1000:7.1f} ms   wall {wall:5.2f}s   ({pipe.lines} log lines)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare task latency with inline vs queued logging")
+    parser.add_argument("--requests", type=int, default=100, help="Number of message/send requests")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight at once")
+    parser.add_argument("--delay", type=float, default=0.2, help="Stub Cortex answer latency in seconds")
+    parser.add_argument("--write-ms", type=float, default=5.0, help="Time each stdout write blocks")
+    args = parser.parse_args()
+
+    cortex_port = free_port()
+    a2a_port = free_port()
+    key_path = write_temp_key()
+
+    os.environ.update({
+        "SNOWFLAKE_API_BASE_URL": f"http://127.0.0.1:{cortex_port}",
+        "SNOWFLAKE_ACCOUNT_LOCATOR": "BENCH",
+        "SNOWFLAKE_ACCOUNT": "bench",
+        "SNOWFLAKE_USER": "BENCH_USER",
+        "PRIVATE_KEY_PATH": key_path,
+        "AGENT_DATABASE": "BENCH_DB",
+        "AGENT_SCHEMA": "BENCH_SCHEMA",
+        "AGENT_NAME": "BENCH_AGENT",
+        "TASK_STORE_PATH": os.path.join(tempfile.mkdtemp(), "tasks.db"),
+        "UPSTREAM_MAX_INFLIGHT": str(max(args.concurrency, 8)),
+        "REQUEST_COALESCING": "false",
+    })
+
+    # Import after the environment is configured: main builds the app at import
+    import main as a2a_main
+
+    print("\n📝 A2A Logging Benchmark")
+    print(f"   {args.requests} requests, concurrency {args.concurrency}, "
+          f"stub latency {args.delay}s, {args.write_ms:g} ms per stdout write")
+    print("=" * 60)
+
+    try:
+        start_server(build_stub_app(StubConfig(latency=args.delay, token_rate=0)), cortex_port)
+        start_server(a2a_main.app, a2a_port)
+        url = f"http://127.0.0.1:{a2a_port}/"
+        for mode in ("inline", "queued"):
+            measure(mode, url, args)
+    finally:
+        os.remove(key_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Cortex SSE parsing.
+
+Compares the original line-based loop (decode every `data:` line with
+json.loads and build the answer with `+=`) against sse.SSEParser with
+event-type fast paths and list-based text assembly, over a multi-MB Cortex
+agents:run stream.
+
+The stream is either a recording (`curl -N ... > answer.sse`) passed with
+--file, or a synthetic one shaped like a real agent answer: status events,
+thinking deltas, a tool call with a large result set and many small text
+deltas. --record saves the synthetic stream for reuse.
+
+Usage:
+    python bench_sse.py [--mb SIZE] [--chunk BYTES] [--file PATH] [--record PATH]
+"""
+
+import argparse
+import json
+import random
+import time
+
+from sse import SSEParser, TEXT, parse_cortex_event
+
+
+def synthetic_stream(target_bytes: int, seed: int = 7) -> bytes:
+    """Build a Cortex-shaped SSE stream of roughly `target_bytes`."""
+    rng = random.Random(seed)
+    words = ("network", "alarm", "KPI", "latency", "region", "Barcelona", "cell",
+             "throughput", "incident", "SLA", "anomaly", "score", "degraded", "the", "and")
+    out = []
+    size = 0
+
+    def emit(event: str, payload) -> None:
+        nonlocal size
+        frame = f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        out.append(frame)
+        size += len(frame)
+
+    while size < target_bytes:
+        emit("response.status", {"status": "planning", "message": "Planning the next steps"})
+        thinking = [" ".join(rng.choices(words, k=4)) for _ in range(40)]
+        for delta in thinking:
+            emit("response.thinking.delta", {"content_index": 0, "text": delta})
+        emit("response.thinking", {"content_index": 0, "text": "".join(thinking)})
+        rows = [[f"CELL_{rng.randint(1, 999):03d}", rng.random()] for _ in range(200)]
+        tool_result = {"content": [{"type": "json", "json": {"result_set": {"data": rows}}}]}
+        emit("response.tool_use", {"type": "cortex_analyst_text_to_sql", "input": {"query": "alarms by region"}})
+        emit("response.tool_result", tool_result)
+        answer = [" ".join(rng.choices(words, k=2)) + " " for _ in range(400)]
+        for delta in answer:
+            emit("response.text.delta", {"content_index": 1, "text": delta})
+        # Cortex closes each answer with the aggregated text and full message
+        emit("response.text", {"content_index": 1, "text": "".join(answer)})
+        emit("response", {"role": "assistant", "content": [
+            {"type": "thinking", "thinking": {"text": "".join(thinking)}},
+            {"type": "tool_result", "tool_result": tool_result},
+            {"type": "text", "text": "".join(answer)},
+        ]})
+    out.append("event: done\ndata: [DONE]\n\n")
+    return "".join(out).encode("utf-8")
+
+
+def split_chunks(stream: bytes, chunk_size: int) -> list[bytes]:
+    return [stream[i:i + chunk_size] for i in range(0, len(stream), chunk_size)]
+
+
+def legacy_iter_lines(chunks):
+    """requests.Response.iter_lines(decode_unicode=True), as the executor used it."""
+    pending = None
+    for chunk in chunks:
+        chunk = chunk.decode("utf-8", errors="replace")
+        if pending is not None:
+            chunk = pending + chunk
+        lines = chunk.splitlines()
+        if lines and lines[-1] and chunk and lines[-1][-1] == chunk[-1]:
+            pending = lines.pop()
+        else:
+            pending = None
+        yield from lines
+    if pending is not None:
+        yield pending
+
+
+def legacy_parse(chunks) -> str:
+    """The original _parse_sse_response loop."""
+    full_text = ""
+    for line in legacy_iter_lines(chunks):
+        if line and line.startswith("data:"):
+            try:
+                data = json.loads(line[5:].strip())
+                if "text" in data:
+                    full_text += data["text"]
+            except json.JSONDecodeError:
+                pass
+    return full_text.strip()
+
+
+def new_parse(chunks) -> str:
+    """The SSEParser based loop used by the executor."""
+    parser = SSEParser()
+    full_text = []
+    for chunk in chunks:
+        for sse in parser.feed(chunk):
+            event = parse_cortex_event(sse)
+            if event.kind == TEXT:
+                full_text.append(event.text)
+    for sse in parser.close():
+        event = parse_cortex_event(sse)
+        if event.kind == TEXT:
+            full_text.append(event.text)
+    return "".join(full_text).strip()
+
+
+def best_of(fn, chunks, repeats: int) -> tuple[float, str]:
+    best = float("inf")
+    result = ""
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(chunks)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Cortex SSE parsing")
+    parser.add_argument("--mb", type=float, default=4.0, help="Synthetic stream size in MB")
+    parser.add_argument("--chunk", type=int, default=4096, help="Network chunk size in bytes")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per parser (best is reported)")
+    parser.add_argument("--file", type=str, help="Recorded Cortex SSE stream to parse instead")
+    parser.add_argument("--record", type=str, help="Write the synthetic stream to this path")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, "rb") as f:
+            stream = f.read()
+    else:
+        stream = synthetic_stream(int(args.mb * 1024 * 1024))
+        if args.record:
+            with open(args.record, "wb") as f:
+                f.write(stream)
+
+    chunks = split_chunks(stream, args.chunk)
+
+    print("\n📡 Cortex SSE Parser Benchmark")
+    print(f"   Stream: {len(stream) / 1024 / 1024:.2f} MB in {len(chunks)} chunks of {args.chunk} bytes")
+    print("=" * 60)
+
+    legacy_time, legacy_text = best_of(legacy_parse, chunks, args.repeats)
+    new_time, new_text = best_of(new_parse, chunks, args.repeats)
+
+    print(f"   Line loop + json.loads everywhere: {legacy_time * 1000:8.1f} ms "
+          f"({len(stream) / legacy_time / 1024 / 1024:6.1f} MB/s)")
+    print(f"   SSEParser + event fast path:       {new_time * 1000:8.1f} ms "
+          f"({len(stream) / new_time / 1024 / 1024:6.1f} MB/s)")
+    print(f"   Speedup: {legacy_time / new_time:.2f}x")
+    print(f"   Answer text: {len(new_text):,} chars")
+    if legacy_text != new_text:
+        # The legacy loop also concatenates thinking deltas and the aggregated
+        # response.text / response.thinking payloads, duplicating the answer
+        print(f"   Note: legacy text differs ({len(legacy_text):,} chars; it also picks up "
+              f"thinking and aggregated text events)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Streaming backpressure benchmark for the Snowflake Cortex A2A Agent.
+
+Starts a local Cortex stand-in that sends many short, sentence-ending
+deltas plus the A2A server, then streams one answer with a fast and with a
+slow message/stream consumer (one that pauses after every event). Each
+run is repeated with fixed flushing (STREAM_MAX_COALESCE_BYTES at the flush
+size, so one event per sentence) and with adaptive coalescing, and prints
+how long the upstream read took, how many events the client received and
+the client's time to first and last text.
+
+Usage:
+    python bench_streaming.py [--deltas N] [--delta-ms MS] [--consumer-ms MS]
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+from bench_concurrency import free_port, start_server, write_temp_key
+
+upstream = {}
+
+
+def build_chatty_cortex(deltas: int, delta_ms: float) -> Starlette:
+    """agents:run stand-in that sends `deltas` one-sentence deltas, `delta_ms` apart."""
+
+    async def run_agent(request):
+        async def events():
+            upstream["started"] = time.perf_counter()
+            for i in range(deltas):
+                data = json.dumps({"text": f"Fact {i}. "})
+                yield f"event: response.text.delta\ndata: {data}\n\n"
+                await asyncio.sleep(delta_ms / 1000)
+            yield "event: done\ndata: [DONE]\n\n"
+            upstream["finished"] = time.perf_counter()
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return Starlette(routes=[Route("/api/v2/databases/{db}/schemas/{schema}/agents/{name}:run", run_agent, methods=["POST"])])
+
+
+async def stream_answer(url: str, consumer_ms: float) -> dict:
+    """Stream one answer, pausing `consumer_ms` after every event."""
+    payload = {
+        "jsonrpc": "2.0", "method": "message/stream", "id": str(uuid.uuid4()),
+        "params": {"message": {"messageId": str(uuid.uuid4()), "role": "user",
+                               "parts": [{"kind": "text", "text": "List every fact"}]}}
+    }
+    text = []
+    events = 0
+    first = None
+    start = time.perf_counter()
+    async with httpx.AsyncClient(timeout=300.0) as client:
+        async with client.stream("POST", url, json=payload) as response:
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                result = json.loads(line[5:]).get("result", {})
+                if result.get("kind") == "artifact-update":
+                    events += 1
+                    first = first or time.perf_counter()
+                    text.extend(part.get("text", "") for part in result["artifact"]["parts"])
+                if consumer_ms:
+                    await asyncio.sleep(consumer_ms / 1000)
+    return {
+        "text": "".join(text),
+        "events": events,
+        "first_ms": ((first or start) - start) * 1000,
+        "total_ms": (time.perf_counter() - start) * 1000,
+        "upstream_ms": (upstream["finished"] - upstream["started"]) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming with fast and slow consumers")
+    parser.add_argument("--deltas", type=int, default=2000, help="Deltas in the streamed answer")
+    parser.add_argument("--delta-ms", type=float, default=1.0, help="Pause between upstream deltas")
+    parser.add_argument("--consumer-ms", type=float, default=5.0, help="Slow consumer's pause per event")
+    args = parser.parse_args()
+
+    cortex_port = free_port()
+    a2a_port = free_port()
+    key_path = write_temp_key()
+
+    os.environ.update({
+        "SNOWFLAKE_API_BASE_URL": f"http://127.0.0.1:{cortex_port}",
+        "SNOWFLAKE_ACCOUNT_LOCATOR": "BENCH",
+        "SNOWFLAKE_ACCOUNT": "bench",
+        "SNOWFLAKE_USER": "BENCH_USER",
+        "PRIVATE_KEY_PATH": key_path,
+        "AGENT_DATABASE": "BENCH_DB",
+        "AGENT_SCHEMA": "BENCH_SCHEMA",
+        "AGENT_NAME": "BENCH_AGENT",
+        "TASK_STORE_PATH": os.path.join(tempfile.mkdtemp(), "tasks.db"),
+        "REQUEST_COALESCING": "false",
+        "LOG_LEVEL": "WARNING",
+    })
+
+    # Import after the environment is configured: main builds the app at import
+    import main as a2a_main
+
+    executor = a2a_main.app.state.executor
+    adaptive = executor.flush_policy
+    fixed = dataclasses.replace(adaptive, max_coalesce_bytes=adaptive.max_bytes)
+    expected = "".join(f"Fact {i}. " for i in range(args.deltas)).strip()
+
+    print("\n🌊 A2A Streaming Backpressure Benchmark")
+    print(f"   {args.deltas} deltas every {args.delta_ms:g} ms, "
+          f"slow consumer pauses {args.consumer_ms:g} ms per event")
+    print("=" * 60)
+
+    ok = True
+    try:
+        start_server(build_chatty_cortex(args.deltas, args.delta_ms), cortex_port)
+        start_server(a2a_main.app, a2a_port)
+        url = f"http://127.0.0.1:{a2a_port}/"
+        for policy_name, policy in (("fixed", fixed), ("adaptive", adaptive)):
+            executor.flush_policy = policy
+            for consumer_name, consumer_ms in (("fast", 0.0), ("slow", args.consumer_ms)):
+                result = asyncio.run(stream_answer(url, consumer_ms))
+                intact = result["text"].strip() == expected
+                ok = ok and intact
+                print(f"   {policy_name:<8} {consumer_name} consumer: {result['events']:5d} events, "
+                      f"upstream read {result['upstream_ms']:7.0f} ms, "
+                      f"first text {result['first_ms']:5.0f} ms, last {result['total_ms']:7.0f} ms"
+                      f"{'' if intact else '  ❌ text mismatch'}")
+    finally:
+        os.remove(key_path)
+
+    deltas_per_event = executor.metrics.stream_deltas_per_event
+    print(f"\n   a2a_stream_deltas_per_event observations: {deltas_per_event.count()}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Overhead benchmark for tracing.py.
+
+Replays the span structure of one streamed task (task, input extraction,
+auth, upstream POST, SSE parsing and one enqueue span per chunk) with no
+instrumentation, with tracing off (the default) and with the file exporter
+on, and prints the cost per task.
+
+Usage:
+    python bench_tracing.py [--tasks N] [--chunks N]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from tracing import CLIENT, SERVER, FileExporter, tracer
+
+
+async def plain_task(chunks: int) -> None:
+    for _ in range(chunks):
+        await asyncio.sleep(0)
+
+
+async def traced_task(chunks: int) -> None:
+    with tracer.span("a2a.task", SERVER, {"a2a.task_id": "bench", "a2a.streaming": True}):
+        with tracer.span("extract_input"):
+            pass
+        with tracer.span("auth"):
+            pass
+        with tracer.span("cortex.post", CLIENT, {"http.method": "POST"}) as post_span:
+            post_span.traceparent()
+            post_span.set_attribute("http.response.status_code", 200)
+            with tracer.span("sse.parse"):
+                for _ in range(chunks):
+                    with tracer.span("enqueue"):
+                        await asyncio.sleep(0)
+
+
+async def per_task_us(fn, tasks: int, chunks: int) -> float:
+    start = time.perf_counter()
+    for _ in range(tasks):
+        await fn(chunks)
+    return (time.perf_counter() - start) / tasks * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure tracing overhead per task")
+    parser.add_argument("--tasks", type=int, default=5000, help="Tasks per measurement")
+    parser.add_argument("--chunks", type=int, default=20, help="Streamed chunks (enqueue spans) per task")
+    args = parser.parse_args()
+
+    print("\n🔎 Tracing Overhead Benchmark")
+    print(f"   {args.tasks} tasks, {args.chunks} chunks each")
+    print("=" * 60)
+
+    baseline = asyncio.run(per_task_us(plain_task, args.tasks, args.chunks))
+    tracer.configure(None)
+    off = asyncio.run(per_task_us(traced_task, args.tasks, args.chunks))
+
+    path = os.path.join(tempfile.mkdtemp(), "traces.jsonl")
+    tracer.configure(FileExporter(path, "bench"))
+    on = asyncio.run(per_task_us(traced_task, args.tasks, args.chunks))
+    tracer.shutdown()
+
+    print(f"   No instrumentation: {baseline:8.1f} µs/task")
+    print(f"   Tracing off:        {off:8.1f} µs/task (+{off - baseline:.1f} µs)")
+    print(f"   Tracing on (file):  {on:8.1f} µs/task (+{on - baseline:.1f} µs, "
+          f"{os.path.getsize(path) / 1024:.0f} KB written)")
+
+
+if __name__ == "__main__":
+    main()
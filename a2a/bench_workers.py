@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Load test: A2A requests per second by worker count.
+
+For each worker count, launches `serve.py --workers N` against a local
+Cortex stand-in, drives message/send traffic at a fixed concurrency for a
+fixed duration, and prints a requests-per-second table. Scaling is bounded
+by the cores available to the machine running the benchmark (the stub and
+the load generator share them). It also checks that /metrics, answered by
+any one worker, counts the tasks of all workers.
+
+Usage:
+    python bench_workers.py [--workers 1,2,4] [--duration SECONDS] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from bench_concurrency import free_port, send_message, start_server, write_temp_key
+from cortex_stub import StubConfig, build_stub_app
+from serve import available_cores
+
+
+async def wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{url}.well-known/agent.json")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+async def scraped_completed(url: str) -> int:
+    """a2a_tasks_total{outcome="completed"} from one /metrics scrape."""
+    async with httpx.AsyncClient() as client:
+        text = (await client.get(f"{url}metrics")).text
+    for line in text.splitlines():
+        if line.startswith('a2a_tasks_total{outcome="completed"}'):
+            return int(float(line.split()[-1]))
+    return 0
+
+
+async def drive_load(url: str, duration: float, concurrency: int) -> tuple[int, int]:
+    """Closed-loop load: `concurrency` clients send back-to-back for `duration` seconds."""
+    ok = 0
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=60.0, limits=limits) as client:
+        async def client_loop(n: int):
+            nonlocal ok, errors
+            while time.monotonic() < deadline:
+                try:
+                    await send_message(client, url, f"load {n}")
+                    ok += 1
+                except Exception:
+                    errors += 1
+
+        await asyncio.gather(*[client_loop(n) for n in range(concurrency)])
+    return ok, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure A2A requests/second per worker count")
+    parser.add_argument("--workers", type=str, default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per run")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients")
+    parser.add_argument("--delay", type=float, default=0.05, help="Stub Cortex answer latency in seconds")
+    args = parser.parse_args()
+
+    cortex_port = free_port()
+    key_path = write_temp_key()
+    start_server(build_stub_app(StubConfig(latency=args.delay, token_rate=0)), cortex_port)
+
+    env = dict(os.environ,
+               SNOWFLAKE_API_BASE_URL=f"http://127.0.0.1:{cortex_port}",
+               SNOWFLAKE_ACCOUNT_LOCATOR="BENCH", SNOWFLAKE_ACCOUNT="bench",
+               SNOWFLAKE_USER="BENCH_USER", PRIVATE_KEY_PATH=key_path,
+               AGENT_DATABASE="BENCH_DB", AGENT_SCHEMA="BENCH_SCHEMA", AGENT_NAME="BENCH_AGENT",
+               METRICS_FLUSH_SECONDS="0.5")
+
+    print("\n🏋️ A2A Worker Scaling Benchmark")
+    print(f"   Cores available: {available_cores()}, concurrency: {args.concurrency}, "
+          f"duration: {args.duration}s, stub latency: {args.delay}s")
+    print("=" * 60)
+    print(f"   {'Workers':>7} | {'Requests':>8} | {'Errors':>6} | {'Req/s':>8} | {'/metrics':>8}")
+    print(f"   {'-' * 7}-+-{'-' * 8}-+-{'-' * 6}-+-{'-' * 8}-+-{'-' * 8}")
+
+    try:
+        for workers in [int(w) for w in args.workers.split(",")]:
+            port = free_port()
+            env["TASK_STORE_PATH"] = os.path.join(tempfile.mkdtemp(), "tasks.db")
+            proc = subprocess.Popen(
+                [sys.executable, "serve.py", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                cwd=os.path.dirname(os.path.abspath(__file__))
+            )
+            try:
+                url = f"http://127.0.0.1:{port}/"
+                asyncio.run(wait_until_up(url))
+                start = time.perf_counter()
+                ok, errors = asyncio.run(drive_load(url, args.duration, args.concurrency))
+                elapsed = time.perf_counter() - start
+                # Let every worker write its state once more
+                time.sleep(1.0)
+                scraped = asyncio.run(scraped_completed(url))
+                print(f"   {workers:>7} | {ok:>8} | {errors:>6} | {ok / elapsed:>8.1f} | "
+                      f"{scraped:>6} {'✅' if scraped == ok else '❌'}")
+            finally:
+                proc.send_signal(signal.SIGTERM)
+                proc.wait(timeout=60)
+    finally:
+        os.remove(key_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Snowflake Cortex Agents and the Snowflake-managed MCP server.
+
+Speaks the two protocols this project calls, so the A2A wrapper and the
+test scripts can be run and benchmarked without network access or credits:
+
+  POST /api/v2/databases/{db}/schemas/{schema}/agents/{name}:run
+      Cortex Agents SSE: a status event, `response.text.delta` events paced
+      at --token-rate, then `response.text`, `response` and `done`.
+  POST /api/v2/databases/{db}/schemas/{schema}/mcp-servers/{name}
+      MCP JSON-RPC: `tools/list` and `tools/call` for `sql_exec_tool`
+      (SQL run against the demo data) and `analyst_tool`. Repeated SQL is
+      answered from a result cache after --cached-latency instead of
+      --latency; like Snowflake's, it matches on the exact query text.
+  GET  /stub/stats
+      Call counters (runs, MCP calls, throttled, errors, peak concurrency).
+
+Every call must carry `Authorization: Bearer <JWT>` and
+`X-Snowflake-Authorization-Token-Type: KEYPAIR_JWT`; the JWT claims are
+checked like Snowflake does (iss/sub format, expiry) and, with
+--public-key, so are the signature and the key fingerprint. Failures get
+Snowflake's 401 / 390144 error body.
+
+The CSVs in snowflake/data/ are loaded into an in-memory SQLite database
+under their Snowflake table names, with the demo views and a small
+synthetic NETWORK_KPI table (the real one is not in the repository).
+Fully qualified names (TELCO_AI_DB.NETWORK_ASSURANCE.ALARMS) are accepted.
+Agent answers are built from the same data by keyword.
+
+Usage:
+    python cortex_stub.py [--port 9000] [--latency SECONDS] [--token-rate N]
+                          [--error-rate F] [--throttle-rate F] [--max-concurrency N]
+
+Then point the agent at it:
+    SNOWFLAKE_API_BASE_URL=http://localhost:9000 python main.py
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import random
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from snowflake_client import public_key_fingerprint
+
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "snowflake" / "data"
+
+# NETWORK_KPI is synthesized: KPI names per element type, as used by the demo views
+KPIS = {
+    "RADIO_CELL": (("PRB_UTIL", "%", 30, 95), ("RSRP", "dBm", -115, -75),
+                   ("RSRQ", "dB", -18, -6), ("SINR", "dB", -2, 25)),
+    "CORE_NODE": (("CPU_UTIL", "%", 20, 95), ("MEM_UTIL", "%", 30, 90),
+                  ("SESSION_FAIL_RATE", "%", 0, 5)),
+    "RADIO_SITE": (("BACKHAUL_LATENCY", "ms", 5, 80), ("PACKET_LOSS", "%", 0, 3)),
+}
+KPI_VIEWS = {
+    "RADIO_KPI_V": ("PRB_UTIL", "RSRP", "RSRQ", "SINR"),
+    "CORE_KPI_V": ("CPU_UTIL", "MEM_UTIL", "SESSION_FAIL_RATE"),
+    "TRANSPORT_KPI_V": ("BACKHAUL_LATENCY", "PACKET_LOSS"),
+}
+
+MCP_TOOLS = [
+    {
+        "name": "sql_exec_tool",
+        "title": "SQL Execution Tool",
+        "description": "Execute SQL queries on telecom assurance views for network KPIs, alarms, incidents, and anomaly detection.",
+        "inputSchema": {"type": "object", "properties": {"sql": {"type": "string"}}, "required": ["sql"]},
+    },
+    {
+        "name": "analyst_tool",
+        "title": "Analyst Tool",
+        "description": "Convert natural language questions to SQL queries using semantic model for telecom network data.",
+        "inputSchema": {"type": "object", "properties": {"question": {"type": "string"}}, "required": ["question"]},
+    },
+]
+
+# db.schema.object -> object
+_QUALIFIED_NAME = re.compile(r'\b(?:"?\w+"?\s*\.\s*){2}("?\w+"?)')
+_NO_OP_STATEMENT = re.compile(r"^\s*(ALTER\s+SESSION|USE)\b", re.IGNORECASE)
+_TOKEN = re.compile(r"\S+\s*")
+
+
+@dataclass
+class StubConfig:
+    """
+    Behaviour of the stand-in.
+
+    Attributes:
+        latency: Seconds before the first answer delta (or the MCP response)
+        jitter: Extra latency, uniform between 0 and this many seconds
+        token_rate: Answer deltas per second after the first (0 sends them all at once)
+        error_rate: Fraction of calls answered with HTTP 500
+        stream_error_rate: Fraction of agents:run streams that end with an `error` event
+        throttle_rate: Fraction of calls answered with HTTP 429
+        max_concurrency: Calls beyond this many in flight get HTTP 429 (0 disables)
+        retry_after: Retry-After seconds sent with 429s
+        cached_latency: MCP SQL latency when the result cache answers (None disables the cache)
+        public_key_path: Verify JWT signatures and fingerprints against this PEM public key
+        data_dir: Directory with the demo CSVs
+        seed: Seed for the random latency, error and throttle draws
+    """
+    latency: float = 0.5
+    jitter: float = 0.0
+    token_rate: float = 50.0
+    error_rate: float = 0.0
+    stream_error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    max_concurrency: int = 0
+    retry_after: float = 1.0
+    cached_latency: float | None = 0.05
+    public_key_path: str | None = None
+    data_dir: str = str(DATA_DIR)
+    seed: int | None = None
+
+
+class StubStats:
+    """Call counters served at /stub/stats."""
+
+    def __init__(self):
+        self.agent_runs = 0
+        self.mcp_calls = 0
+        self.sql_statements = 0
+        self.result_cache_hits = 0
+        self.throttled = 0
+        self.errors = 0
+        self.auth_failures = 0
+        self.inflight = 0
+        self.peak_inflight = 0
+
+    def enter(self) -> None:
+        self.inflight += 1
+        self.peak_inflight = max(self.peak_inflight, self.inflight)
+
+    def exit(self) -> None:
+        self.inflight -= 1
+
+    def snapshot(self) -> dict:
+        return dict(vars(self))
+
+
+def _cell(value: str):
+    """CSV text to an SQLite value: numbers as numbers, empty as NULL."""
+    if value == "":
+        return None
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+class TelcoData:
+    """The demo tables and views in an in-memory SQLite database."""
+
+    def __init__(self, data_dir: str, kpi_hours: int = 12):
+        self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.tables = {}
+        for path in sorted(Path(data_dir).glob("*.csv")):
+            with open(path, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                header = next(reader)
+                rows = [[_cell(value) for value in row] for row in reader]
+            self._create(path.stem.upper(), header, rows)
+        self._create_network_kpi(kpi_hours)
+        for table in list(self.tables):
+            self.db.execute(f"CREATE VIEW {table}_V AS SELECT * FROM {table}")
+        for view, kpis in KPI_VIEWS.items():
+            names = ", ".join(f"'{kpi}'" for kpi in kpis)
+            self.db.execute(f"CREATE VIEW {view} AS SELECT * FROM NETWORK_KPI WHERE kpi_name IN ({names})")
+
+    def _create(self, table: str, header: list[str], rows: list[list]) -> None:
+        columns = ", ".join(f'"{name}"' for name in header)
+        self.db.execute(f"CREATE TABLE {table} ({columns})")
+        self.db.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(header))})", rows)
+        self.tables[table] = len(rows)
+
+    def _create_network_kpi(self, hours: int) -> None:
+        """A deterministic hourly sample per element and KPI for the last `hours` of the demo week."""
+        rng = random.Random(42)
+        elements = self.db.execute(
+            "SELECT element_id, element_type, region FROM TOPOLOGY ORDER BY element_id"
+        ).fetchall() if "TOPOLOGY" in self.tables else []
+        rows = []
+        for hour in range(24 - hours, 24):
+            ts = f"2026-02-28 {hour:02d}:00:00"
+            for element_id, element_type, region in elements:
+                for name, unit, low, high in KPIS.get(element_type, ()):
+                    value = round(rng.uniform(low, high), 2)
+                    rows.append((ts, region, element_id, name, value, unit,
+                                 "NOKIA" if element_id[-1] in "02468" else "ERICSSON",
+                                 "5G" if element_type == "RADIO_CELL" and element_id[-1] in "05" else "4G"))
+        header = ["ts", "region", "cell_id", "kpi_name", "kpi_value", "kpi_unit", "vendor", "tech"]
+        self._create("NETWORK_KPI", header, rows)
+
+    def query(self, sql: str) -> tuple[list[str], list[list]]:
+        """
+        Run Snowflake-flavoured SQL; returns (column names, rows) of the last statement.
+
+        Raises:
+            sqlite3.Error: The statement is invalid or refers to an unknown object
+        """
+        columns, rows = ["status"], [["Statement executed successfully."]]
+        for statement in filter(str.strip, sql.split(";")):
+            if _NO_OP_STATEMENT.match(statement):
+                columns, rows = ["status"], [["Statement executed successfully."]]
+                continue
+            statement = _QUALIFIED_NAME.sub(r"\1", statement)
+            statement = re.sub(r"\bILIKE\b", "LIKE", statement, flags=re.IGNORECASE)
+            cursor = self.db.execute(statement)
+            columns = [column[0] for column in cursor.description or ()]
+            rows = [list(row) for row in cursor.fetchall()]
+        return columns, rows
+
+    def answer(self, question: str) -> str:
+        """A short answer to `question` built from the demo data, by keyword."""
+        q = question.lower()
+        parts = []
+        if "incident" in q:
+            by_state = self.db.execute(
+                "SELECT state, COUNT(*) FROM INCIDENTS GROUP BY state ORDER BY 2 DESC").fetchall()
+            open_rows = self.db.execute(
+                "SELECT number, priority, short_description FROM INCIDENTS "
+                "WHERE state NOT IN ('Resolved', 'Closed') ORDER BY priority, number LIMIT 5").fetchall()
+            parts.append("Incidents by state: " + ", ".join(f"{state} {n}" for state, n in by_state) + ".")
+            parts.extend(f"- {number} ({priority}): {text}" for number, priority, text in open_rows)
+        if "alarm" in q:
+            by_severity = self.db.execute(
+                "SELECT severity, COUNT(*) FROM ALARMS GROUP BY severity ORDER BY 2 DESC").fetchall()
+            top = self.db.execute(
+                "SELECT alarm_code, COUNT(*) FROM ALARMS GROUP BY alarm_code ORDER BY 2 DESC LIMIT 3").fetchall()
+            parts.append("Alarms by severity: " + ", ".join(f"{s} {n}" for s, n in by_severity) + ".")
+            parts.append("Most frequent alarm codes: " + ", ".join(f"{code} ({n})" for code, n in top) + ".")
+        if "anomal" in q:
+            top = self.db.execute(
+                "SELECT region, element_id, kpi_name, MAX(score) FROM ANOMALY_SCORES "
+                "GROUP BY region, element_id, kpi_name ORDER BY 4 DESC LIMIT 5").fetchall()
+            parts.append("Highest anomaly scores:")
+            parts.extend(f"- {element} {kpi} in {region}: {score}" for region, element, kpi, score in top)
+        if "sla" in q or "breach" in q or "penalt" in q:
+            count, total = self.db.execute("SELECT COUNT(*), SUM(penalty_eur) FROM SLA_BREACHES").fetchone()
+            parts.append(f"There are {count} SLA breaches with {total} EUR in penalties.")
+        if "change" in q:
+            rows = self.db.execute("SELECT status, COUNT(*) FROM CHANGE_EVENTS GROUP BY status").fetchall()
+            parts.append("Change events: " + ", ".join(f"{status} {n}" for status, n in rows) + ".")
+        if "ticket" in q:
+            rows = self.db.execute("SELECT state, COUNT(*) FROM TROUBLE_TICKETS GROUP BY state").fetchall()
+            parts.append("Trouble tickets: " + ", ".join(f"{state} {n}" for state, n in rows) + ".")
+        if "kpi" in q:
+            rows = self.db.execute(
+                "SELECT kpi_name, ROUND(AVG(kpi_value), 2) FROM NETWORK_KPI GROUP BY kpi_name").fetchall()
+            parts.append("Average KPIs: " + ", ".join(f"{name} {value}" for name, value in rows) + ".")
+        if not parts:
+            parts.append("I can answer questions about network KPIs, alarms, incidents, anomaly scores, "
+                         "SLA breaches, change events, trouble tickets and the network topology. Tables: "
+                         + ", ".join(f"{table} ({rows} rows)" for table, rows in sorted(self.tables.items())) + ".")
+        return "\n".join(parts)
+
+
+def _error(status: int, code: str, message: str, headers: dict | None = None) -> JSONResponse:
+    """An error body in the shape the Snowflake REST API uses."""
+    return JSONResponse({"code": code, "message": message}, status_code=status, headers=headers)
+
+
+def build_stub_app(config: StubConfig | None = None) -> Starlette:
+    """The stand-in as a Starlette app; counters are on app.state.stats, the (mutable) config on app.state.config."""
+    config = config or StubConfig()
+    rng = random.Random(config.seed)
+    data = TelcoData(config.data_dir)
+    stats = StubStats()
+    cached = set()
+
+    public_key = fingerprint = None
+    if config.public_key_path:
+        with open(config.public_key_path, "rb") as f:
+            public_key = serialization.load_pem_public_key(f.read())
+        fingerprint = public_key_fingerprint(public_key)
+
+    def check_auth(request: Request) -> JSONResponse | None:
+        """None when the KEYPAIR_JWT headers are valid, else the 401 response."""
+        header = request.headers.get("authorization", "")
+        if request.headers.get("x-snowflake-authorization-token-type", "").upper() != "KEYPAIR_JWT" \
+                or not header.startswith("Bearer "):
+            stats.auth_failures += 1
+            return _error(401, "390144", "JWT token is invalid. Missing KEYPAIR_JWT authorization headers.")
+        try:
+            if public_key is not None:
+                claims = jwt.decode(header[7:], public_key, algorithms=["RS256"],
+                                    options={"require": ["iss", "sub", "iat", "exp"]})
+            else:
+                claims = jwt.decode(header[7:], options={"verify_signature": False, "verify_exp": True,
+                                                         "require": ["iss", "sub", "iat", "exp"]})
+            issuer, subject = claims["iss"], claims["sub"]
+            # iss = ACCOUNT.USER.SHA256:<fingerprint>, sub = ACCOUNT.USER, both upper case
+            if subject != subject.upper() or subject.count(".") != 1 \
+                    or not issuer.startswith(f"{subject}.SHA256:"):
+                raise jwt.InvalidTokenError("issuer/subject mismatch")
+            if fingerprint is not None and issuer != f"{subject}.{fingerprint}":
+                raise jwt.InvalidTokenError("public key fingerprint mismatch")
+        except jwt.PyJWTError as e:
+            stats.auth_failures += 1
+            return _error(401, "390144", f"JWT token is invalid. {e}")
+        return None
+
+    def admit() -> JSONResponse | None:
+        """Apply throttling and error injection; None when the call may proceed."""
+        if (config.max_concurrency and stats.inflight >= config.max_concurrency) \
+                or rng.random() < config.throttle_rate:
+            stats.throttled += 1
+            return _error(429, "429", "Too many requests. Please retry later.",
+                          headers={"Retry-After": f"{config.retry_after:g}"})
+        if rng.random() < config.error_rate:
+            stats.errors += 1
+            return _error(500, "500", "Internal error (injected by cortex_stub).")
+        return None
+
+    def latency() -> float:
+        return config.latency + (rng.uniform(0, config.jitter) if config.jitter else 0.0)
+
+    async def run_agent(request: Request):
+        rejected = check_auth(request) or admit()
+        if rejected is not None:
+            return rejected
+        stats.agent_runs += 1
+        body = await request.json()
+        question = ""
+        for message in body.get("messages", []):
+            for content in message.get("content", []):
+                if content.get("type") == "text":
+                    question = content.get("text", "")
+        answer = data.answer(question)
+        fail_mid_stream = rng.random() < config.stream_error_rate
+        delay = latency()
+        # Count the call as in flight from admission, not from the first byte
+        stats.enter()
+
+        def frame(event: str, payload) -> str:
+            return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+        async def events():
+            try:
+                yield frame("response.status", {"status": "planning", "message": "Planning the next steps"})
+                await asyncio.sleep(delay)
+                tokens = _TOKEN.findall(answer)
+                if fail_mid_stream:
+                    tokens = tokens[:len(tokens) // 2]
+                for i, token in enumerate(tokens):
+                    if i and config.token_rate:
+                        await asyncio.sleep(1 / config.token_rate)
+                    yield frame("response.text.delta", {"content_index": 0, "text": token})
+                if fail_mid_stream:
+                    stats.errors += 1
+                    yield frame("error", {"code": "399504", "message": "Agent run failed (injected by cortex_stub)."})
+                else:
+                    yield frame("response.text", {"content_index": 0, "text": answer})
+                    yield frame("response", {"role": "assistant", "content": [{"type": "text", "text": answer}]})
+                yield "event: done\ndata: [DONE]\n\n"
+            finally:
+                stats.exit()
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def mcp(request: Request):
+        rejected = check_auth(request)
+        if rejected is not None:
+            return rejected
+        body = await request.json()
+        request_id = body.get("id")
+
+        def reply(result=None, error=None) -> JSONResponse:
+            payload = {"jsonrpc": "2.0", "id": request_id}
+            payload["error" if error else "result"] = error or result
+            return JSONResponse(payload)
+
+        method = body.get("method")
+        if method == "initialize":
+            return reply({"protocolVersion": "2024-11-05", "capabilities": {"tools": {}},
+                          "serverInfo": {"name": request.path_params["name"], "version": "stub"}})
+        if method == "tools/list":
+            return reply({"tools": MCP_TOOLS})
+        if method != "tools/call":
+            return reply(error={"code": -32601, "message": f"Method not found: {method}"})
+
+        rejected = admit()
+        if rejected is not None:
+            return rejected
+        stats.mcp_calls += 1
+        stats.enter()
+        try:
+            params = body.get("params") or {}
+            arguments = params.get("arguments") or {}
+            if params.get("name") == "sql_exec_tool":
+                sql = arguments.get("sql") or arguments.get("query") or ""
+                stats.sql_statements += 1
+                # Like Snowflake's result cache: reused for identical query text
+                if config.cached_latency is not None and sql in cached:
+                    stats.result_cache_hits += 1
+                    await asyncio.sleep(config.cached_latency)
+                else:
+                    await asyncio.sleep(latency())
+                    cached.add(sql)
+                try:
+                    columns, rows = data.query(sql)
+                except sqlite3.Error as e:
+                    return reply({"content": [{"type": "text", "text": f"SQL compilation error: {e}"}],
+                                  "isError": True})
+                result_set = {
+                    "resultSetMetaData": {"numRows": len(rows), "rowType": [{"name": c.upper()} for c in columns]},
+                    "data": [[None if value is None else str(value) for value in row] for row in rows],
+                }
+                return reply({"content": [{"type": "text", "text": json.dumps({"result_set": result_set})}],
+                              "isError": False})
+            await asyncio.sleep(latency())
+            if params.get("name") == "analyst_tool":
+                answer = data.answer(arguments.get("question") or arguments.get("query") or "")
+                return reply({"content": [{"type": "text", "text": answer}], "isError": False})
+            return reply({"content": [{"type": "text", "text": f"Unknown tool: {params.get('name')}"}],
+                          "isError": True})
+        finally:
+            stats.exit()
+
+    async def stub_stats(request: Request):
+        return JSONResponse(stats.snapshot())
+
+    app = Starlette(routes=[
+        Route("/api/v2/databases/{db}/schemas/{schema}/agents/{name}:run", run_agent, methods=["POST"]),
+        Route("/api/v2/databases/{db}/schemas/{schema}/mcp-servers/{name}", mcp, methods=["POST"]),
+        Route("/stub/stats", stub_stats, methods=["GET"]),
+    ])
+    app.state.stats = stats
+    app.state.config = config
+    app.state.data = data
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Cortex Agents / MCP stand-in for offline testing")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address")
+    parser.add_argument("--port", type=int, default=9000, help="Port")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds before the first delta / MCP response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--token-rate", type=float, default=50.0, help="Answer deltas per second (0 = all at once)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with 500")
+    parser.add_argument("--stream-error-rate", type=float, default=0.0,
+                        help="Fraction of agent streams that end with an error event")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of calls answered with 429")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="429 above this many calls in flight")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--cached-latency", type=float, default=0.05,
+                        help="MCP SQL latency for result-cache hits (negative disables the cache)")
+    parser.add_argument("--public-key", help="PEM public key: also verify JWT signatures and fingerprints")
+    parser.add_argument("--data-dir", default=str(DATA_DIR), help="Directory with the demo CSVs")
+    parser.add_argument("--seed", type=int, help="Seed for the random draws")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = StubConfig(
+        latency=args.latency, jitter=args.jitter, token_rate=args.token_rate,
+        error_rate=args.error_rate, stream_error_rate=args.stream_error_rate,
+        throttle_rate=args.throttle_rate, max_concurrency=args.max_concurrency,
+        retry_after=args.retry_after,
+        cached_latency=args.cached_latency if args.cached_latency >= 0 else None,
+        public_key_path=args.public_key,
+        data_dir=args.data_dir, seed=args.seed
+    )
+    started = time.perf_counter()
+    app = build_stub_app(config)
+    tables = app.state.data.tables
+    print(f"🧪 Cortex stub: {len(tables)} tables, {sum(tables.values())} rows loaded "
+          f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+    print(f"   http://{args.host}:{args.port}  (latency {args.latency:g}s, {args.token_rate:g} tokens/s)")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
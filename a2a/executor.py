@@ -3,14 +3,16 @@ Executor module for Snowflake Cortex A2A Agent.
 Implements the A2A AgentExecutor to handle task execution via Snowflake Cortex.
 """
 import os
-import json
+import time
 import uuid
-import requests
+import asyncio
+import httpx
 from dotenv import load_dotenv
 
 # A2A SDK Imports
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
+from a2a.server.tasks import TaskUpdater
 from a2a.types import (
     Message,
     TextPart,
@@ -19,10 +21,52 @@ from a2a.types import (
 )
 
 # Import our Auth Helper
-from auth import generate_snowflake_jwt
+from agent_logging import get_logger
+from admission import (
+    RETRYABLE_STATUSES, AdmissionRejected, build_limiter, client_id_for,
+    parse_retry_after, retry_delay
+)
+from auth import SnowflakeTokenProvider
+from batch import BatchPolicy, extract_questions
+from http_pool import PoolStats, build_http_client
+from metrics import CortexMetrics, GaugeFunc
+from response_cache import MISS, build_response_cache
+from snowflake_client import account_url, agent_run_url
+from snowflake_client.auth import load_private_key
+from sse import ERROR, TEXT, aiter_cortex_events
+from streaming import FlushPolicy, pump_deltas
+from tracing import CLIENT, SERVER, configure_from_env, tracer
 
 load_dotenv()
 
+log = get_logger("executor")
+
+TERMINAL_STATES = (TaskState.completed, TaskState.canceled, TaskState.failed, TaskState.rejected)
+
+NO_ANSWER = "I could not retrieve an answer from the Cortex Agent."
+
+
+class CortexAPIError(Exception):
+    """Cortex answered with a non-200 status."""
+
+    def __init__(self, status_code: int, body: str, retry_after: float | None = None):
+        super().__init__(f"Snowflake API Error {status_code}: {body}")
+        self.status_code = status_code
+        self.body = body
+        self.retry_after = retry_after
+        # Failure label for a2a_task_failures_total
+        self.reason = f"http_{status_code}"
+
+
+class CortexStreamError(CortexAPIError):
+    """Cortex sent an `error` event inside a 200 event stream; the answer is incomplete."""
+
+    def __init__(self, message: str, code: str | None = None):
+        super().__init__(200, message)
+        self.args = (f"Cortex error event {code}: {message}",)
+        self.code = code
+        self.reason = "stream_error"
+
 
 class SnowflakeCortexExecutor(AgentExecutor):
     """
@@ -45,201 +89,632 @@ class SnowflakeCortexExecutor(AgentExecutor):
         self.schema = os.getenv("AGENT_SCHEMA")
         self.agent_name = os.getenv("AGENT_NAME")
         
+        # Cached JWT: the key is parsed here, at startup, and tokens are
+        # re-signed ahead of expiry (off the event loop, see _get_token)
+        self.token_provider = SnowflakeTokenProvider(
+            self.account_locator,
+            self.user,
+            self.key_path,
+            private_key=load_private_key(self.key_path),
+            lifetime=int(os.getenv("JWT_LIFETIME_SECONDS", "3600")),
+            refresh_skew=int(os.getenv("JWT_REFRESH_SKEW_SECONDS", "300"))
+        )
+        
         # API Endpoint Construction (use account with hyphens for URL)
-        self.api_url = f"https://{self.account}.snowflakecomputing.com/api/v2/databases/{self.db}/schemas/{self.schema}/agents/{self.agent_name}:run"
+        # SNOWFLAKE_API_BASE_URL overrides the host, e.g. to target a local stub
+        self.base_url = account_url(self.account)
+        self.api_url = agent_run_url(self.base_url, self.db, self.schema, self.agent_name)
+        
+        # How buffered deltas are flushed to message/stream clients
+        self.flush_policy = FlushPolicy.from_env()
+        
+        # Fan-out limits for multi-question (batch) messages
+        self.batch_policy = BatchPolicy.from_env()
         
-        print(f"🔷 Snowflake Cortex A2A Agent initialized")
-        print(f"   Agent: {self.db}.{self.schema}.{self.agent_name}")
-        print(f"   Endpoint: {self.api_url}")
+        # Shared async HTTP client: all tasks reuse one keep-alive connection
+        # pool and the upstream round trip never blocks the event loop
+        self.pool_stats = PoolStats()
+        self.client = build_http_client(self.pool_stats)
+        
+        # Answer cache (RESPONSE_CACHE_ENABLED) or, when it is off, plain
+        # coalescing of identical in-flight questions (REQUEST_COALESCING)
+        self.cache = build_response_cache(f"{self.db}.{self.schema}.{self.agent_name}")
+        
+        # Admission control: bounded, fair access to Cortex and retries on 429/503
+        self.limiter = build_limiter()
+        self.retry_attempts = int(os.getenv("UPSTREAM_RETRY_ATTEMPTS", "3"))
+        self.retry_base = float(os.getenv("UPSTREAM_RETRY_BASE_SECONDS", "0.5"))
+        self.retry_cap = float(os.getenv("UPSTREAM_RETRY_MAX_SECONDS", "20"))
+        self.retries = 0
+        
+        # task id -> asyncio task executing it, so cancel() can abort the
+        # upstream call (closing the stream releases its pooled connection)
+        self.inflight_tasks: dict[str, asyncio.Task] = {}
+        # tasks/cancel may reach another worker: poll the shared task store
+        # for tasks running here that were canceled there (see watch_cancellations)
+        self.cancel_poll = float(os.getenv("CANCEL_POLL_SECONDS", "1"))
+        self._canceled_elsewhere: set[str] = set()
+        self._cancel_watcher: asyncio.Task | None = None
+        
+        # Latency histograms and outcome counters served at /metrics
+        self.metrics = CortexMetrics()
+        self._register_gauges()
+        
+        # Per-task spans (TRACING_EXPORTER), a no-op when unset
+        configure_from_env()
+        
+        log.info("🔷 Snowflake Cortex A2A Agent initialized", extra={
+            "agent": f"{self.db}.{self.schema}.{self.agent_name}",
+            "endpoint": self.api_url
+        })
+
+    def _register_gauges(self) -> None:
+        """Expose the pool, limiter, cache and task counters at scrape time."""
+        self.metrics.add(GaugeFunc(
+            "a2a_inflight_tasks", "Tasks currently executing", lambda: len(self.inflight_tasks)
+        ))
+        self.metrics.add(GaugeFunc(
+            "cortex_upstream_limiter", "Upstream admission control state",
+            self.limiter.snapshot, labelname="stat"
+        ))
+        self.metrics.add(GaugeFunc(
+            "cortex_http_pool", "Upstream connection pool counters",
+            self.pool_stats.snapshot, labelname="stat"
+        ))
+        if self.cache is not None:
+            self.metrics.add(GaugeFunc(
+                "a2a_response_cache", "Answer cache and coalescing counters",
+                self.cache.snapshot, labelname="stat"
+            ))
 
-    def _parse_sse_response(self, response) -> str:
+    async def aclose(self) -> None:
+        """Close the shared HTTP client, its pooled connections, the answer cache and trace export."""
+        if self._cancel_watcher is not None:
+            self._cancel_watcher.cancel()
+        await self.client.aclose()
+        if self.cache is not None:
+            self.cache.close()
+        tracer.shutdown()
+
+    async def _parse_sse_response(self, response: httpx.Response, started: float) -> str:
         """
         Parse Server-Sent Events (SSE) streaming response from Cortex.
         
         Args:
-            response: requests.Response object with streaming content
+            response: httpx.Response object with streaming content
+            started: perf_counter() when the request was sent
             
         Returns:
             Concatenated text from all response.text.delta events
         """
-        full_text = ""
+        full_text = []
         
-        for line in response.iter_lines(decode_unicode=True):
-            if line and line.startswith("data:"):
-                try:
-                    data = json.loads(line[5:].strip())
-                    # Extract text from response.text.delta events
-                    if "text" in data:
-                        full_text += data["text"]
-                except json.JSONDecodeError:
-                    pass
+        async for event in aiter_cortex_events(response.aiter_bytes()):
+            if event.kind == TEXT:
+                if not full_text:
+                    self.metrics.phase_seconds.observe(time.perf_counter() - started, "first_delta")
+                full_text.append(event.text)
+            elif event.kind == ERROR:
+                self._raise_error_event(event)
         
-        return full_text.strip()
+        return "".join(full_text).strip()
 
-    async def _stream_sse_response(self, response, event_queue: EventQueue) -> str:
+    async def _stream_sse_response(self, response: httpx.Response, updater: TaskUpdater,
+                                   started: float) -> str:
         """
         Stream SSE response chunks to the A2A client in real-time.
         
+        A reader task drains the Cortex stream into a bounded buffer while
+        the publisher appends coalesced chunks to one `answer` artifact (see
+        streaming.pump_deltas), so a slow A2A consumer gets fewer, larger
+        artifact-update events instead of stalling the upstream read.
+        
         Args:
-            response: requests.Response object with streaming content
-            event_queue: Queue to push streaming chunks
+            response: httpx.Response object with streaming content
+            updater: TaskUpdater for the task being streamed
+            started: perf_counter() when the request was sent
             
         Returns:
             Complete text for final message
         """
-        full_text = ""
-        chunk_buffer = ""
-        message_id = str(uuid.uuid4())
+        full_text = []
+        artifact_id = str(uuid.uuid4())
+        
+        async def deltas():
+            async for event in aiter_cortex_events(response.aiter_bytes()):
+                if event.kind == TEXT:
+                    if not full_text:
+                        self.metrics.phase_seconds.observe(time.perf_counter() - started, "first_delta")
+                    full_text.append(event.text)
+                    yield event.text
+                elif event.kind == ERROR:
+                    self._raise_error_event(event)
+        
+        published = 0
+        
+        async def publish(text: str, last: bool) -> None:
+            nonlocal published
+            await self._send_chunk(updater, text, artifact_id, append=published > 0, last_chunk=last)
+            published += 1
+        
+        def observe(deltas_coalesced: int, waited: float) -> None:
+            self.metrics.stream_deltas_per_event.observe(deltas_coalesced)
+            self.metrics.phase_seconds.observe(waited, "publish_lag")
+        
+        await pump_deltas(
+            deltas(), publish, updater.event_queue.queue.qsize, self.flush_policy, observe
+        )
+        if published:
+            self.metrics.stream_events.observe(published)
+        
+        return "".join(full_text).strip()
+
+    def _raise_error_event(self, event) -> None:
+        """
+        Fail the call on an in-stream Cortex `error` event.
+        
+        Text received before the event is a partial answer: raising keeps it
+        out of the answer cache and ends the task `failed`.
+        
+        Raises:
+            CortexStreamError: Always
+        """
+        self.metrics.error_events.inc()
+        code = event.data.get("code") if isinstance(event.data, dict) else None
+        log.warning("❌ Cortex error event", extra={"error": event.text, "code": code})
+        raise CortexStreamError(event.text, code)
+
+    async def _send_chunk(self, updater: TaskUpdater, text: str, artifact_id: str | None = None,
+                          append: bool = False, last_chunk: bool = True) -> None:
+        """Send (or append to) the task's `answer` artifact."""
+        await self._publish(updater.event_queue, updater.add_artifact(
+            [TextPart(text=text)],
+            artifact_id=artifact_id,
+            name="answer",
+            append=append,
+            last_chunk=last_chunk
+        ))
+
+    async def _publish(self, event_queue: EventQueue, enqueue) -> None:
+        """Await an enqueue, recording its latency and the queue depth it found."""
+        self.metrics.queue_depth.observe(event_queue.queue.qsize())
+        start = time.perf_counter()
+        with tracer.span("enqueue"):
+            await enqueue
+        self.metrics.phase_seconds.observe(time.perf_counter() - start, "enqueue")
+
+    @staticmethod
+    def _is_streaming_request(context: RequestContext) -> bool:
+        """True when the task arrived via message/stream rather than message/send."""
+        call_context = getattr(context, "call_context", None)
+        return bool(call_context and call_context.state.get("method") == "message/stream")
+
+    async def _call_with_admission(self, incoming_text: str, updater: TaskUpdater,
+                                   streaming: bool, client_id: str) -> tuple[str, bool]:
+        """
+        Call Cortex through the upstream limiter, retrying 429/503 responses.
+        
+        The slot is released while backing off so other clients can use it.
+        
+        Raises:
+            AdmissionRejected: No upstream slot within the queue deadline
+            CortexAPIError: Non-retryable status, or retries exhausted
+        """
+        for attempt in range(self.retry_attempts + 1):
+            try:
+                async with self.limiter.slot(client_id):
+                    result = await self._call_cortex(incoming_text, updater, streaming)
+                self.limiter.on_success()
+                return result
+            except CortexAPIError as e:
+                if e.status_code not in RETRYABLE_STATUSES:
+                    raise
+                self.limiter.on_throttled()
+                if attempt == self.retry_attempts:
+                    raise
+                self.metrics.retries.inc(str(e.status_code))
+                delay = retry_delay(attempt, e.retry_after, self.retry_base, self.retry_cap)
+                self.retries += 1
+                log.warning("⏳ Cortex throttled, retrying", extra={
+                    "status": e.status_code, "attempt": attempt + 1,
+                    "max_attempts": self.retry_attempts, "delay_s": round(delay, 3)
+                })
+                await asyncio.sleep(delay)
+
+    async def _get_token(self) -> str:
+        """
+        Return the cached JWT, or sign a new one in a worker thread.
+        
+        RSA signing takes tens of milliseconds and waits on the provider's
+        thread lock, so a refresh never runs on the event loop.
+        """
+        token = self.token_provider.cached_token()
+        if token is not None:
+            return token
+        return await asyncio.to_thread(self.token_provider.get_token)
+
+    async def _call_cortex(self, incoming_text: str, updater: TaskUpdater,
+                           streaming: bool) -> tuple[str, bool]:
+        """
+        Send one question to the Cortex Agent and return its answer.
         
-        for line in response.iter_lines(decode_unicode=True):
-            if line and line.startswith("data:"):
+        Args:
+            incoming_text: The user question
+            updater: TaskUpdater used to forward deltas in streaming mode
+            streaming: Forward deltas as they arrive (message/stream)
+            
+        Returns:
+            (answer, streamed): the answer text, possibly empty, and whether
+            any of it was already forwarded to the client
+            
+        Raises:
+            CortexAPIError: Cortex answered with a non-200 status
+            CortexStreamError: Cortex sent an `error` event mid-stream
+        """
+        # Authenticate (use account_locator for JWT)
+        auth_start = time.perf_counter()
+        with tracer.span("auth"):
+            token = await self._get_token()
+        self.metrics.phase_seconds.observe(time.perf_counter() - auth_start, "auth")
+
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+            "X-Snowflake-Authorization-Token-Type": "KEYPAIR_JWT",
+            "Accept": "application/json"
+        }
+
+        payload = {
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [{"type": "text", "text": incoming_text}]
+                }
+            ]
+        }
+
+        log.debug("🔄 Calling Snowflake Cortex API")
+        started = time.perf_counter()
+        with tracer.span("cortex.post", CLIENT, {"http.method": "POST", "url.full": self.api_url}) as post_span:
+            # W3C trace context, so Snowflake-side logs can be correlated
+            traceparent = post_span.traceparent()
+            if traceparent:
+                headers["traceparent"] = traceparent
+            async with self.client.stream(
+                "POST",
+                self.api_url,
+                json=payload,
+                headers=headers
+            ) as response:
+                self.metrics.phase_seconds.observe(time.perf_counter() - started, "connect")
+                self.metrics.upstream_responses.inc(str(response.status_code))
+                post_span.set_attribute("http.response.status_code", response.status_code)
                 try:
-                    data = json.loads(line[5:].strip())
-                    if "text" in data:
-                        chunk = data["text"]
-                        full_text += chunk
-                        chunk_buffer += chunk
-                        
-                        # Send chunks when we have enough content (word boundaries)
-                        # This provides smooth streaming without overwhelming the client
-                        if len(chunk_buffer) >= 50 or chunk.endswith(('\n', '.', '!', '?')):
-                            streaming_msg = Message(
-                                messageId=message_id,
-                                role="agent",
-                                parts=[TextPart(text=chunk_buffer)]
-                            )
-                            await event_queue.enqueue_event(streaming_msg)
-                            chunk_buffer = ""
-                            
-                except json.JSONDecodeError:
-                    pass
-        
-        # Send any remaining buffer
-        if chunk_buffer:
-            streaming_msg = Message(
-                messageId=message_id,
-                role="agent",
-                parts=[TextPart(text=chunk_buffer)]
+                    with tracer.span("sse.parse"):
+                        return await self._read_answer(response, updater, streaming, started)
+                finally:
+                    self.metrics.sse_bytes.observe(response.num_bytes_downloaded)
+                    post_span.set_attribute("http.response.body.size", response.num_bytes_downloaded)
+
+    async def _read_answer(self, response: httpx.Response, updater: TaskUpdater,
+                           streaming: bool, started: float) -> tuple[str, bool]:
+        """Turn an agents:run response into (answer, streamed); see _call_cortex."""
+        if response.status_code != 200:
+            await response.aread()
+            raise CortexAPIError(
+                response.status_code,
+                response.text,
+                retry_after=parse_retry_after(response.headers.get("Retry-After"))
             )
-            await event_queue.enqueue_event(streaming_msg)
+
+        # Parse SSE Response (forward deltas for message/stream,
+        # collect the full response for message/send)
+        content_type = response.headers.get("Content-Type", "")
+        
+        if "text/event-stream" in content_type:
+            log.debug("📡 Receiving streaming response from Cortex")
+            if streaming:
+                answer = await self._stream_sse_response(response, updater, started)
+                self.metrics.phase_seconds.observe(time.perf_counter() - started, "full_answer")
+                return answer, bool(answer)
+            answer = await self._parse_sse_response(response, started)
+            self.metrics.phase_seconds.observe(time.perf_counter() - started, "full_answer")
+            return answer, False
+
+        # Fallback for non-streaming response
+        await response.aread()
+        self.metrics.phase_seconds.observe(time.perf_counter() - started, "full_answer")
+        data = response.json()
+        if "messages" in data:
+            for msg in reversed(data["messages"]):
+                if msg["role"] in ["assistant", "analyst"]:
+                    for content in msg["content"]:
+                        if content["type"] == "text":
+                            return content["text"], False
+                    break
+        return "", False
+
+    async def _report_state(self, state: TaskState, event_queue: EventQueue,
+                            updater: TaskUpdater, streaming: bool) -> None:
+        """
+        Publish a task state change in the form the request mode expects.
         
-        return full_text.strip()
+        Terminal states are always a final status-update event: message/send
+        then answers with the Task in that state (a bare TaskStatus is not an
+        A2A event and surfaced as a JSON-RPC internal error).
+        """
+        if streaming or state in TERMINAL_STATES:
+            await self._publish(event_queue, updater.update_status(state, final=state in TERMINAL_STATES))
+        else:
+            await self._publish(event_queue, event_queue.enqueue_event(TaskStatus(state=state)))
 
     async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
         """
         The main entry point called by the A2A Protocol when a task is received.
         
+        message/send collects the full Cortex answer and replies with a single
+        Message. message/stream forwards text deltas as they arrive. Messages
+        with several questions are answered as a batch (see _execute_batch).
+        
         Args:
             context: The A2A request context containing the incoming message
             event_queue: Queue to push status updates and responses
         """
+        streaming = self._is_streaming_request(context)
+        call_context = getattr(context, "call_context", None)
+        headers = (call_context.state.get("headers") or {}) if call_context else {}
+        attributes = {"a2a.task_id": context.task_id or "", "a2a.streaming": streaming}
+        with tracer.span("a2a.task", SERVER, attributes, traceparent=headers.get("traceparent")):
+            await self._execute(context, event_queue, streaming)
+
+    async def _execute(self, context: RequestContext, event_queue: EventQueue, streaming: bool) -> None:
+        """Run one task; see execute()."""
+        updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+        self.inflight_tasks[context.task_id] = asyncio.current_task()
+        
         try:
             # 1. Extract User Input
-            incoming_text = "Hello"
+            with tracer.span("extract_input"):
+                questions, is_batch = extract_questions(context.message)
+            
+            client_id = client_id_for(context)
+            freshness = (context.message.metadata or {}).get("freshness") if context.message else None
+            freshness = str(freshness) if freshness is not None else None
             
-            if context.message and context.message.parts:
-                for part in context.message.parts:
-                    # A2A SDK wraps parts in a Part container with a 'root' attribute
-                    actual_part = getattr(part, 'root', part)
-                    if isinstance(actual_part, TextPart):
-                        incoming_text = actual_part.text
-                        break
-                    elif hasattr(actual_part, 'text'):
-                        incoming_text = actual_part.text
-                        break
+            if is_batch:
+                await self._execute_batch(questions, event_queue, updater, streaming, client_id, freshness)
+                return
             
-            print(f"📥 Received query: {incoming_text}")
+            incoming_text = questions[0] if questions else "Hello"
+            log.info("📥 Received query", extra={
+                "task_id": context.task_id, "query": incoming_text, "streaming": streaming
+            })
             
             # 2. Notify Client: "Processing Started"
-            await event_queue.enqueue_event(
-                TaskStatus(state=TaskState.working)
-            )
+            await self._report_state(TaskState.working, event_queue, updater, streaming)
 
-            # 3. Authenticate (use account_locator for JWT)
-            token = generate_snowflake_jwt(self.account_locator, self.user, self.key_path)
-
-            # 4. Call Snowflake Cortex API
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-                "X-Snowflake-Authorization-Token-Type": "KEYPAIR_JWT",
-                "Accept": "application/json"
-            }
-
-            payload = {
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [{"type": "text", "text": incoming_text}]
-                    }
-                ]
-            }
-
-            print(f"🔄 Calling Snowflake Cortex API...")
-            response = requests.post(
-                self.api_url, 
-                json=payload, 
-                headers=headers, 
-                timeout=120,
-                stream=True  # Enable streaming for SSE
+            # 3. Ask Cortex, or reuse a cached answer to the same question
+            final_answer, streamed = await self._answer(
+                incoming_text, updater, streaming, client_id, freshness
             )
             
-            if response.status_code != 200:
-                error_msg = f"Snowflake API Error {response.status_code}: {response.text}"
-                print(f"❌ {error_msg}")
-                await event_queue.enqueue_event(
-                    TaskStatus(state=TaskState.failed)
-                )
-                return
-
-            # 5. Parse SSE Response (collect full response for non-streaming A2A)
-            content_type = response.headers.get("Content-Type", "")
-            
-            if "text/event-stream" in content_type:
-                # Parse SSE streaming response and collect full text
-                print(f"📡 Receiving streaming response from Cortex...")
-                final_answer = self._parse_sse_response(response)
-            else:
-                # Fallback for non-streaming response
-                data = response.json()
-                final_answer = "I could not retrieve an answer from the Cortex Agent."
-                
-                if "messages" in data:
-                    for msg in reversed(data["messages"]):
-                        if msg["role"] in ["assistant", "analyst"]:
-                            for content in msg["content"]:
-                                if content["type"] == "text":
-                                    final_answer = content["text"]
-                                    break
-                            break
-            
             if not final_answer:
-                final_answer = "I could not retrieve an answer from the Cortex Agent."
+                final_answer = NO_ANSWER
+            
+            log.info("✅ Got response from Cortex", extra={"task_id": context.task_id, "chars": len(final_answer)})
             
-            print(f"✅ Got response from Cortex ({len(final_answer)} chars)")
+            if streaming:
+                # 4. Deltas were already forwarded; send the answer only if nothing streamed
+                if not streamed:
+                    await self._send_chunk(updater, final_answer)
+                await self._publish(event_queue, updater.complete())
+                self.metrics.tasks.inc("completed")
+                return
             
-            # 6. Send complete response
+            # 4. Send complete response
             response_msg = Message(
                 messageId=str(uuid.uuid4()),
                 role="agent",
                 parts=[TextPart(text=final_answer)]
             )
-            await event_queue.enqueue_event(response_msg)
+            await self._publish(event_queue, event_queue.enqueue_event(response_msg))
             
-            # 7. Mark Task as Complete
-            await event_queue.enqueue_event(
+            # 5. Mark Task as Complete
+            await self._publish(event_queue, event_queue.enqueue_event(
                 TaskStatus(state=TaskState.completed)
-            )
+            ))
+            self.metrics.tasks.inc("completed")
 
+        except AdmissionRejected as e:
+            log.warning("🚦 Rejected", extra={"task_id": context.task_id, "reason": str(e)})
+            self._record_failure("rejected", "admission")
+            await self._report_state(TaskState.rejected, event_queue, updater, streaming)
+        except CortexAPIError as e:
+            log.error("❌ Snowflake API error", extra={
+                "task_id": context.task_id, "status": e.status_code, "body": e.body[:500]
+            })
+            self._record_failure("failed", e.reason)
+            await self._report_state(TaskState.failed, event_queue, updater, streaming)
+        except asyncio.CancelledError:
+            self.metrics.tasks.inc("canceled")
+            if context.task_id not in self._canceled_elsewhere:
+                raise
+            # Canceled by another worker: end this worker's stream as canceled
+            self._canceled_elsewhere.discard(context.task_id)
+            asyncio.current_task().uncancel()
+            await self._report_state(TaskState.canceled, event_queue, updater, streaming)
         except Exception as e:
-            error_msg = f"Execution error: {str(e)}"
-            print(f"❌ {error_msg}")
-            await event_queue.enqueue_event(
-                TaskStatus(state=TaskState.failed)
-            )
+            log.error("❌ Execution error", extra={"task_id": context.task_id, "error": str(e)}, exc_info=True)
+            self._record_failure("failed", self._failure_reason(e))
+            await self._report_state(TaskState.failed, event_queue, updater, streaming)
+        finally:
+            if self.inflight_tasks.get(context.task_id) is asyncio.current_task():
+                del self.inflight_tasks[context.task_id]
 
-    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
-        """Handle task cancellation requests."""
-        await event_queue.enqueue_event(
-            TaskStatus(state=TaskState.canceled)
+    async def _answer(self, question: str, updater: TaskUpdater, streaming: bool,
+                      client_id: str, freshness: str | None) -> tuple[str, bool]:
+        """
+        Answer one question through the answer cache (or coalescing) and admission control.
+        
+        Returns:
+            (answer, streamed) as for _call_cortex; cached answers are never streamed
+        """
+        streamed = False
+
+        async def fetch() -> str:
+            nonlocal streamed
+            answer, streamed = await self._call_with_admission(question, updater, streaming, client_id)
+            return answer
+
+        if self.cache is None:
+            return await fetch(), streamed
+        answer, source = await self.cache.get_or_fetch(question, fetch, freshness=freshness)
+        if source != MISS:
+            log.info("⚡ Answer served from cache", extra={"task_id": updater.task_id, "source": source})
+        return answer, streamed
+
+    async def _execute_batch(self, questions: list[str], event_queue: EventQueue, updater: TaskUpdater,
+                             streaming: bool, client_id: str, freshness: str | None) -> None:
+        """
+        Answer a batch of questions concurrently, at most batch_policy.max_concurrency at a time.
+        
+        message/stream clients get each answer as an artifact (`answer-<n>`,
+        metadata: index, question, status) as soon as it is ready, so the
+        batch takes about as long as its slowest question. message/send
+        clients get one Message with a text part per question, in order.
+        The task fails only if every question failed.
+        """
+        task_id = updater.task_id
+        if not questions or len(questions) > self.batch_policy.max_questions:
+            log.warning("🚦 Rejected batch", extra={
+                "task_id": task_id, "questions": len(questions),
+                "max_questions": self.batch_policy.max_questions
+            })
+            self._record_failure("rejected", "batch_size")
+            await self._report_state(TaskState.rejected, event_queue, updater, streaming)
+            return
+
+        log.info("📦 Received batch", extra={
+            "task_id": task_id, "questions": len(questions), "streaming": streaming
+        })
+        await self._report_state(TaskState.working, event_queue, updater, streaming)
+
+        semaphore = asyncio.Semaphore(self.batch_policy.max_concurrency)
+        results: list[tuple[str, str] | None] = [None] * len(questions)
+
+        async def ask(index: int, question: str) -> None:
+            async with semaphore:
+                with tracer.span("batch.question", attributes={"batch.index": index}):
+                    try:
+                        answer, _ = await self._answer(question, updater, False, client_id, freshness)
+                        status = "completed"
+                    except AdmissionRejected as e:
+                        answer, status = f"Rejected: {e}", "rejected"
+                    except CortexStreamError as e:
+                        answer, status = f"Cortex agent error: {e.body}", "failed"
+                    except CortexAPIError as e:
+                        answer, status = f"Snowflake API error {e.status_code}", "failed"
+                    except Exception as e:
+                        log.error("❌ Batch question failed", extra={
+                            "task_id": task_id, "index": index, "error": str(e)
+                        }, exc_info=True)
+                        answer, status = "The question could not be answered.", "failed"
+            self.metrics.batch_questions.inc(status)
+            results[index] = (answer or NO_ANSWER, status)
+            if streaming:
+                await self._publish(event_queue, updater.add_artifact(
+                    [TextPart(text=results[index][0])],
+                    name=f"answer-{index + 1}",
+                    metadata={"index": index, "question": question, "status": status},
+                    last_chunk=True
+                ))
+
+        await asyncio.gather(*(ask(index, question) for index, question in enumerate(questions)))
+
+        answered = sum(1 for _, status in results if status == "completed")
+        log.info("✅ Batch answered", extra={
+            "task_id": task_id, "questions": len(questions), "answered": answered
+        })
+        state = TaskState.completed if answered else TaskState.failed
+        if state == TaskState.completed:
+            self.metrics.tasks.inc("completed")
+        else:
+            self._record_failure("failed", "batch")
+
+        if streaming:
+            await self._report_state(state, event_queue, updater, streaming)
+            return
+
+        response_msg = Message(
+            messageId=str(uuid.uuid4()),
+            role="agent",
+            parts=[
+                TextPart(text=answer, metadata={"index": index, "question": question, "status": status})
+                for index, (question, (answer, status)) in enumerate(zip(questions, results))
+            ]
         )
+        await self._publish(event_queue, event_queue.enqueue_event(response_msg))
+        await self._report_state(state, event_queue, updater, streaming)
+
+    def _record_failure(self, outcome: str, reason: str) -> None:
+        self.metrics.tasks.inc(outcome)
+        self.metrics.failures.inc(reason)
+
+    @staticmethod
+    def _failure_reason(error: Exception) -> str:
+        """Low-cardinality failure label for an unexpected exception."""
+        if isinstance(error, httpx.TimeoutException):
+            return "timeout"
+        if isinstance(error, httpx.ConnectError):
+            return "connect"
+        if isinstance(error, httpx.TransportError):
+            return "transport"
+        return type(error).__name__
+
+    def watch_cancellations(self, task_store) -> None:
+        """
+        Start polling `task_store` for tasks canceled on another worker.
+        
+        tasks/cancel runs on whichever worker receives it. That worker stores
+        the task as canceled; this one finds its running task finished in the
+        shared store within CANCEL_POLL_SECONDS, aborts the Cortex call and
+        ends the client's stream as canceled. Needs a store shared by all
+        workers (the SQLite task store); CANCEL_POLL_SECONDS=0 disables it.
+        """
+        if self.cancel_poll <= 0 or not hasattr(task_store, "finished_elsewhere"):
+            return
+        self._cancel_watcher = asyncio.create_task(self._watch_cancellations(task_store))
+
+    async def _watch_cancellations(self, task_store) -> None:
+        while True:
+            await asyncio.sleep(self.cancel_poll)
+            if not self.inflight_tasks:
+                continue
+            try:
+                task_ids = await task_store.finished_elsewhere()
+            except Exception as e:
+                log.warning("⚠️ Cancel watch failed", extra={"error": str(e)})
+                continue
+            for task_id in task_ids:
+                running = self.inflight_tasks.pop(task_id, None)
+                if running is not None and not running.done():
+                    self._canceled_elsewhere.add(task_id)
+                    running.cancel()
+                    log.info("🛑 Task canceled on another worker", extra={"task_id": task_id})
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        """
+        Handle task cancellation requests.
+        
+        Aborts the task's in-flight Cortex call: the CancelledError raised
+        inside execute() closes the upstream stream, returns its connection
+        to the pool and stops parsing. Identical questions coalesced onto
+        this call start their own. Then publishes the final canceled status.
+        """
+        running = self.inflight_tasks.pop(context.task_id, None)
+        if running is not None and not running.done():
+            running.cancel()
+            log.info("🛑 Cancelled in-flight Cortex call", extra={"task_id": context.task_id})
+        
+        updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+        await updater.cancel()
@@ -0,0 +1,90 @@
+"""
+HTTP connection pool for the Snowflake Cortex A2A Agent.
+Builds the long-lived async client the executor shares across tasks.
+"""
+import os
+import importlib.util
+import httpx
+
+
+class PoolStats:
+    """
+    Counts pool checkouts and how many of them reused a warm connection.
+
+    Fed by httpcore trace events, so it sees exactly when a request had to
+    open a TCP connection or perform a TLS handshake.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+
+    @property
+    def reused(self) -> int:
+        """Checkouts that were served by an already open connection."""
+        return max(self.checkouts - self.new_connections, 0)
+
+    async def on_request(self, request: httpx.Request) -> None:
+        """httpx request hook: count the checkout and attach the tracer."""
+        self.checkouts += 1
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.new_connections += 1
+        elif event_name == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+
+    def snapshot(self) -> dict:
+        """Current counters as a plain dict."""
+        return {
+            "checkouts": self.checkouts,
+            "new_connections": self.new_connections,
+            "reused": self.reused,
+            "tls_handshakes": self.tls_handshakes,
+        }
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (pip install httpx[http2])."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_http_client(stats: PoolStats | None = None) -> httpx.AsyncClient:
+    """
+    Create the shared keep-alive client for Snowflake API calls.
+
+    Every call from the executor targets the single Snowflake host, so the
+    pool-wide connection limits are effectively per-host limits.
+
+    Environment:
+        HTTP_MAX_CONNECTIONS: Open connections allowed at once (default 100)
+        HTTP_MAX_KEEPALIVE: Idle connections kept warm for reuse (default 20)
+        HTTP_KEEPALIVE_EXPIRY: Seconds an idle connection is kept (default 60)
+        HTTP_CONNECT_TIMEOUT: TCP+TLS connect timeout in seconds (default 10)
+        HTTP_READ_TIMEOUT: Max gap between received bytes in seconds (default 120)
+        HTTP_WRITE_TIMEOUT: Request upload timeout in seconds (default 30)
+        HTTP_POOL_TIMEOUT: Max wait for a free pooled connection in seconds (default 30)
+        HTTP2_ENABLED: Negotiate HTTP/2 when `h2` is installed (default true)
+    """
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+    )
+    timeout = httpx.Timeout(
+        connect=float(os.getenv("HTTP_CONNECT_TIMEOUT", "10")),
+        read=float(os.getenv("HTTP_READ_TIMEOUT", "120")),
+        write=float(os.getenv("HTTP_WRITE_TIMEOUT", "30")),
+        pool=float(os.getenv("HTTP_POOL_TIMEOUT", "30"))
+    )
+    http2 = os.getenv("HTTP2_ENABLED", "true").lower() in ("1", "true", "yes") and http2_available()
+    event_hooks = {"request": [stats.on_request]} if stats else {}
+
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=timeout,
+        http2=http2,
+        event_hooks=event_hooks
+    )
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Load generator for the Snowflake Cortex A2A Agent.
+
+Drives a running A2A server with a mix of message/send and message/stream
+calls and reports throughput, latency percentiles (p50/p90/p99/p999),
+time-to-first-chunk for streams and an error breakdown. The report can be
+written as JSON and compared against an earlier run, so changes to main.py
+or executor.py can be measured against a baseline.
+
+Two arrival models are supported:
+- Closed loop (default): --concurrency workers each send the next request
+  as soon as their previous one finishes.
+- Open loop (--rate N): requests are scheduled at N per second regardless
+  of how fast the server answers, with at most --concurrency in flight.
+  Latency is measured from the scheduled start, so time spent waiting for
+  a free slot counts (no coordinated omission).
+
+Usage:
+    python load_test.py [--url URL] [--duration S] [--concurrency N] [--rate N]
+                        [--stream-ratio F] [--prompts FILE] [--json OUT] [--compare BASELINE]
+
+Examples:
+    python load_test.py --duration 30 --concurrency 10
+    python load_test.py --rate 5 --duration 60 --stream-ratio 0.5 --prompts load_prompts.txt
+    python load_test.py --json after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import httpx
+
+
+BASE_URL = "http://localhost:8000"
+AGENT_CARD_PATH = "/.well-known/agent.json"
+DEFAULT_PROMPT = "What data do you have access to?"
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+@dataclass
+class Sample:
+    """Outcome of one request."""
+    method: str
+    latency: float
+    first_chunk: float | None = None
+    error: str | None = None
+
+
+def load_prompts(path: str | None, default: str = DEFAULT_PROMPT) -> list[str]:
+    """
+    Read the prompt corpus.
+
+    Args:
+        path: A JSON file holding a list of strings, or a text file with one
+            prompt per line (blank lines and lines starting with # are skipped).
+            None uses `default` as the only prompt.
+        default: Prompt used without a corpus file
+
+    Returns:
+        The prompts, in file order
+    """
+    if not path:
+        return [default]
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    if path.endswith(".json"):
+        prompts = [str(p) for p in json.loads(content)]
+    else:
+        prompts = [line.strip() for line in content.splitlines()
+                   if line.strip() and not line.lstrip().startswith("#")]
+    if not prompts:
+        raise ValueError(f"No prompts in {path}")
+    return prompts
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of `values` (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * pct / 100) - 1)]
+
+
+def _payload(method: str, query: str) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "method": method,
+        "id": str(uuid.uuid4()),
+        "params": {
+            "message": {
+                "messageId": str(uuid.uuid4()),
+                "role": "user",
+                "parts": [{"kind": "text", "text": query}]
+            }
+        }
+    }
+
+
+def _result_error(result: dict) -> str | None:
+    """Error label for a message/send result or a final stream event, if it failed."""
+    if result.get("kind") in ("task", "status-update"):
+        state = result.get("status", {}).get("state")
+        if state in ("failed", "rejected", "canceled"):
+            return f"task_{state}"
+    return None
+
+
+async def send_one(client: httpx.AsyncClient, url: str, query: str) -> tuple[float | None, str | None]:
+    """One message/send call; returns (first chunk time, error label)."""
+    response = await client.post(url, json=_payload("message/send", query))
+    if response.status_code != 200:
+        return None, f"http_{response.status_code}"
+    body = response.json()
+    if "error" in body:
+        return None, f"jsonrpc_{body['error'].get('code')}"
+    return None, _result_error(body.get("result", {}))
+
+
+async def stream_one(client: httpx.AsyncClient, url: str, query: str,
+                     start: float) -> tuple[float | None, str | None]:
+    """One message/stream call; returns (seconds to the first text chunk, error label)."""
+    first_chunk = None
+    error = None
+    async with client.stream("POST", url, json=_payload("message/stream", query),
+                             headers={"Accept": "text/event-stream"}) as response:
+        if response.status_code != 200:
+            return None, f"http_{response.status_code}"
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            try:
+                event = json.loads(line[5:].strip())
+            except json.JSONDecodeError:
+                continue
+            if "error" in event:
+                return first_chunk, f"jsonrpc_{event['error'].get('code')}"
+            result = event.get("result", {})
+            if first_chunk is None and result.get("kind") in ("artifact-update", "message"):
+                parts = result.get("artifact", result).get("parts", [])
+                if any(part.get("text") for part in parts):
+                    first_chunk = time.perf_counter() - start
+            if result.get("final"):
+                error = _result_error(result)
+    return first_chunk, error
+
+
+async def timed_request(client: httpx.AsyncClient, url: str, query: str,
+                        streaming: bool, start: float) -> Sample:
+    """
+    Run one request and classify its outcome.
+
+    Args:
+        client: Shared HTTP client
+        url: JSON-RPC endpoint of the A2A server
+        query: Question to send
+        streaming: Use message/stream instead of message/send
+        start: perf_counter() value latency is measured from
+
+    Returns:
+        The request's Sample
+    """
+    method = "message/stream" if streaming else "message/send"
+    first_chunk = None
+    try:
+        if streaming:
+            first_chunk, error = await stream_one(client, url, query, start)
+        else:
+            first_chunk, error = await send_one(client, url, query)
+    except httpx.TimeoutException:
+        error = "timeout"
+    except httpx.ConnectError:
+        error = "connect"
+    except httpx.HTTPError as e:
+        error = type(e).__name__
+    return Sample(method, time.perf_counter() - start, first_chunk, error)
+
+
+async def run_load(url: str, prompts: list[str], duration: float, concurrency: int,
+                   rate: float = 0.0, stream_ratio: float = 0.0, timeout: float = 120.0,
+                   seed: int | None = None) -> tuple[list[Sample], float]:
+    """
+    Generate load for `duration` seconds and collect one Sample per request.
+
+    Args:
+        url: JSON-RPC endpoint of the A2A server
+        prompts: Corpus; requests cycle through it in order
+        duration: Seconds during which new requests are started
+        concurrency: Closed-loop workers, or the in-flight cap with `rate`
+        rate: Open-loop arrivals per second (0 = closed loop)
+        stream_ratio: Fraction of requests sent as message/stream
+        timeout: Per-request timeout in seconds
+        seed: Seed for the send/stream mix
+
+    Returns:
+        (samples, wall seconds until the last request finished)
+    """
+    rng = random.Random(seed)
+    samples: list[Sample] = []
+    counter = 0
+
+    def next_request() -> tuple[str, bool]:
+        nonlocal counter
+        query = prompts[counter % len(prompts)]
+        counter += 1
+        return query, rng.random() < stream_ratio
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        begin = time.perf_counter()
+        deadline = begin + duration
+
+        if rate > 0:
+            slots = asyncio.Semaphore(concurrency)
+
+            async def scheduled(query: str, streaming: bool, start: float) -> None:
+                async with slots:
+                    samples.append(await timed_request(client, url, query, streaming, start))
+
+            tasks = []
+            scheduled_at = begin
+            while scheduled_at < deadline:
+                await asyncio.sleep(max(0.0, scheduled_at - time.perf_counter()))
+                query, streaming = next_request()
+                tasks.append(asyncio.create_task(scheduled(query, streaming, scheduled_at)))
+                scheduled_at += 1 / rate
+            await asyncio.gather(*tasks)
+        else:
+            async def worker() -> None:
+                while time.perf_counter() < deadline:
+                    query, streaming = next_request()
+                    samples.append(await timed_request(client, url, query, streaming, time.perf_counter()))
+
+            await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+        return samples, time.perf_counter() - begin
+
+
+def _latency_stats(values: list[float]) -> dict:
+    stats = {f"p{pct:g}": round(percentile(values, pct) * 1000, 1) for pct in PERCENTILES}
+    stats["mean"] = round(sum(values) / len(values) * 1000, 1) if values else 0.0
+    stats["max"] = round(max(values) * 1000, 1) if values else 0.0
+    return stats
+
+
+def summarize(samples: list[Sample], wall: float, config: dict) -> dict:
+    """
+    Build the JSON-serializable report for one run.
+
+    Latency figures are in milliseconds and cover successful requests only;
+    failures are counted in `errors` by label (http_503, jsonrpc_-32603,
+    task_failed, timeout, connect, ...).
+    """
+    ok = [s for s in samples if s.error is None]
+    errors: dict[str, int] = {}
+    for s in samples:
+        if s.error is not None:
+            errors[s.error] = errors.get(s.error, 0) + 1
+
+    by_method = {}
+    for method in ("message/send", "message/stream"):
+        method_ok = [s.latency for s in ok if s.method == method]
+        count = sum(1 for s in samples if s.method == method)
+        if count:
+            by_method[method] = {"requests": count, "ok": len(method_ok), **_latency_stats(method_ok)}
+
+    first_chunks = [s.first_chunk for s in ok if s.first_chunk is not None]
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": config,
+        "wall_seconds": round(wall, 3),
+        "requests": len(samples),
+        "ok": len(ok),
+        "error_rate": round(1 - len(ok) / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(ok) / wall, 2) if wall else 0.0,
+        "latency_ms": _latency_stats([s.latency for s in ok]),
+        "by_method": by_method,
+        "time_to_first_chunk_ms": _latency_stats(first_chunks) if first_chunks else None,
+        "errors": errors,
+    }
+
+
+def print_report(report: dict) -> None:
+    """Print a run report in the console format of the other scripts."""
+    latency = report["latency_ms"]
+    print(f"\n📊 {report['requests']} requests in {report['wall_seconds']:.1f}s: "
+          f"{report['ok']} ok, {report['throughput_rps']:.2f} req/s, "
+          f"error rate {report['error_rate'] * 100:.1f}%")
+    print("   Latency (ms):     " + "  ".join(f"{key} {latency[key]:8.1f}" for key in latency))
+    for method, stats in report["by_method"].items():
+        print(f"   {method:<17} {stats['ok']}/{stats['requests']} ok, "
+              f"p50 {stats['p50']:.1f} ms, p99 {stats['p99']:.1f} ms")
+    if report["time_to_first_chunk_ms"]:
+        ttfc = report["time_to_first_chunk_ms"]
+        print(f"   Time to first chunk (ms): p50 {ttfc['p50']:.1f}, p90 {ttfc['p90']:.1f}, p99 {ttfc['p99']:.1f}")
+    if report["errors"]:
+        print("   ❌ Errors: " + ", ".join(f"{label} x{count}" for label, count in
+                                         sorted(report["errors"].items(), key=lambda item: -item[1])))
+
+
+def print_comparison(report: dict, baseline: dict) -> None:
+    """Print throughput and latency changes relative to a baseline report."""
+
+    def change(new: float, old: float) -> str:
+        return f"{(new - old) / old * 100:+6.1f}%" if old else "   n/a"
+
+    print(f"\n🔁 Compared with baseline from {baseline.get('timestamp', '?')}")
+    print(f"   throughput  {baseline['throughput_rps']:8.2f} -> {report['throughput_rps']:8.2f} req/s  "
+          f"{change(report['throughput_rps'], baseline['throughput_rps'])}")
+    for key in report["latency_ms"]:
+        old, new = baseline["latency_ms"].get(key, 0.0), report["latency_ms"][key]
+        print(f"   {key:<11} {old:8.1f} -> {new:8.1f} ms     {change(new, old)}")
+    print(f"   error rate  {baseline['error_rate'] * 100:7.1f}% -> {report['error_rate'] * 100:7.1f}%")
+
+
+async def run_load_test(url: str, duration: float = 30.0, concurrency: int = 10, rate: float = 0.0,
+                        stream_ratio: float = 0.0, prompts_path: str | None = None,
+                        json_path: str | None = None, compare_path: str | None = None,
+                        timeout: float = 120.0, seed: int | None = None,
+                        default_prompt: str = DEFAULT_PROMPT) -> dict:
+    """
+    Run a load test against `url` and print (and optionally save) the report.
+
+    Args:
+        url: Base URL of the A2A server
+        duration: Seconds during which new requests are started
+        concurrency: Closed-loop workers, or the in-flight cap in open-loop mode
+        rate: Open-loop arrivals per second (0 = closed loop)
+        stream_ratio: Fraction of requests sent as message/stream
+        prompts_path: Prompt corpus file (see load_prompts)
+        json_path: Write the report here as JSON
+        compare_path: Earlier JSON report to compare with
+        timeout: Per-request timeout in seconds
+        seed: Seed for the send/stream mix
+        default_prompt: Prompt used when no corpus file is given
+
+    Returns:
+        The report dict
+    """
+    prompts = load_prompts(prompts_path, default_prompt)
+    config = {
+        "url": url, "duration": duration, "concurrency": concurrency, "rate": rate,
+        "stream_ratio": stream_ratio, "prompts": prompts_path, "prompt_count": len(prompts),
+    }
+    mode = f"open loop at {rate:g} req/s (max {concurrency} in flight)" if rate > 0 \
+        else f"closed loop, {concurrency} workers"
+
+    print("\n🏋️ A2A Load Test")
+    print(f"   Server: {url}")
+    print(f"   {duration:g}s, {mode}, {stream_ratio * 100:.0f}% message/stream, {len(prompts)} prompt(s)")
+    print("=" * 60)
+
+    async with httpx.AsyncClient() as client:
+        card = (await client.get(f"{url.rstrip('/')}{AGENT_CARD_PATH}")).json()
+    config["agent"] = {"name": card.get("name"), "version": card.get("version")}
+
+    samples, wall = await run_load(f"{url.rstrip('/')}/", prompts, duration, concurrency,
+                                   rate, stream_ratio, timeout, seed)
+    report = summarize(samples, wall, config)
+    print_report(report)
+
+    if compare_path:
+        with open(compare_path, encoding="utf-8") as f:
+            print_comparison(report, json.load(f))
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report saved to {json_path}")
+    return report
+
+
+def add_load_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the load-test options (shared with test_a2a.py --load)."""
+    group = parser.add_argument_group("load test")
+    group.add_argument("--duration", type=float, default=30.0, help="Seconds to generate load (default: 30)")
+    group.add_argument("--concurrency", type=int, default=10,
+                       help="Closed-loop workers, or max in flight with --rate (default: 10)")
+    group.add_argument("--rate", type=float, default=0.0, help="Open-loop arrivals per second (default: closed loop)")
+    group.add_argument("--stream-ratio", type=float, default=0.0,
+                       help="Fraction of requests sent as message/stream (default: 0)")
+    group.add_argument("--prompts", help="Prompt corpus: one prompt per line, or a JSON list")
+    group.add_argument("--json", dest="json_path", help="Write the report to this JSON file")
+    group.add_argument("--compare", help="Compare with an earlier JSON report")
+    group.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    group.add_argument("--seed", type=int, help="Seed for the send/stream mix")
+
+
+def load_test_from_args(args: argparse.Namespace):
+    """Coroutine running run_load_test with the options added by add_load_arguments."""
+    return run_load_test(
+        args.url, args.duration, args.concurrency, args.rate, args.stream_ratio,
+        args.prompts, args.json_path, args.compare, args.timeout, args.seed,
+        getattr(args, "query", DEFAULT_PROMPT)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Snowflake Cortex A2A Agent")
+    parser.add_argument("--url", default=BASE_URL, help="Base URL of the A2A server (default: http://localhost:8000)")
+    add_load_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        report = asyncio.run(load_test_from_args(args))
+    except httpx.ConnectError:
+        print(f"\n❌ Connection Error: Could not connect to {args.url}")
+        sys.exit(1)
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
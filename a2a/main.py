@@ -5,21 +5,30 @@ This server exposes any Snowflake Cortex Agent via the A2A protocol,
 allowing other AI agents to interact with it through a standardized interface.
 """
 import os
-import uvicorn
+import asyncio
+import contextlib
 from dotenv import load_dotenv
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCard, AgentSkill, AgentCapabilities
 
 # Import our custom executor
+from agent_logging import get_logger, setup_logging, shutdown_logging
+from batch import BATCH_SKILL_ID
 from executor import SnowflakeCortexExecutor
+from metrics import build_shared_metrics
+from task_store import build_task_store
 
 load_dotenv()
 
+log = get_logger("main")
+
 
 def create_app() -> A2AStarletteApplication:
     """Create and configure the A2A Starlette application."""
+    setup_logging()
     
     # Get agent configuration from environment
     agent_name = os.getenv("AGENT_NAME", "cortex_agent")
@@ -41,12 +50,31 @@ def create_app() -> A2AStarletteApplication:
             "Answer questions about the data"
         ]
     )
+    
+    # Several questions in one message (text parts, a JSON list or a
+    # {"questions": [...]} data part), answered concurrently
+    batch_skill = AgentSkill(
+        id=BATCH_SKILL_ID,
+        name="Cortex Agent Batch Query",
+        description=(
+            f"Asks the Snowflake Cortex Agent ({agent_name}) several independent questions in parallel. "
+            "Send one text part per question, a JSON list of questions, or a data part with a "
+            "`questions` list; with message/stream each answer arrives as an artifact when ready."
+        ),
+        tags=["snowflake", "cortex", "batch", "analytics"],
+        examples=[
+            '["Current KPIs for region North", "Open critical alarms", "SLA exposure this week"]'
+        ],
+        input_modes=["text", "data"],
+        output_modes=["text"]
+    )
 
     # 2. Define Agent Capabilities
-    # Note: Full streaming support requires additional A2A SDK configuration
-    # Currently using non-streaming mode for simplicity
+    # message/stream sends the answer as TaskArtifactUpdateEvent chunks of one
+    # `answer` artifact: the first creates it, later ones have append=true and
+    # the final chunk has lastChunk=true (batch answers are one artifact each)
     capabilities = AgentCapabilities(
-        streaming=False,
+        streaming=True,
         push_notifications=False
     )
 
@@ -56,7 +84,7 @@ def create_app() -> A2AStarletteApplication:
         description=agent_description,
         url=os.getenv("AGENT_URL", "http://localhost:8000"),
         version="1.0.0",
-        skills=[cortex_skill],
+        skills=[cortex_skill, batch_skill],
         capabilities=capabilities,
         defaultInputModes=["text"],
         defaultOutputModes=["text"]
@@ -64,7 +92,7 @@ def create_app() -> A2AStarletteApplication:
 
     # 4. Create the request handler with executor and task store
     executor = SnowflakeCortexExecutor()
-    task_store = InMemoryTaskStore()
+    task_store = build_task_store()
     request_handler = DefaultRequestHandler(
         agent_executor=executor,
         task_store=task_store
@@ -76,14 +104,52 @@ def create_app() -> A2AStarletteApplication:
         http_handler=request_handler
     )
     
+    # Metrics summed across workers (METRICS_DIR), None with a single worker
+    shared_metrics = build_shared_metrics(executor.metrics)
+
+    # Watch the shared task store for cross-worker cancels and publish this
+    # worker's metrics; release the executor's pooled upstream connections
+    # and the task store on shutdown
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        executor.watch_cancellations(task_store)
+        metrics_writer = asyncio.create_task(shared_metrics.run()) if shared_metrics else None
+        yield
+        if metrics_writer is not None:
+            metrics_writer.cancel()
+            await shared_metrics.write()
+        await executor.aclose()
+        if hasattr(task_store, "close"):
+            task_store.close()
+        shutdown_logging()
+
     # Build the Starlette ASGI app
     # Routes:
     #  - /.well-known/agent.json (Discovery)
     #  - / (JSON-RPC endpoint for tasks)
+    #  - /cache/stats (answer cache / coalescing counters)
+    #  - /metrics (Prometheus latency histograms and counters, summed across workers)
     starlette_app = a2a_app.build(
         agent_card_url="/.well-known/agent.json",
-        rpc_url="/"
+        rpc_url="/",
+        lifespan=lifespan
     )
+    starlette_app.state.executor = executor
+
+    async def metrics(request: Request) -> PlainTextResponse:
+        body = await shared_metrics.render() if shared_metrics else executor.metrics.render()
+        return PlainTextResponse(
+            body,
+            media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+    starlette_app.add_route("/metrics", metrics, methods=["GET"])
+
+    if executor.cache is not None:
+        async def cache_stats(request: Request) -> JSONResponse:
+            return JSONResponse(executor.cache.snapshot())
+
+        starlette_app.add_route("/cache/stats", cache_stats, methods=["GET"])
     
     return starlette_app
 
@@ -93,10 +159,8 @@ app = create_app()
 
 
 if __name__ == "__main__":
+    # Production settings by default; pass --dev for auto-reload
+    import serve
     agent_name = os.getenv("AGENT_NAME", "cortex_agent")
-    print(f"🚀 Starting Snowflake Cortex A2A Agent: {agent_name}")
-    print("=" * 50)
-    print("📋 Discovery endpoint: http://localhost:8000/.well-known/agent.json")
-    print("📨 Task endpoint: http://localhost:8000/")
-    print("=" * 50)
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    log.info("🚀 Starting Snowflake Cortex A2A Agent", extra={"agent_name": agent_name})
+    serve.main()
@@ -0,0 +1,315 @@
+"""
+Prometheus metrics for the Snowflake Cortex A2A Agent.
+
+A small, dependency-free implementation of counters, histograms and
+callback gauges rendered in the Prometheus text exposition format (0.0.4).
+Observations are a bisect plus two additions, cheap enough for the
+per-delta hot path. Values live in each worker process. A scrape reaches
+only one worker, so with several workers SharedMetrics aggregates them
+through a shared directory (METRICS_DIR): every worker writes its state
+there periodically and /metrics sums the counters and histograms of all
+workers and reports gauges per worker with a `worker` label.
+"""
+import asyncio
+import glob
+import json
+import os
+import time
+from bisect import bisect_left
+from typing import Callable
+
+
+# Seconds: sub-millisecond auth cache hits up to the 120 s read timeout
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 90.0, 120.0)
+# Bytes of SSE read from Cortex per task
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+# Events waiting in the task's EventQueue when a new one is enqueued
+DEPTH_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+# Streamed events per answer, deltas per event
+COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 1000, 5000)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels."""
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def state(self) -> list:
+        """JSON-serializable values, for SharedMetrics."""
+        return [[list(labels), value] for labels, value in self._values.items()]
+
+    def render(self, peers: list = (), worker: str | None = None) -> list[str]:
+        """Render, adding the values of other workers' state() in `peers`."""
+        values = dict(self._values)
+        for _, state, _ in peers:
+            for labels, value in state:
+                values[tuple(labels)] = values.get(tuple(labels), 0) + value
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram, optionally split by labels."""
+
+    def __init__(self, name: str, help: str, buckets: tuple, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labelnames = labelnames
+        self._series = {}
+
+    def observe(self, value: float, *labels) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            # [per-bucket counts (last is +Inf), sum]
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def state(self) -> list:
+        """JSON-serializable series, for SharedMetrics."""
+        return [[list(labels), list(counts), total] for labels, (counts, total) in self._series.items()]
+
+    def render(self, peers: list = (), worker: str | None = None) -> list[str]:
+        """Render, adding the series of other workers' state() in `peers`."""
+        series = {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+        for _, state, _ in peers:
+            for labels, counts, total in state:
+                own = series.get(tuple(labels))
+                if own is None:
+                    series[tuple(labels)] = (list(counts), total)
+                else:
+                    series[tuple(labels)] = ([a + b for a, b in zip(own[0], counts)], own[1] + total)
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class GaugeFunc:
+    """
+    Gauge read from a callback at scrape time.
+
+    The callback returns a number, or a dict of {label value: number} when
+    a label name is given.
+    """
+
+    def __init__(self, name: str, help: str, fn: Callable, labelname: str | None = None):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.labelname = labelname
+
+    def state(self):
+        """The current value, for SharedMetrics."""
+        return self.fn()
+
+    def render(self, peers: list = (), worker: str | None = None) -> list[str]:
+        """
+        Render this worker's value and, with a `worker` label, those of live peers.
+
+        Gauges describe one process right now, so they are not summed;
+        peers whose state is stale (a worker that exited) are left out.
+        """
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        workers = [(worker, self.fn())] + [(peer, state) for peer, state, live in peers if live]
+        for worker_id, value in sorted(workers, key=lambda item: item[0] or ""):
+            names = ("worker",) if worker_id is not None else ()
+            values = (worker_id,) if worker_id is not None else ()
+            if self.labelname is None:
+                lines.append(f"{self.name}{_format_labels(names, values)} {_format_value(value)}")
+            else:
+                for label, item in sorted(value.items()):
+                    labels = _format_labels(names + (self.labelname,), values + (label,))
+                    lines.append(f"{self.name}{labels} {_format_value(item)}")
+        return lines
+
+
+class CortexMetrics:
+    """
+    The agent's metrics registry.
+
+    Phases observed in cortex_phase_seconds:
+        auth: obtaining the JWT (a cache hit unless it is being re-signed)
+        connect: POST sent until Cortex response headers (time to first byte)
+        first_delta: POST sent until the first text delta
+        full_answer: POST sent until the end of the Cortex stream
+        enqueue: one event published to the task's EventQueue
+        publish_lag: a streamed delta read from Cortex until the event carrying it is published
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.phase_seconds = Histogram(
+            "cortex_phase_seconds", "Time spent per task phase", LATENCY_BUCKETS, ("phase",)
+        )
+        self.sse_bytes = Histogram(
+            "cortex_sse_bytes", "Bytes read from the Cortex response per upstream call", BYTES_BUCKETS
+        )
+        self.queue_depth = Histogram(
+            "a2a_event_queue_depth", "Events already queued when an event is enqueued", DEPTH_BUCKETS
+        )
+        self.stream_events = Histogram(
+            "a2a_stream_events_per_answer", "Artifact-update events published per streamed answer", COUNT_BUCKETS
+        )
+        self.stream_deltas_per_event = Histogram(
+            "a2a_stream_deltas_per_event", "Cortex text deltas coalesced into one artifact-update event",
+            COUNT_BUCKETS
+        )
+        self.tasks = Counter("a2a_tasks_total", "Finished A2A tasks by outcome", ("outcome",))
+        self.failures = Counter("a2a_task_failures_total", "Failed or rejected tasks by reason", ("reason",))
+        self.upstream_responses = Counter(
+            "cortex_upstream_responses_total", "Cortex agents:run responses by HTTP status", ("status",)
+        )
+        self.retries = Counter("cortex_upstream_retries_total", "Cortex calls retried after 429/503", ("status",))
+        self.error_events = Counter("cortex_error_events_total", "Error events inside Cortex SSE streams")
+        self.batch_questions = Counter(
+            "a2a_batch_questions_total", "Questions answered inside batch messages by status", ("status",)
+        )
+        self._metrics = [
+            self.phase_seconds, self.sse_bytes, self.queue_depth, self.stream_events,
+            self.stream_deltas_per_event, self.tasks, self.failures,
+            self.upstream_responses, self.retries, self.error_events, self.batch_questions,
+            GaugeFunc("a2a_uptime_seconds", "Seconds since this worker started", lambda: time.time() - self.started),
+        ]
+
+    def add(self, metric) -> None:
+        """Register another metric (e.g. a GaugeFunc over component counters)."""
+        self._metrics.append(metric)
+
+    def state(self) -> dict:
+        """Every metric's state() by name, for SharedMetrics."""
+        return {metric.name: metric.state() for metric in self._metrics}
+
+    def render(self, peers: list = (), worker: str | None = None) -> str:
+        """
+        All metrics in the Prometheus text exposition format.
+
+        Args:
+            peers: (worker id, CortexMetrics.state(), live) of the other workers
+            worker: This worker's id, to label gauges with (None: no label)
+        """
+        lines = []
+        for metric in self._metrics:
+            metric_peers = [(peer, state[metric.name], live) for peer, state, live in peers
+                            if metric.name in state]
+            lines.extend(metric.render(metric_peers, worker))
+        return "\n".join(lines) + "\n"
+
+
+class SharedMetrics:
+    """
+    Aggregates a CortexMetrics registry across worker processes.
+
+    Each worker writes its state to `<path>/<pid>.json` every `interval`
+    seconds and at shutdown; render() combines this worker's live values
+    with the other files. Counter and histogram totals of workers that have
+    exited are kept, so the sums stay monotonic; their gauges are dropped
+    once the file is older than three intervals. The directory must be
+    emptied when the server starts (serve.py does this).
+    """
+
+    def __init__(self, metrics: CortexMetrics, path: str, interval: float = 5.0):
+        """
+        Args:
+            metrics: This worker's registry
+            path: Directory shared by all workers of one server
+            interval: Seconds between writes of this worker's state
+        """
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.worker = str(os.getpid())
+        self._file = os.path.join(path, f"{self.worker}.json")
+        os.makedirs(path, exist_ok=True)
+
+    async def run(self) -> None:
+        """Write this worker's state every interval until cancelled."""
+        while True:
+            await self.write()
+            await asyncio.sleep(self.interval)
+
+    async def write(self) -> None:
+        """Write this worker's state (snapshotted on the event loop, written in a thread)."""
+        await asyncio.to_thread(self._write, json.dumps(self.metrics.state()))
+
+    async def render(self) -> str:
+        """All workers' metrics in the Prometheus text exposition format."""
+        peers = await asyncio.to_thread(self._read_peers)
+        return self.metrics.render(peers, self.worker)
+
+    def _write(self, data: str) -> None:
+        # Write then rename, so readers never see a partial file
+        tmp = f"{self._file}.tmp"
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, self._file)
+
+    def _read_peers(self) -> list:
+        peers = []
+        stale_before = time.time() - 3 * self.interval
+        for file in glob.glob(os.path.join(self.path, "*.json")):
+            if file == self._file:
+                continue
+            try:
+                with open(file) as f:
+                    state = json.load(f)
+                live = os.path.getmtime(file) >= stale_before
+            except (OSError, ValueError):
+                continue
+            peers.append((os.path.basename(file)[:-len(".json")], state, live))
+        return peers
+
+
+def build_shared_metrics(metrics: CortexMetrics) -> SharedMetrics | None:
+    """
+    Create the cross-worker aggregator when METRICS_DIR is set.
+
+    Environment:
+        METRICS_DIR: Directory shared by the workers (serve.py sets one up for --workers > 1)
+        METRICS_FLUSH_SECONDS: Seconds between writes of a worker's state (default 5)
+    """
+    path = os.getenv("METRICS_DIR")
+    if not path:
+        return None
+    return SharedMetrics(metrics, path, interval=float(os.getenv("METRICS_FLUSH_SECONDS", "5")))
@@ -0,0 +1,267 @@
+"""
+Answer cache for the Snowflake Cortex A2A Agent.
+
+ResponseCache stores final Cortex answers keyed on the normalized prompt,
+the agent identity and an optional client-supplied freshness hint. Entries
+expire after a TTL and the in-memory tier is LRU-bounded; an optional SQLite
+tier keeps answers across restarts and shares them between uvicorn workers.
+Identical questions that arrive while an upstream call is running wait for
+that call instead of starting their own (single-flight).
+"""
+import os
+import re
+import time
+import sqlite3
+import asyncio
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    latency REAL NOT NULL,
+    answer TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_created ON responses (created_at);
+"""
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Where a cached answer came from
+MISS = "miss"
+HIT = "hit"
+DISK_HIT = "disk_hit"
+COALESCED = "coalesced"
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Canonical form of a question for cache lookups.
+
+    Case, Unicode compatibility forms, runs of whitespace and trailing
+    punctuation are ignored, so "What data do you have access to?" and
+    "what data do you  have access to" share an entry.
+    """
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return text.rstrip("?!. ")
+
+
+class ResponseCache:
+    """
+    TTL + LRU answer cache with single-flight coalescing.
+
+    Only successful, non-empty answers are stored. Counters track memory
+    hits, disk hits, misses, coalesced waiters and the upstream latency that
+    hits avoided (the recorded latency of the call that produced the entry).
+    """
+
+    def __init__(self, agent_id: str, ttl_seconds: float = 300, max_entries: int = 1024,
+                 disk_path: str | None = None, max_disk_entries: int = 10000):
+        """
+        Args:
+            agent_id: Agent identity, e.g. DATABASE.SCHEMA.AGENT_NAME
+            ttl_seconds: Age after which an answer is no longer served
+            max_entries: Answers kept in memory (least recently used go first)
+            disk_path: Optional SQLite file for the on-disk tier
+            max_disk_entries: Answers kept on disk (oldest go first)
+        """
+        self.agent_id = agent_id
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._inflight = {}
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.saved_seconds = 0.0
+
+        self._conn = None
+        self._lock = threading.Lock()
+        if disk_path:
+            self._conn = sqlite3.connect(disk_path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def make_key(self, prompt: str, freshness: str | None = None) -> str:
+        """Cache key for a prompt; a different freshness hint gives a different entry."""
+        raw = "\x00".join((self.agent_id, normalize_prompt(prompt), freshness or ""))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get_or_fetch(self, prompt: str, fetch: Callable[[], Awaitable[str]],
+                           freshness: str | None = None) -> tuple[str, str]:
+        """
+        Return a cached answer, or call `fetch` once for all concurrent askers.
+
+        Args:
+            prompt: The user question
+            fetch: Coroutine factory performing the upstream call
+            freshness: Optional client hint (e.g. a data load timestamp)
+
+        Returns:
+            (answer, source) where source is MISS, HIT, DISK_HIT or COALESCED
+        """
+        key = self.make_key(prompt, freshness)
+
+        entry = self._memory_get(key)
+        if entry is not None:
+            self.hits += 1
+            self.saved_seconds += entry[1]
+            return entry[2], HIT
+
+        pending = self._inflight.get(key)
+        while pending is not None:
+            try:
+                answer, latency = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # The leader was cancelled, not us: take over the fetch
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                pending = self._inflight.get(key)
+                continue
+            self.coalesced += 1
+            self.saved_seconds += latency
+            return answer, COALESCED
+
+        future = asyncio.get_running_loop().create_future()
+        # Leaders without followers never retrieve the exception
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            if self._conn is not None:
+                entry = await asyncio.to_thread(self._disk_get, key)
+                if entry is not None:
+                    self.disk_hits += 1
+                    self.saved_seconds += entry[1]
+                    self._memory_put(key, entry)
+                    future.set_result((entry[2], entry[1]))
+                    return entry[2], DISK_HIT
+
+            self.misses += 1
+            start = time.monotonic()
+            answer = await fetch()
+            latency = time.monotonic() - start
+            if answer:
+                entry = (time.time(), latency, answer)
+                self._memory_put(key, entry)
+                if self._conn is not None:
+                    await asyncio.to_thread(self._disk_put, key, entry)
+            future.set_result((answer, latency))
+            return answer, MISS
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def invalidate(self) -> None:
+        """Drop every cached answer, in memory and on disk."""
+        self._memory.clear()
+        if self._conn is not None:
+            with self._lock:
+                self._conn.execute("DELETE FROM responses")
+
+    def snapshot(self) -> dict:
+        """Counters for logging and the /cache/stats route."""
+        lookups = self.hits + self.disk_hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "entries": len(self._memory),
+            "inflight": len(self._inflight),
+        }
+
+    def close(self) -> None:
+        """Close the on-disk tier."""
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+
+    def _fresh(self, entry) -> bool:
+        return time.time() - entry[0] < self.ttl_seconds
+
+    def _memory_get(self, key: str):
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if not self._fresh(entry):
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return entry
+
+    def _memory_put(self, key: str, entry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, latency, answer FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or not self._fresh(row):
+            return None
+        return row
+
+    def _disk_put(self, key: str, entry) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, created_at, latency, answer) VALUES (?, ?, ?, ?)",
+                (key, *entry)
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ? OR key IN ("
+                "  SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (time.time() - self.ttl_seconds, self.max_disk_entries)
+            )
+
+
+def build_response_cache(agent_id: str) -> ResponseCache | None:
+    """
+    Create the answer cache from the environment.
+
+    With RESPONSE_CACHE_ENABLED off, identical questions that are in flight
+    at the same time are still coalesced (nothing is stored) unless
+    REQUEST_COALESCING is off too, in which case None is returned.
+
+    Environment:
+        RESPONSE_CACHE_ENABLED: Turn the cache on (default false)
+        RESPONSE_CACHE_TTL_SECONDS: Age after which answers are refetched (default 300)
+        RESPONSE_CACHE_MAX_ENTRIES: Answers kept in memory (default 1024)
+        RESPONSE_CACHE_PATH: SQLite file for the on-disk tier (default unset, memory only)
+        RESPONSE_CACHE_MAX_DISK_ENTRIES: Answers kept on disk (default 10000)
+        REQUEST_COALESCING: Share one upstream call between identical in-flight questions (default true)
+    """
+    if not _env_flag("RESPONSE_CACHE_ENABLED", "false"):
+        if _env_flag("REQUEST_COALESCING", "true"):
+            return ResponseCache(agent_id, ttl_seconds=0, max_entries=0)
+        return None
+    return ResponseCache(
+        agent_id,
+        ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300")),
+        max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024")),
+        disk_path=os.getenv("RESPONSE_CACHE_PATH") or None,
+        max_disk_entries=int(os.getenv("RESPONSE_CACHE_MAX_DISK_ENTRIES", "10000"))
+    )
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
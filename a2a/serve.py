@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Production launcher for the Snowflake Cortex A2A Agent.
+
+Runs `main:app` under uvicorn with one worker process per available core,
+uvloop/httptools when they are installed, tuned keep-alive and accept
+backlog, and a graceful drain of in-flight tasks on SIGTERM. Auto-reload is
+only enabled in explicit dev mode.
+
+Usage:
+    python serve.py [--workers N] [--host HOST] [--port PORT] [--dev]
+
+Examples:
+    python serve.py                 # production, one worker per core
+    python serve.py --workers 4
+    python serve.py --dev           # single process with auto-reload
+"""
+import os
+import glob
+import argparse
+import tempfile
+import importlib.util
+import uvicorn
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def available_cores() -> int:
+    """CPU cores this process may run on (respects taskset/cpuset limits)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def default_workers() -> int:
+    """Worker count from WEB_CONCURRENCY, else one per available core."""
+    return int(os.getenv("WEB_CONCURRENCY", str(available_cores())))
+
+
+def event_loop_impl() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_impl() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def prepare_metrics_dir() -> str:
+    """
+    Create or empty METRICS_DIR, through which the workers aggregate /metrics.
+
+    Defaults to a fresh temporary directory. Files left by an earlier run
+    are removed so their counters are not added to this one's.
+    """
+    path = os.getenv("METRICS_DIR") or tempfile.mkdtemp(prefix="a2a-metrics-")
+    os.makedirs(path, exist_ok=True)
+    for file in glob.glob(os.path.join(path, "*.json")):
+        os.remove(file)
+    # Inherited by the worker processes
+    os.environ["METRICS_DIR"] = path
+    return path
+
+
+def run(host: str, port: int, workers: int, dev: bool = False) -> None:
+    """
+    Start the server.
+
+    Environment:
+        KEEPALIVE_TIMEOUT: Seconds an idle client connection is kept open (default 75)
+        BACKLOG: Pending connection queue per worker (default 2048)
+        SHUTDOWN_DRAIN_SECONDS: On SIGTERM, wait this long for in-flight tasks (default 30)
+        LIMIT_CONCURRENCY: Per-worker cap on concurrent connections, 503 beyond it (default unset)
+        METRICS_DIR: Directory the workers share /metrics state through (default: a temporary one)
+    """
+    print("=" * 50)
+    print(f"📋 Discovery endpoint: http://localhost:{port}/.well-known/agent.json")
+    print(f"📨 Task endpoint: http://localhost:{port}/")
+    print("=" * 50)
+
+    if dev:
+        print("🛠️  Dev mode: single worker with auto-reload")
+        uvicorn.run("main:app", host=host, port=port, reload=True)
+        return
+
+    if workers > 1 and os.getenv("TASK_STORE", "sqlite").lower() == "memory":
+        print("⚠️  TASK_STORE=memory is per process: tasks/get and tasks/cancel may miss "
+              "tasks run by other workers (use one worker or sticky routing)")
+
+    if workers > 1:
+        print(f"📊 /metrics sums all {workers} workers via {prepare_metrics_dir()}")
+
+    limit_concurrency = os.getenv("LIMIT_CONCURRENCY")
+    loop = event_loop_impl()
+    http = http_impl()
+    print(f"🚀 Serving on {host}:{port} with {workers} worker(s) ({loop} loop, {http} parser)")
+
+    uvicorn.run(
+        "main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        # Longer than typical load balancer idle timeouts, so the proxy
+        # closes idle connections first and never hits a closed socket
+        timeout_keep_alive=int(os.getenv("KEEPALIVE_TIMEOUT", "75")),
+        backlog=int(os.getenv("BACKLOG", "2048")),
+        # SIGTERM stops accepting connections, then waits for running tasks
+        timeout_graceful_shutdown=int(os.getenv("SHUTDOWN_DRAIN_SECONDS", "30")),
+        limit_concurrency=int(limit_concurrency) if limit_concurrency else None,
+        proxy_headers=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Snowflake Cortex A2A Agent")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"), help="Bind address")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")), help="Bind port")
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="Worker processes (default: WEB_CONCURRENCY or one per core)")
+    parser.add_argument("--dev", action="store_true", help="Single process with auto-reload")
+    args = parser.parse_args()
+
+    run(args.host, args.port, args.workers, dev=args.dev)
+
+
+if __name__ == "__main__":
+    main()
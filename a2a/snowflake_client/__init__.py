@@ -0,0 +1,23 @@
+"""
+Shared Snowflake REST client for the A2A agent and the test scripts.
+
+- auth: key loading, fingerprinting, JWT signing and the cached TokenProvider
+- endpoints: account, MCP server and agents:run URLs
+- session: pooled requests session with retries/backoff and KEYPAIR_JWT auth
+- mcp: MCP JSON-RPC client (tools/list, sql_exec_tool, analyst_tool)
+
+Only auth and endpoints are imported here, so the A2A server does not need
+`requests`; import session and mcp from their modules.
+"""
+from .auth import TokenProvider, load_private_key, public_key_fingerprint, sign_jwt
+from .endpoints import account_url, agent_run_url, mcp_server_url
+
+__all__ = [
+    "TokenProvider",
+    "load_private_key",
+    "public_key_fingerprint",
+    "sign_jwt",
+    "account_url",
+    "agent_run_url",
+    "mcp_server_url",
+]
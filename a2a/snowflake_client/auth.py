@@ -0,0 +1,161 @@
+"""
+Snowflake key-pair (KEYPAIR_JWT) authentication.
+
+One implementation of key loading, fingerprinting and JWT signing for the
+A2A agent and the test scripts. Timestamps are integer epoch seconds.
+"""
+import base64
+import hashlib
+import threading
+import time
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+
+
+def load_private_key(private_key_path: str, password: bytes | None = None):
+    """
+    Load a PEM private key from disk.
+
+    Args:
+        private_key_path: Path to the RSA private key file (.p8 / .pem)
+        password: Passphrase of an encrypted key
+
+    Raises:
+        ValueError: If private key file is not found
+    """
+    try:
+        with open(private_key_path, "rb") as key_file:
+            return serialization.load_pem_private_key(key_file.read(), password=password)
+    except FileNotFoundError:
+        raise ValueError(f"Private Key not found at {private_key_path}")
+
+
+def public_key_fingerprint(key) -> str:
+    """
+    Return the "SHA256:<base64>" fingerprint Snowflake expects in the JWT issuer.
+
+    Args:
+        key: A private key (its public half is used) or a public key
+    """
+    public_key = key.public_key() if hasattr(key, "public_key") else key
+    der = public_key.public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return "SHA256:" + base64.b64encode(hashlib.sha256(der).digest()).decode("utf-8")
+
+
+def sign_jwt(account: str, user: str, private_key, fingerprint: str,
+             issued_at: int | None = None, lifetime: int = 3600) -> str:
+    """
+    Sign a Snowflake key-pair JWT with an already loaded key.
+
+    Args:
+        account: Snowflake account identifier (e.g., ABC12345)
+        user: Snowflake username
+        private_key: Loaded RSA private key
+        fingerprint: public_key_fingerprint() of the key
+        issued_at: Epoch seconds for `iat` (default: now)
+        lifetime: Seconds until `exp` (Snowflake caps this at 3600)
+
+    Returns:
+        A signed JWT token string
+    """
+    issued_at = int(time.time()) if issued_at is None else issued_at
+    # Use uppercase for Account/User to avoid common 403 errors
+    qualified_name = f"{account.upper()}.{user.upper()}"
+    payload = {
+        # Snowflake requires the fingerprint in the issuer claim
+        "iss": f"{qualified_name}.{fingerprint}",
+        "sub": qualified_name,
+        "iat": issued_at,
+        "exp": issued_at + lifetime
+    }
+    return jwt.encode(payload, private_key, algorithm="RS256")
+
+
+class TokenProvider:
+    """
+    Hands out a cached Snowflake JWT and refreshes it ahead of expiry.
+
+    The private key is loaded and fingerprinted once, on first use. Tokens are
+    reused until `refresh_skew` seconds before they expire; the refresh runs
+    under a lock, so a burst of concurrent callers triggers a single signature.
+    Safe to share between threads.
+    """
+
+    def __init__(self, account: str, user: str, private_key_path: str | None = None,
+                 lifetime: int = 3600, refresh_skew: int = 300, private_key=None):
+        """
+        Args:
+            account: Snowflake account identifier (e.g., ABC12345)
+            user: Snowflake username
+            private_key_path: Path to the RSA private key file (.p8)
+            lifetime: Token lifetime in seconds (Snowflake caps this at 3600)
+            refresh_skew: Seconds before expiry at which a new token is signed
+            private_key: An already loaded key, instead of private_key_path
+        """
+        if refresh_skew >= lifetime:
+            raise ValueError("refresh_skew must be smaller than lifetime")
+        if private_key_path is None and private_key is None:
+            raise ValueError("private_key_path or private_key is required")
+        self.account = account
+        self.user = user
+        self.private_key_path = private_key_path
+        self.lifetime = lifetime
+        self.refresh_skew = refresh_skew
+        self.refresh_count = 0
+        self._private_key = private_key
+        self._fingerprint = public_key_fingerprint(private_key) if private_key is not None else None
+        self._token = None
+        self._refresh_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def fingerprint(self) -> str:
+        """The key's "SHA256:..." fingerprint (loads the key if needed)."""
+        with self._lock:
+            self._load_key()
+            return self._fingerprint
+
+    def cached_token(self) -> str | None:
+        """The cached JWT if it is not yet due for refresh, else None. Never signs or blocks."""
+        token = self._token
+        if token is not None and time.time() < self._refresh_at:
+            return token
+        return None
+
+    def get_token(self) -> str:
+        """Return a valid JWT, signing a new one only when the cached one is near expiry."""
+        token = self.cached_token()
+        if token is not None:
+            return token
+
+        with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self._token is not None and time.time() < self._refresh_at:
+                return self._token
+
+            issued_at = int(time.time())
+            self._token = self._sign(issued_at)
+            self._refresh_at = issued_at + self.lifetime - self.refresh_skew
+            self.refresh_count += 1
+            return self._token
+
+    def invalidate(self) -> None:
+        """Drop the cached token so the next call signs a fresh one."""
+        with self._lock:
+            self._token = None
+            self._refresh_at = 0.0
+
+    def _load_key(self) -> None:
+        if self._private_key is None:
+            self._private_key = load_private_key(self.private_key_path)
+            self._fingerprint = public_key_fingerprint(self._private_key)
+
+    def _sign(self, issued_at: int) -> str:
+        """Sign a token issued at `issued_at`; called under the lock."""
+        self._load_key()
+        return sign_jwt(self.account, self.user, self._private_key, self._fingerprint,
+                        issued_at, self.lifetime)
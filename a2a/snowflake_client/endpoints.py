@@ -0,0 +1,23 @@
+"""
+Snowflake REST API URLs.
+"""
+import os
+
+
+def account_url(account: str) -> str:
+    """
+    Base URL of an account, e.g. account_url("ra19199.eu-west-3.aws").
+
+    SNOWFLAKE_API_BASE_URL overrides it, e.g. to target a local stub.
+    """
+    return os.getenv("SNOWFLAKE_API_BASE_URL", f"https://{account.lower()}.snowflakecomputing.com").rstrip("/")
+
+
+def mcp_server_url(base_url: str, database: str, schema: str, server: str) -> str:
+    """Endpoint of a Snowflake-managed MCP server."""
+    return f"{base_url}/api/v2/databases/{database}/schemas/{schema}/mcp-servers/{server}"
+
+
+def agent_run_url(base_url: str, database: str, schema: str, agent: str) -> str:
+    """agents:run endpoint of a Cortex Agent."""
+    return f"{base_url}/api/v2/databases/{database}/schemas/{schema}/agents/{agent}:run"
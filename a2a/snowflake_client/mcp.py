@@ -0,0 +1,93 @@
+"""
+JSON-RPC helper for Snowflake-managed MCP servers.
+"""
+import itertools
+import json
+
+import requests
+
+
+class McpError(Exception):
+    """An MCP call failed: HTTP error, JSON-RPC error or a tool result with isError."""
+
+    def __init__(self, message: str, status_code: int | None = None, body=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+
+
+class McpClient:
+    """
+    Calls one MCP server endpoint over a shared session.
+
+    `post` returns the raw response for callers that record status codes
+    and timings; `call` and the tool helpers return the JSON-RPC result and
+    raise McpError on failure. Request ids are unique per client and
+    thread-safe.
+    """
+
+    def __init__(self, session: requests.Session, endpoint: str):
+        """
+        Args:
+            session: Usually from create_session(), which adds the JWT headers
+            endpoint: .../api/v2/databases/{db}/schemas/{schema}/mcp-servers/{name}
+        """
+        self.session = session
+        self.endpoint = endpoint
+        self._ids = itertools.count(1)
+
+    def request_body(self, method: str, params: dict | None = None, request_id=None) -> dict:
+        """Build a JSON-RPC 2.0 request."""
+        return {
+            "jsonrpc": "2.0",
+            "id": next(self._ids) if request_id is None else request_id,
+            "method": method,
+            "params": params or {}
+        }
+
+    def post(self, body: dict, **kwargs) -> requests.Response:
+        """Send a prepared JSON-RPC body; keyword arguments go to session.post."""
+        return self.session.post(self.endpoint, json=body, **kwargs)
+
+    def call(self, method: str, params: dict | None = None, **kwargs) -> dict:
+        """
+        Call `method` and return its JSON-RPC result.
+
+        Raises:
+            McpError: On a non-200 status, a JSON-RPC error or a tool error result
+        """
+        response = self.post(self.request_body(method, params), **kwargs)
+        try:
+            body = response.json()
+        except ValueError:
+            raise McpError(f"HTTP {response.status_code}: {response.text[:200]}",
+                           response.status_code, response.text)
+        if response.status_code != 200 or "error" in body:
+            error = body.get("error") or body
+            raise McpError(f"HTTP {response.status_code}: {error}", response.status_code, body)
+        result = body.get("result", {})
+        if result.get("isError"):
+            raise McpError(tool_text(result)[:200] or "Tool returned an error", response.status_code, body)
+        return result
+
+    def list_tools(self, **kwargs) -> list[dict]:
+        """The server's tools (tools/list)."""
+        return self.call("tools/list", **kwargs).get("tools", [])
+
+    def call_tool(self, name: str, arguments: dict, **kwargs) -> dict:
+        """Call one tool (tools/call) and return its result."""
+        return self.call("tools/call", {"name": name, "arguments": arguments}, **kwargs)
+
+    def sql(self, statement: str, **kwargs) -> dict:
+        """Run SQL through sql_exec_tool; returns the result_set dict."""
+        text = tool_text(self.call_tool("sql_exec_tool", {"sql": statement}, **kwargs))
+        return json.loads(text).get("result_set", {})
+
+    def ask(self, question: str, **kwargs) -> str:
+        """Ask analyst_tool a natural-language question; returns its text."""
+        return tool_text(self.call_tool("analyst_tool", {"question": question}, **kwargs))
+
+
+def tool_text(result: dict) -> str:
+    """Concatenated text content of a tools/call result."""
+    return "".join(item.get("text", "") for item in result.get("content", []) if item.get("type") == "text")
@@ -0,0 +1,102 @@
+"""
+Pooled, retrying requests session for the Snowflake REST APIs.
+
+Requires `requests` (the A2A server itself uses httpx and does not import
+this module).
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .auth import TokenProvider
+
+# Statuses Snowflake sends (with Retry-After) before running anything. A
+# 500/502/504 can arrive after a statement or agent run already executed,
+# so those are not retried: a JSON-RPC call or agent run is not idempotent.
+RETRY_STATUSES = (429, 503)
+
+
+class KeyPairAuth(requests.auth.AuthBase):
+    """
+    Adds the KEYPAIR_JWT headers from a TokenProvider to every request.
+
+    A 401 response invalidates the cached token and the request is sent
+    once more with a freshly signed one (e.g. after a clock jump or a key
+    rotation on the Snowflake user).
+    """
+
+    def __init__(self, tokens: TokenProvider):
+        self.tokens = tokens
+
+    def __call__(self, request):
+        request.headers["Authorization"] = f"Bearer {self.tokens.get_token()}"
+        request.headers["X-Snowflake-Authorization-Token-Type"] = "KEYPAIR_JWT"
+        request.register_hook("response", self._retry_on_401)
+        return request
+
+    def _retry_on_401(self, response, **kwargs):
+        if response.status_code != 401 or getattr(response.request, "_jwt_retried", False):
+            return response
+        self.tokens.invalidate()
+        response.content  # Drain so the connection goes back to the pool
+        response.close()
+        retry = response.request.copy()
+        retry._jwt_retried = True
+        retry.headers["Authorization"] = f"Bearer {self.tokens.get_token()}"
+        second = response.connection.send(retry, **kwargs)
+        second.history.append(response)
+        second.request = retry
+        return second
+
+
+class SnowflakeSession(requests.Session):
+    """A requests.Session with a default timeout."""
+
+    def __init__(self, timeout: float | None = 60.0):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def create_session(tokens: TokenProvider | None = None, pool_size: int = 10, retries: int = 3,
+                   backoff: float = 0.5, timeout: float | None = 60.0) -> SnowflakeSession:
+    """
+    Build a keep-alive session for Snowflake API calls.
+
+    Args:
+        tokens: Signs the KEYPAIR_JWT headers (None leaves auth to the caller)
+        pool_size: Connections kept per host; match it to the number of threads
+        retries: Retries on connect errors and 429/503 responses (0 disables);
+            read errors and timeouts are never retried and surface as-is
+        backoff: Exponential backoff factor in seconds; Retry-After wins when sent
+        timeout: Default per-request timeout in seconds
+
+    Returns:
+        A session whose calls reuse pooled connections
+    """
+    session = SnowflakeSession(timeout)
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        # The request may have reached Snowflake: never resend it, and let a
+        # read timeout raise requests' Timeout instead of a ConnectionError
+        read=False,
+        other=0,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        # JSON-RPC calls and agent runs are POSTs; 429/503 means nothing ran
+        allowed_methods=None,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size), max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Content-Type"] = "application/json"
+    if tokens is not None:
+        session.auth = KeyPairAuth(tokens)
+    return session
@@ -0,0 +1,226 @@
+"""
+Server-Sent Events parsing for the Snowflake Cortex A2A Agent.
+
+SSEParser is an incremental parser for the text/event-stream format (WHATWG
+HTML spec, "Server-sent events"). It consumes raw byte chunks as they come off
+the socket, so it never re-scans earlier input. parse_cortex_event then turns
+each event into a structured CortexEvent, JSON-decoding only the event types
+the executor actually uses.
+"""
+import codecs
+import json
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator
+
+
+# Bound raw_decode: skips json.loads' argument handling and whitespace regexes
+_raw_decode_json = json.JSONDecoder().raw_decode
+
+
+@dataclass(slots=True)
+class SSEEvent:
+    """One dispatched SSE event."""
+    event: str
+    data: str
+    id: str | None = None
+    retry: int | None = None
+
+
+class SSEParser:
+    """
+    Incremental text/event-stream parser working on raw bytes.
+
+    Handles CRLF, CR and LF line endings (including a CRLF split across two
+    chunks), multi-line `data:` fields, `event:`, `id:` and `retry:` fields,
+    comments, a leading BOM and UTF-8 sequences split across chunks. Input is
+    processed once; partial lines are kept as a list of fragments and joined
+    only when their line ends.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending = []
+        self._trailing_cr = False
+        self._first_chunk = True
+        self._event_type = ""
+        self._data = []
+        self._last_event_id = None
+        self._retry = None
+
+    def feed(self, chunk: bytes) -> list[SSEEvent]:
+        """Consume a chunk of bytes and return the events it completed."""
+        return self._feed_text(self._decoder.decode(chunk))
+
+    def close(self) -> list[SSEEvent]:
+        """
+        Flush remaining input at end of stream.
+
+        The spec discards an event that is not terminated by a blank line;
+        Cortex and most proxies always terminate events, so a trailing
+        unterminated event is dispatched here instead of being silently lost.
+        """
+        events = self._feed_text(self._decoder.decode(b"", final=True))
+        if self._pending:
+            self._process_line("".join(self._pending))
+            self._pending = []
+        event = self._dispatch()
+        if event is not None:
+            events.append(event)
+        return events
+
+    def _feed_text(self, text: str) -> list[SSEEvent]:
+        if not text:
+            return []
+        if self._first_chunk:
+            self._first_chunk = False
+            if text[0] == "\ufeff":
+                text = text[1:]
+        if self._trailing_cr and text[:1] == "\n":
+            # Second half of a CRLF whose CR ended the previous chunk
+            text = text[1:]
+        self._trailing_cr = text.endswith("\r")
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+        lines = text.split("\n")
+        if len(lines) == 1:
+            if text:
+                self._pending.append(text)
+            return []
+
+        if self._pending:
+            self._pending.append(lines[0])
+            lines[0] = "".join(self._pending)
+        tail = lines.pop()
+        self._pending = [tail] if tail else []
+
+        # Hot path: blank, data: and event: lines are handled inline,
+        # everything else goes through _process_line
+        events = []
+        data = self._data
+        for line in lines:
+            if not line:
+                if data:
+                    events.append(SSEEvent(
+                        self._event_type or "message", "\n".join(data),
+                        self._last_event_id, self._retry
+                    ))
+                    data = self._data = []
+                self._event_type = ""
+            elif line.startswith("data:"):
+                data.append(line[6:] if line[5:6] == " " else line[5:])
+            elif line.startswith("event:"):
+                self._event_type = line[7:] if line[6:7] == " " else line[6:]
+            else:
+                self._process_line(line)
+        return events
+
+    def _process_line(self, line: str) -> None:
+        if line[0] == ":":
+            return  # comment / keep-alive
+        field, sep, value = line.partition(":")
+        if sep and value.startswith(" "):
+            value = value[1:]
+        if field == "data":
+            self._data.append(value)
+        elif field == "event":
+            self._event_type = value
+        elif field == "id":
+            if "\0" not in value:
+                self._last_event_id = value
+        elif field == "retry":
+            if value.isdigit():
+                self._retry = int(value)
+
+    def _dispatch(self) -> SSEEvent | None:
+        if not self._data:
+            self._event_type = ""
+            return None
+        event = SSEEvent(
+            event=self._event_type or "message",
+            data="\n".join(self._data),
+            id=self._last_event_id,
+            retry=self._retry
+        )
+        self._event_type = ""
+        self._data = []
+        return event
+
+
+async def aiter_sse(chunks: AsyncIterable[bytes]) -> AsyncIterator[SSEEvent]:
+    """Yield SSE events from an async iterator of byte chunks (e.g. httpx aiter_bytes)."""
+    parser = SSEParser()
+    async for chunk in chunks:
+        for event in parser.feed(chunk):
+            yield event
+    for event in parser.close():
+        yield event
+
+
+# Structured Cortex event kinds
+TEXT = "text"
+TOOL_USE = "tool_use"
+TOOL_RESULT = "tool_result"
+STATUS = "status"
+ERROR = "error"
+DONE = "done"
+OTHER = "other"
+
+# Cortex agents:run event types that need their JSON payload decoded.
+# Everything else (thinking deltas, the aggregated response.text / response
+# events, metadata, charts, tables) is passed through undecoded.
+_DECODED_EVENTS = {
+    "response.text.delta": TEXT,
+    "response.tool_use": TOOL_USE,
+    "response.tool_result": TOOL_RESULT,
+    "response.status": STATUS,
+    "error": ERROR,
+    # Streams without `event:` lines carry bare {"text": ...} payloads
+    "message": TEXT,
+}
+
+
+@dataclass(slots=True)
+class CortexEvent:
+    """A Cortex agents:run event classified by kind."""
+    kind: str
+    event: str
+    text: str = ""
+    data: Any = None
+
+
+def parse_cortex_event(sse: SSEEvent) -> CortexEvent:
+    """Classify an SSE event from Cortex, decoding JSON only where it is needed."""
+    kind = _DECODED_EVENTS.get(sse.event)
+    if kind is None:
+        if sse.event == "done":
+            return CortexEvent(DONE, sse.event)
+        return CortexEvent(OTHER, sse.event, data=sse.data)
+    if sse.data == "[DONE]":
+        return CortexEvent(DONE, sse.event)
+
+    payload = sse.data
+    if payload[:1].isspace():
+        payload = payload.lstrip()
+    try:
+        data = _raw_decode_json(payload)[0]
+    except json.JSONDecodeError:
+        return CortexEvent(OTHER, sse.event, data=sse.data)
+    if not isinstance(data, dict):
+        return CortexEvent(OTHER, sse.event, data=data)
+
+    if kind == TEXT:
+        if "text" not in data:
+            return CortexEvent(OTHER, sse.event, data=data)
+        return CortexEvent(TEXT, sse.event, text=data["text"], data=data)
+    if kind == STATUS:
+        return CortexEvent(STATUS, sse.event, text=data.get("message") or data.get("status", ""), data=data)
+    if kind == ERROR:
+        return CortexEvent(ERROR, sse.event, text=data.get("message", ""), data=data)
+    return CortexEvent(kind, sse.event, data=data)
+
+
+async def aiter_cortex_events(chunks: AsyncIterable[bytes]) -> AsyncIterator[CortexEvent]:
+    """Yield structured Cortex events from raw response bytes."""
+    async for sse in aiter_sse(chunks):
+        yield parse_cortex_event(sse)
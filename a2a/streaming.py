@@ -0,0 +1,176 @@
+"""
+Streaming helpers for the Snowflake Cortex A2A Agent.
+Decides when buffered Cortex text deltas are flushed to the A2A client.
+
+pump_deltas splits a streamed answer into a producer and a consumer: a
+reader task drains the upstream deltas into a bounded buffer while the
+publisher coalesces whatever has accumulated into one event. The more the
+A2A consumer falls behind, the more text goes into each event, so a slow
+client neither stalls the Cortex read nor receives a flood of tiny events.
+"""
+import os
+import time
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable
+
+
+SENTENCE_ENDINGS = ('\n', '.', '!', '?')
+
+
+@dataclass
+class FlushPolicy:
+    """
+    When to forward buffered text deltas to the A2A EventQueue.
+
+    A buffer is flushed as soon as any enabled trigger fires. The very first
+    delta of an answer is always flushed immediately so time-to-first-token
+    tracks the first upstream delta rather than the first full buffer.
+
+    While the consumer keeps up, max_bytes is the flush size. Each time an
+    event is published while earlier ones are still queued, the flush size
+    doubles (up to max_coalesce_bytes) and the sentence trigger is skipped;
+    once the queue is drained it halves again.
+
+    Attributes:
+        max_bytes: Flush once the buffer holds this many UTF-8 bytes (0 disables)
+        on_sentence: Flush when a delta ends a sentence or line
+        max_interval_ms: Flush when this long has passed since the last flush (0 disables)
+        max_coalesce_bytes: Largest flush size for a lagging consumer (<= max_bytes disables adapting)
+        buffer_deltas: Deltas read ahead of the publisher before the upstream read waits
+    """
+    max_bytes: int = 50
+    on_sentence: bool = True
+    max_interval_ms: int = 250
+    max_coalesce_bytes: int = 16384
+    buffer_deltas: int = 1024
+
+    @classmethod
+    def from_env(cls) -> "FlushPolicy":
+        """Build a policy from STREAM_FLUSH_* / STREAM_* environment variables."""
+        return cls(
+            max_bytes=int(os.getenv("STREAM_FLUSH_BYTES", "50")),
+            on_sentence=os.getenv("STREAM_FLUSH_ON_SENTENCE", "true").lower() in ("1", "true", "yes"),
+            max_interval_ms=int(os.getenv("STREAM_FLUSH_INTERVAL_MS", "250")),
+            max_coalesce_bytes=int(os.getenv("STREAM_MAX_COALESCE_BYTES", "16384")),
+            buffer_deltas=int(os.getenv("STREAM_BUFFER_DELTAS", "1024"))
+        )
+
+    def should_flush(self, buffered_bytes: int, chunk: str, since_last_flush_ms: float,
+                     flush_bytes: int | None = None) -> bool:
+        """Return True when the buffer ending in `chunk` should be sent now."""
+        flush_bytes = self.max_bytes if flush_bytes is None else flush_bytes
+        if flush_bytes and buffered_bytes >= flush_bytes:
+            return True
+        if self.on_sentence and flush_bytes <= self.max_bytes and chunk.rstrip(' ').endswith(SENTENCE_ENDINGS):
+            return True
+        if self.max_interval_ms and since_last_flush_ms >= self.max_interval_ms:
+            return True
+        return False
+
+
+# Ends the reader's stream of deltas
+_DONE = object()
+
+
+async def pump_deltas(deltas: AsyncIterator[str],
+                      publish: Callable[[str, bool], Awaitable[None]],
+                      backlog: Callable[[], int],
+                      policy: FlushPolicy,
+                      observe: Callable[[int, float], None] | None = None) -> int:
+    """
+    Forward text deltas through a bounded buffer, coalescing them adaptively.
+
+    Args:
+        deltas: Upstream text deltas, read by a background task
+        publish: Sends one coalesced chunk; the flag is True for the last chunk
+        backlog: Events still waiting for the A2A consumer
+        policy: Flush triggers and buffer limits
+        observe: Called per published chunk with (deltas coalesced, seconds
+            the oldest of them waited)
+
+    Returns:
+        Number of chunks published
+    """
+    buffer = asyncio.Queue(maxsize=max(1, policy.buffer_deltas))
+
+    async def read() -> None:
+        try:
+            async for text in deltas:
+                await buffer.put((text, time.perf_counter()))
+        except Exception:
+            # Wake the publisher; it re-raises the error when awaiting us
+            await buffer.put(_DONE)
+            raise
+        await buffer.put(_DONE)
+
+    reader = asyncio.create_task(read())
+    parts = []
+    buffered_bytes = 0
+    oldest = 0.0
+    flush_bytes = policy.max_bytes
+    last_flush = time.monotonic()
+    published = 0
+    done = False
+
+    async def flush(last: bool) -> None:
+        nonlocal parts, buffered_bytes, flush_bytes, last_flush, published
+        count = len(parts)
+        # Earlier events still unread: the consumer is falling behind
+        lagging = backlog() > 0
+        await publish("".join(parts), last)
+        if observe is not None and count:
+            observe(count, time.perf_counter() - oldest)
+        parts = []
+        buffered_bytes = 0
+        last_flush = time.monotonic()
+        published += 1
+        if policy.max_coalesce_bytes > policy.max_bytes:
+            if lagging:
+                flush_bytes = min(policy.max_coalesce_bytes, max(flush_bytes, 1) * 2)
+            else:
+                flush_bytes = max(policy.max_bytes, flush_bytes // 2)
+
+    try:
+        while not done:
+            # Wait for the next delta, but no longer than the flush interval
+            # when text is already buffered
+            timeout = None
+            if parts and policy.max_interval_ms:
+                timeout = max(0.0, policy.max_interval_ms / 1000 - (time.monotonic() - last_flush))
+            try:
+                async with asyncio.timeout(timeout):
+                    item = await buffer.get()
+            except TimeoutError:
+                await flush(False)
+                continue
+
+            # Take everything the reader has buffered in the meantime
+            items = [item]
+            while not buffer.empty():
+                items.append(buffer.get_nowait())
+            for item in items:
+                if item is _DONE:
+                    done = True
+                    break
+                text, read_at = item
+                if not parts:
+                    oldest = read_at
+                parts.append(text)
+                buffered_bytes += len(text.encode("utf-8"))
+
+            if done:
+                if parts or published:
+                    await flush(True)
+            elif parts and (not published or policy.should_flush(
+                buffered_bytes, parts[-1], (time.monotonic() - last_flush) * 1000, flush_bytes
+            )):
+                await flush(False)
+
+        # Surface an upstream read error
+        await reader
+        return published
+    finally:
+        if not reader.done():
+            reader.cancel()
+            await asyncio.wait([reader])
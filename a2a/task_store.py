@@ -0,0 +1,228 @@
+"""
+Task storage for the Snowflake Cortex A2A Agent.
+
+SQLiteTaskStore keeps A2A task state in an embedded SQLite database in WAL
+mode. State survives restarts, several uvicorn workers can share one file,
+and memory stays bounded: only a small LRU of finished tasks is cached and
+finished tasks are evicted from disk by age and by count. Tasks in progress
+live in memory and reach the database at most every few seconds, so a
+streamed answer does not cost one write per chunk.
+"""
+import os
+import time
+import sqlite3
+import asyncio
+import threading
+from collections import OrderedDict
+
+from a2a.server.context import ServerCallContext
+from a2a.server.tasks import InMemoryTaskStore, TaskStore
+from a2a.types import Task, TaskState
+
+
+FINISHED_STATES = (TaskState.completed, TaskState.canceled, TaskState.failed, TaskState.rejected)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    finished INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_finished_updated ON tasks (finished, updated_at);
+"""
+
+
+class SQLiteTaskStore(TaskStore):
+    """
+    Durable, bounded A2A TaskStore backed by SQLite.
+
+    Lookups by id hit the in-memory LRU first and the primary key index
+    otherwise. Only finished tasks are cached; they no longer change, so a
+    cached copy can never be stale even when other workers write to the
+    same database. Tasks still in progress are never evicted.
+
+    A task in progress is kept in memory by the worker running it and
+    written through at most every `flush_interval` seconds (the first save
+    always is, so other workers can find it). Terminal states are written
+    immediately and a finished row is never overwritten: once another
+    worker has stored a task as canceled, a late update from the worker
+    still running it is dropped.
+
+    Blocking SQLite calls run in a worker thread so they never stall the
+    event loop.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 3600, max_finished: int = 10000,
+                 cache_size: int = 256, evict_interval: float = 30.0, flush_interval: float = 2.0):
+        """
+        Args:
+            path: SQLite database file, shared by all workers
+            ttl_seconds: Finished tasks older than this are deleted
+            max_finished: Keep at most this many finished tasks (least recently updated go first)
+            cache_size: Finished tasks kept parsed-ready in memory
+            evict_interval: Minimum seconds between eviction sweeps
+            flush_interval: Minimum seconds between writes of a task in progress
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_finished = max_finished
+        self.cache_size = cache_size
+        self.evict_interval = evict_interval
+        self.flush_interval = flush_interval
+        self._cache = OrderedDict()
+        # Tasks in progress on this worker: id -> (data, last written to disk)
+        self._live: dict[str, tuple[str, float]] = {}
+        self._last_evict = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    async def save(self, task: Task, context: ServerCallContext | None = None) -> None:
+        """Insert or update a task; in-progress updates are written at most every flush_interval."""
+        finished = task.status.state in FINISHED_STATES
+        data = task.model_dump_json()
+        if not finished:
+            self._cache.pop(task.id, None)
+            now = time.monotonic()
+            live = self._live.get(task.id)
+            if live is not None and now - live[1] < self.flush_interval:
+                self._live[task.id] = (data, live[1])
+                return
+            self._live[task.id] = (data, now)
+            await asyncio.to_thread(self._save, task.id, False, data)
+            return
+
+        self._live.pop(task.id, None)
+        if await asyncio.to_thread(self._save, task.id, True, data):
+            self._cache_put(task.id, data)
+        else:
+            # Already finished on disk (e.g. canceled by another worker): that state wins
+            self._cache.pop(task.id, None)
+
+    async def get(self, task_id: str, context: ServerCallContext | None = None) -> Task | None:
+        """Fetch a task by id, or None if it is unknown or was evicted."""
+        data = self._cache.get(task_id)
+        live = self._live.get(task_id)
+        if data is not None:
+            self._cache.move_to_end(task_id)
+        elif live is not None:
+            data = live[0]
+        else:
+            row = await asyncio.to_thread(self._fetch, task_id)
+            if row is None:
+                return None
+            finished, data = row
+            if finished:
+                self._cache_put(task_id, data)
+        # Parse a fresh copy each time so callers can't mutate cached state
+        return Task.model_validate_json(data)
+
+    async def finished_elsewhere(self) -> list[str]:
+        """
+        Ids of tasks in progress on this worker whose stored row is already finished.
+
+        Such a task was finished by another worker, typically canceled via a
+        tasks/cancel that was routed there.
+        """
+        if not self._live:
+            return []
+        finished = await asyncio.to_thread(self._fetch_finished, list(self._live))
+        # Skip tasks this worker finished itself while the query ran
+        return [task_id for task_id in finished if task_id in self._live]
+
+    async def delete(self, task_id: str, context: ServerCallContext | None = None) -> None:
+        """Remove a task."""
+        self._cache.pop(task_id, None)
+        self._live.pop(task_id, None)
+        await asyncio.to_thread(self._delete, task_id)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _cache_put(self, task_id: str, data: str) -> None:
+        self._cache[task_id] = data
+        self._cache.move_to_end(task_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _save(self, task_id: str, finished: bool, data: str) -> bool:
+        """Write a task unless its stored row is already finished; True if written."""
+        now = time.time()
+        with self._lock:
+            written = self._conn.execute(
+                "INSERT INTO tasks (id, finished, updated_at, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET finished = excluded.finished, "
+                "updated_at = excluded.updated_at, data = excluded.data "
+                "WHERE tasks.finished = 0",
+                (task_id, int(finished), now, data)
+            ).rowcount > 0
+            if now - self._last_evict >= self.evict_interval:
+                self._evict(now)
+            return written
+
+    def _fetch(self, task_id: str):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT finished, data FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+
+    def _fetch_finished(self, task_ids: list[str]) -> list[str]:
+        found = []
+        with self._lock:
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(task_ids), 500):
+                chunk = task_ids[start:start + 500]
+                found.extend(row[0] for row in self._conn.execute(
+                    f"SELECT id FROM tasks WHERE finished = 1 AND id IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ))
+        return found
+
+    def _delete(self, task_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def _evict(self, now: float) -> None:
+        """Drop expired finished tasks, then the oldest ones beyond max_finished."""
+        self._last_evict = now
+        self._conn.execute(
+            "DELETE FROM tasks WHERE finished = 1 AND updated_at < ?",
+            (now - self.ttl_seconds,)
+        )
+        self._conn.execute(
+            "DELETE FROM tasks WHERE id IN ("
+            "  SELECT id FROM tasks WHERE finished = 1"
+            "  ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_finished,)
+        )
+
+
+def build_task_store() -> TaskStore:
+    """
+    Create the task store selected by TASK_STORE (`sqlite` or `memory`).
+
+    Environment:
+        TASK_STORE: Backend name (default sqlite)
+        TASK_STORE_PATH: SQLite database file (default tasks.db)
+        TASK_TTL_SECONDS: Age after which finished tasks are deleted (default 3600)
+        TASK_STORE_MAX_FINISHED: Finished tasks kept on disk (default 10000)
+        TASK_CACHE_SIZE: Finished tasks cached in memory (default 256)
+        TASK_STORE_FLUSH_SECONDS: Minimum seconds between writes of a task in progress (default 2)
+    """
+    backend = os.getenv("TASK_STORE", "sqlite").lower()
+    if backend == "memory":
+        return InMemoryTaskStore()
+    if backend == "sqlite":
+        return SQLiteTaskStore(
+            os.getenv("TASK_STORE_PATH", "tasks.db"),
+            ttl_seconds=float(os.getenv("TASK_TTL_SECONDS", "3600")),
+            max_finished=int(os.getenv("TASK_STORE_MAX_FINISHED", "10000")),
+            cache_size=int(os.getenv("TASK_CACHE_SIZE", "256")),
+            flush_interval=float(os.getenv("TASK_STORE_FLUSH_SECONDS", "2"))
+        )
+    raise ValueError(f"Unknown TASK_STORE backend: {backend}")
@@ -12,14 +12,19 @@ Examples:
     python test_a2a.py
     python test_a2a.py --query "Who are the top scorers?"
     python test_a2a.py --url http://localhost:8001 --query "Hello"
+    python test_a2a.py --stream   # also reports time-to-first-token
+    python test_a2a.py --load --duration 30 --concurrency 10 --stream-ratio 0.5 --json run.json
 """
 
 import asyncio
 import argparse
 import json
+import time
 import uuid
 import httpx
 
+from load_test import add_load_arguments, load_test_from_args
+
 
 BASE_URL = "http://localhost:8000"
 AGENT_CARD_PATH = "/.well-known/agent.json"
@@ -112,6 +117,7 @@ Examples:
   python test_a2a.py
   python test_a2a.py --query "What data do you have?"
   python test_a2a.py --url http://localhost:8001
+  python test_a2a.py --load --rate 5 --duration 60 --prompts load_prompts.txt
         """
     )
     parser.add_argument(
@@ -141,6 +147,12 @@ Examples:
         action="store_true",
         help="Use streaming mode (message/stream instead of message/send)"
     )
+    parser.add_argument(
+        "--load",
+        action="store_true",
+        help="Run a load test instead of a single query (see load_test.py)"
+    )
+    add_load_arguments(parser)
     args = parser.parse_args()
     
     print("\n🔷 Snowflake Cortex A2A Agent Test Client")
@@ -170,6 +182,10 @@ Examples:
             print("\n✅ Agent card fetched successfully!")
             return
         
+        if args.load:
+            await load_test_from_args(args)
+            return
+        
         # Send the query
         print("\n" + "=" * 60)
         mode = "📡 Streaming" if args.stream else "📨 Sending"
@@ -182,6 +198,9 @@ Examples:
             print("-" * 40)
             full_text = ""
             chunk_count = 0
+            text_chunks = 0
+            first_token_at = None
+            start = time.perf_counter()
             
             async for event in send_message_stream(args.url, args.query):
                 chunk_count += 1
@@ -193,19 +212,28 @@ Examples:
                 
                 result = event.get("result", event)
                 
-                # Check for message events with text parts
+                # Text arrives as message events, artifact updates or working status updates
+                parts = []
                 if result.get("kind") == "message":
                     parts = result.get("parts", [])
-                    for part in parts:
-                        if part.get("kind") == "text":
-                            text = part.get("text", "")
-                            print(text, end="", flush=True)
-                            full_text += text
+                elif result.get("kind") == "artifact-update":
+                    parts = result.get("artifact", {}).get("parts", [])
+                elif result.get("kind") == "status-update":
+                    parts = (result.get("status", {}).get("message") or {}).get("parts", [])
+                
+                for part in parts:
+                    if part.get("kind") == "text":
+                        text = part.get("text", "")
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                        print(text, end="", flush=True)
+                        full_text += text
+                        text_chunks += 1
                 
                 # Check for status updates
-                elif result.get("kind") == "status-update":
+                if result.get("kind") == "status-update":
                     state = result.get("status", {}).get("state", "")
-                    if state == "working":
+                    if state == "working" and not parts:
                         print("⏳ Processing...", flush=True)
                     elif state == "completed":
                         print("\n" + "-" * 40)
@@ -215,7 +243,11 @@ Examples:
                 if args.full:
                     print(f"\n[Event {chunk_count}]: {json.dumps(event, indent=2)}")
             
-            print(f"\n\n📊 Total response: {len(full_text)} chars")
+            total = time.perf_counter() - start
+            print(f"\n\n📊 Total response: {len(full_text)} chars in {text_chunks} chunks")
+            if first_token_at is not None:
+                print(f"⏱️  Time to first token: {(first_token_at - start) * 1000:.0f} ms")
+            print(f"⏱️  Total time: {total * 1000:.0f} ms")
         
         else:
             # Non-streaming mode
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Cancellation test for the Snowflake Cortex A2A Agent.
+
+Runs the A2A server against a local Cortex stand-in that drips SSE deltas
+for a long time, starts a message/stream task, cancels it with tasks/cancel
+and checks that:
+  1. tasks/cancel answers with the task in the `canceled` state;
+  2. the upstream SSE stream is closed within --max-ms of the cancel;
+  3. the pooled upstream connection is released (no active connections);
+  4. no more deltas are parsed or forwarded after the cancel.
+
+With --cross-worker a second app instance sharing the same task store
+stands in for another uvicorn worker and receives the tasks/cancel; the
+worker running the task must still abort it and end the client's stream
+as `canceled`.
+
+Exits non-zero if any check fails.
+
+Usage:
+    python test_cancel.py [--max-ms MILLISECONDS] [--cross-worker]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+from bench_concurrency import free_port, start_server, write_temp_key
+
+upstream = {"sent": 0, "closed_at": None}
+
+
+def build_endless_cortex() -> Starlette:
+    """agents:run stand-in that sends a delta every 50 ms for 30 seconds."""
+
+    async def run_agent(request):
+        async def events():
+            try:
+                for i in range(600):
+                    upstream["sent"] += 1
+                    data = json.dumps({"text": f"part {i}. "})
+                    yield f"event: response.text.delta\ndata: {data}\n\n"
+                    await asyncio.sleep(0.05)
+                yield "event: done\ndata: [DONE]\n\n"
+            finally:
+                upstream["closed_at"] = time.perf_counter()
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return Starlette(routes=[Route("/api/v2/databases/{db}/schemas/{schema}/agents/{name}:run", run_agent, methods=["POST"])])
+
+
+def active_connections(client: httpx.AsyncClient) -> int:
+    """Connections of the executor's pool that are currently serving a request."""
+    pool = client._transport._pool
+    return sum(1 for conn in pool.connections if not conn.is_idle())
+
+
+async def run_test(url: str, executor, max_ms: float, cancel_url: str | None = None) -> bool:
+    payload = {
+        "jsonrpc": "2.0", "method": "message/stream", "id": str(uuid.uuid4()),
+        "params": {"message": {"messageId": str(uuid.uuid4()), "role": "user",
+                               "parts": [{"kind": "text", "text": "Summarize every alarm"}]}}
+    }
+    task_id = None
+    chunks = 0
+    final_state = None
+    started = asyncio.Event()
+
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        async def consume():
+            nonlocal task_id, chunks, final_state
+            async with client.stream("POST", url, json=payload) as response:
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    result = json.loads(line[5:]).get("result", {})
+                    task_id = task_id or result.get("taskId") or result.get("id")
+                    status = result.get("status", {})
+                    if result.get("kind") == "artifact-update":
+                        chunks += 1
+                        started.set()
+                    if result.get("final"):
+                        final_state = status.get("state")
+
+        stream = asyncio.create_task(consume())
+        await started.wait()
+        await asyncio.sleep(0.5)
+
+        print(f"📡 Streaming task {task_id}: {chunks} chunk(s) received, "
+              f"{active_connections(executor.client)} active upstream connection(s)")
+
+        cancel_start = time.perf_counter()
+        response = await client.post(cancel_url or url, json={
+            "jsonrpc": "2.0", "method": "tasks/cancel", "id": str(uuid.uuid4()),
+            "params": {"id": task_id}
+        })
+        cancel_ms = (time.perf_counter() - cancel_start) * 1000
+        state = response.json().get("result", {}).get("status", {}).get("state")
+
+        await asyncio.sleep(0.3)
+        sent_after_cancel = upstream["sent"]
+        chunks_after_cancel = chunks
+        await asyncio.sleep(0.5)
+        stream.cancel()
+
+    checks = []
+    checks.append(("tasks/cancel returns canceled", state == "canceled",
+                   f"state={state}, {cancel_ms:.1f} ms"))
+
+    closed = upstream["closed_at"]
+    close_ms = (closed - cancel_start) * 1000 if closed else None
+    checks.append(("Upstream stream closed", close_ms is not None and close_ms <= max_ms,
+                   f"{close_ms:.1f} ms after cancel" if close_ms is not None else "still open"))
+
+    active = active_connections(executor.client)
+    checks.append(("Upstream connection released", active == 0, f"{active} active"))
+
+    stopped = upstream["sent"] == sent_after_cancel and chunks == chunks_after_cancel
+    checks.append(("Parsing stopped", stopped,
+                   f"{upstream['sent']} deltas sent upstream, {chunks} chunk(s) forwarded"))
+
+    if cancel_url:
+        checks.append(("Stream ended canceled on the running worker", final_state == "canceled",
+                       f"final state={final_state}"))
+    elif final_state:
+        print(f"📨 Stream client saw final state: {final_state}")
+
+    print("\n" + "=" * 60)
+    ok = True
+    for name, passed, detail in checks:
+        ok = ok and passed
+        print(f"   {'✅' if passed else '❌'} {name}: {detail}")
+    print("=" * 60)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test cancellation of in-flight Cortex calls")
+    parser.add_argument("--max-ms", type=float, default=100.0,
+                        help="Maximum time from tasks/cancel to upstream close")
+    parser.add_argument("--cross-worker", action="store_true",
+                        help="Send tasks/cancel to a second app instance (another worker)")
+    args = parser.parse_args()
+
+    cortex_port = free_port()
+    a2a_port = free_port()
+    key_path = write_temp_key()
+
+    os.environ.update({
+        "SNOWFLAKE_API_BASE_URL": f"http://127.0.0.1:{cortex_port}",
+        "SNOWFLAKE_ACCOUNT_LOCATOR": "TEST",
+        "SNOWFLAKE_ACCOUNT": "test",
+        "SNOWFLAKE_USER": "TEST_USER",
+        "PRIVATE_KEY_PATH": key_path,
+        "AGENT_DATABASE": "TEST_DB",
+        "AGENT_SCHEMA": "TEST_SCHEMA",
+        "AGENT_NAME": "TEST_AGENT",
+        "TASK_STORE_PATH": os.path.join(tempfile.mkdtemp(), "tasks.db"),
+        # Cross-worker cancels are picked up on the next poll
+        "CANCEL_POLL_SECONDS": str(min(1.0, args.max_ms / 2000)),
+    })
+
+    # Import after the environment is configured: main builds the app at import
+    import main as a2a_main
+
+    print("\n🛑 A2A Cancellation Test" + (" (cross-worker)" if args.cross_worker else ""))
+    print("=" * 60)
+
+    try:
+        start_server(build_endless_cortex(), cortex_port)
+        start_server(a2a_main.app, a2a_port)
+        cancel_url = None
+        if args.cross_worker:
+            other_port = free_port()
+            start_server(a2a_main.create_app(), other_port)
+            cancel_url = f"http://127.0.0.1:{other_port}/"
+        ok = asyncio.run(run_test(f"http://127.0.0.1:{a2a_port}/", a2a_main.app.state.executor,
+                                  args.max_ms, cancel_url))
+    finally:
+        os.remove(key_path)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
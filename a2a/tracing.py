@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Per-task tracing for the Snowflake Cortex A2A Agent.
+
+A minimal, OpenTelemetry-compatible tracer: spans carry W3C trace context
+(`traceparent`), nest through contextvars across awaits, and are exported
+as OTLP/JSON, either appended to a local file or posted to an OTLP/HTTP
+collector, by a background thread that never blocks the event loop.
+
+Tracing is off unless TRACING_EXPORTER is set. When off, `tracer.span()`
+returns a shared no-op span, so instrumented code costs one method call.
+
+Run as a script to summarize an exported file:
+    python tracing.py traces.jsonl [--slowest N]
+"""
+import os
+import abc
+import json
+import math
+import time
+import queue
+import atexit
+import argparse
+import threading
+import contextvars
+from collections import defaultdict
+
+import httpx
+
+from agent_logging import get_logger
+
+log = get_logger("tracing")
+
+
+# OTLP span kinds
+INTERNAL = 1
+SERVER = 2
+CLIENT = 3
+
+# OTLP status codes
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str] | None:
+    """(trace_id, parent_span_id) from a W3C traceparent header, or None if invalid."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    trace_id, span_id = parts[1].lower(), parts[2].lower()
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    try:
+        int(trace_id, 16)
+        int(span_id, 16)
+    except ValueError:
+        return None
+    return trace_id, span_id
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = ("tracer", "name", "kind", "trace_id", "span_id", "parent_id",
+                 "start_ns", "end_ns", "attributes", "status", "status_message", "_token")
+
+    def __init__(self, tracer, name: str, kind: int, trace_id: str, parent_id: str | None,
+                 attributes: dict | None):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = dict(attributes) if attributes else {}
+        self.status = STATUS_OK
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._token = None
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, message: str) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    def traceparent(self) -> str:
+        """W3C traceparent header value naming this span as the parent."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        if exc_type is not None and self.status != STATUS_ERROR:
+            self.record_error(f"{exc_type.__name__}: {exc}" if str(exc) else exc_type.__name__)
+        self.end_ns = time.time_ns()
+        self.tracer.exporter.submit(self)
+        return False
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status, "message": self.status_message},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Returned when tracing is off; every operation does nothing."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+    def record_error(self, message: str) -> None:
+        pass
+
+    def traceparent(self) -> None:
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class BatchExporter(abc.ABC):
+    """
+    Buffers finished spans and writes them from a background thread.
+
+    Subclasses implement `export`, which sends one OTLP/JSON payload.
+
+    Batches are flushed every `interval` seconds or every `max_batch` spans.
+    When more than `max_queue` spans are waiting, new spans are dropped
+    rather than letting memory grow.
+    """
+
+    def __init__(self, service_name: str, interval: float = 1.0, max_batch: int = 512,
+                 max_queue: int = 10000):
+        self.service_name = service_name
+        self.interval = interval
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._queue = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def submit(self, span: Span) -> None:
+        if self._queue.qsize() >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.put(span)
+
+    def shutdown(self) -> None:
+        """Flush remaining spans and stop the writer thread."""
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join(timeout=5)
+
+    @abc.abstractmethod
+    def export(self, payload: dict) -> None:
+        """Send one OTLP/JSON payload; raising drops the batch (logged)."""
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._stop.wait(self.interval)
+            self._drain()
+        self._drain()
+
+    def _drain(self) -> None:
+        while not self._queue.empty():
+            batch = []
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                self.export(self._payload(batch))
+            except Exception as e:
+                log.warning("⚠️ Trace export failed", extra={"spans_dropped": len(batch), "error": str(e)})
+
+    def _payload(self, spans: list[Span]) -> dict:
+        """An OTLP ExportTraceServiceRequest in its JSON encoding."""
+        return {"resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+            "scopeSpans": [{
+                "scope": {"name": "cortex-a2a-agent"},
+                "spans": [span.to_otlp() for span in spans],
+            }],
+        }]}
+
+
+class FileExporter(BatchExporter):
+    """Appends one OTLP/JSON request per line to a local file."""
+
+    def __init__(self, path: str, service_name: str, **kwargs):
+        self.path = path
+        super().__init__(service_name, **kwargs)
+
+    def export(self, payload: dict) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(payload, separators=(",", ":")) + "\n")
+
+
+class OTLPHttpExporter(BatchExporter):
+    """Posts OTLP/JSON to a collector's /v1/traces endpoint."""
+
+    def __init__(self, endpoint: str, service_name: str, **kwargs):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.client = httpx.Client(timeout=10.0)
+        super().__init__(service_name, **kwargs)
+
+    def export(self, payload: dict) -> None:
+        self.client.post(self.url, json=payload).raise_for_status()
+
+
+class _NoopExporter:
+    dropped = 0
+
+    def submit(self, span: Span) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class Tracer:
+    """Creates spans; disabled (no-op) until an exporter is configured."""
+
+    def __init__(self):
+        self.exporter = _NoopExporter()
+        self.enabled = False
+
+    def configure(self, exporter) -> None:
+        self.exporter = exporter
+        self.enabled = exporter is not None and not isinstance(exporter, _NoopExporter)
+        if not self.enabled:
+            self.exporter = _NoopExporter()
+
+    def span(self, name: str, kind: int = INTERNAL, attributes: dict | None = None,
+             traceparent: str | None = None):
+        """
+        Start a span as a child of the current one.
+
+        Args:
+            name: Operation name
+            kind: INTERNAL, SERVER or CLIENT
+            attributes: Initial span attributes
+            traceparent: Incoming W3C header; used for root spans only
+
+        Returns:
+            A Span context manager, or NOOP_SPAN when tracing is off
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = _current_span.get()
+        if parent is not None:
+            return Span(self, name, kind, parent.trace_id, parent.span_id, attributes)
+        remote = parse_traceparent(traceparent)
+        if remote is not None:
+            return Span(self, name, kind, remote[0], remote[1], attributes)
+        return Span(self, name, kind, os.urandom(16).hex(), None, attributes)
+
+    def current(self):
+        """The active span, or NOOP_SPAN."""
+        return _current_span.get() or NOOP_SPAN
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+
+# Shared by executor and auth; configured once from the environment
+tracer = Tracer()
+
+
+def configure_from_env() -> Tracer:
+    """
+    Enable tracing according to the environment.
+
+    Environment:
+        TRACING_EXPORTER: `file`, `otlp`, or unset/`none` to disable (default unset)
+        TRACING_FILE: Output file for the file exporter (default traces.jsonl)
+        OTEL_EXPORTER_OTLP_ENDPOINT: Collector base URL for `otlp` (default http://localhost:4318)
+        OTEL_SERVICE_NAME: service.name resource attribute (default cortex-a2a-agent)
+    """
+    kind = os.getenv("TRACING_EXPORTER", "none").lower()
+    service_name = os.getenv("OTEL_SERVICE_NAME", "cortex-a2a-agent")
+    if kind == "file":
+        tracer.configure(FileExporter(os.getenv("TRACING_FILE", "traces.jsonl"), service_name))
+    elif kind == "otlp":
+        endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318")
+        tracer.configure(OTLPHttpExporter(endpoint, service_name))
+    elif kind in ("", "none"):
+        tracer.configure(None)
+    else:
+        raise ValueError(f"Unknown TRACING_EXPORTER: {kind}")
+    return tracer
+
+
+def load_spans(path: str) -> list[dict]:
+    """All spans from a file written by FileExporter."""
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for resource in json.loads(line)["resourceSpans"]:
+                for scope in resource["scopeSpans"]:
+                    spans.extend(scope["spans"])
+    return spans
+
+
+def _duration_ms(span: dict) -> float:
+    return (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize exported A2A traces")
+    parser.add_argument("file", help="File written with TRACING_EXPORTER=file")
+    parser.add_argument("--slowest", type=int, default=5, help="Traces to print as span trees")
+    args = parser.parse_args()
+
+    spans = load_spans(args.file)
+    traces = defaultdict(list)
+    for span in spans:
+        traces[span["traceId"]].append(span)
+
+    by_name = defaultdict(list)
+    for span in spans:
+        by_name[span["name"]].append(_duration_ms(span))
+
+    print(f"\n🔎 {len(spans)} spans in {len(traces)} traces")
+    print("=" * 60)
+    print(f"   {'Span':<24} {'Count':>7} {'p50 ms':>9} {'p99 ms':>9} {'Total ms':>10}")
+    for name, durations in sorted(by_name.items(), key=lambda item: -sum(item[1])):
+        durations.sort()
+        # Nearest rank
+        p50 = durations[max(0, math.ceil(len(durations) * 0.50) - 1)]
+        p99 = durations[max(0, math.ceil(len(durations) * 0.99) - 1)]
+        print(f"   {name:<24} {len(durations):>7} {p50:>9.1f} {p99:>9.1f} {sum(durations):>10.1f}")
+
+    # Roots: spans whose parent is not in the file (local roots or remote parents)
+    span_ids = {span["spanId"] for span in spans}
+    roots = [span for span in spans if span.get("parentSpanId") not in span_ids]
+    roots.sort(key=_duration_ms, reverse=True)
+    for root in roots[:args.slowest]:
+        children = defaultdict(list)
+        for span in traces[root["traceId"]]:
+            children[span.get("parentSpanId")].append(span)
+
+        def show(span, depth):
+            status = " ❌" if span["status"]["code"] == STATUS_ERROR else ""
+            offset = (int(span["startTimeUnixNano"]) - int(root["startTimeUnixNano"])) / 1e6
+            print(f"   {'  ' * depth}{span['name']:<{28 - 2 * depth}} +{offset:8.1f} ms {_duration_ms(span):9.1f} ms{status}")
+            for child in sorted(children[span["spanId"]], key=lambda s: int(s["startTimeUnixNano"])):
+                show(child, depth + 1)
+
+        print(f"\n   Trace {root['traceId']}")
+        show(root, 0)
+
+
+if __name__ == "__main__":
+    main()
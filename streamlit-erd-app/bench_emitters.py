@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Synthetic benchmark for the DOT and DDL emitters.
+
+Builds a generated schema with erd_model.build_tables() (see bench_metadata.py) and
+times create_graph()/create_script(), which join the fragments of
+iter_graph()/iter_script() once, against streaming the same fragments to
+a file. Time per column should stay flat as tables get wider; streaming
+keeps peak memory near the size of one fragment instead of the document.
+
+Usage:
+    python bench_emitters.py [--tables N] [--columns N]
+"""
+
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+
+from bench_metadata import synthetic_snapshot
+from erd_model import Theme, build_tables, create_graph, create_script, iter_graph, iter_script
+
+# The app's "Common gray" theme
+THEME = Theme("#6c6c6c", "#e0e0e0", "#f5f5f5", "#e0e0e0", "#000000", "#000000",
+              "rounded", "Mrecord", "#696969", "1")
+
+
+def emitters(tables: dict) -> dict:
+    """name -> (joined, fragments) callables for each output."""
+    return {
+        "DOT": (lambda: create_graph(tables, THEME, True, True, False),
+                lambda: iter_graph(tables, THEME, True, True, False)),
+        "DDL": (lambda: create_script(tables, "BENCH_DB", "PUBLIC", False),
+                lambda: iter_script(tables, "BENCH_DB", "PUBLIC", False)),
+    }
+
+
+def stream_to_file(fragments) -> int:
+    """Write fragments to a temporary file; returns the characters written."""
+    with tempfile.TemporaryFile("w") as f:
+        f.writelines(fragments)
+        return f.tell()
+
+
+def measure(fn) -> tuple[float, float, int]:
+    """Seconds for `fn()`, its peak traced memory in MiB, and its result."""
+    gc.collect()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    del result
+    gc.collect()
+
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = result if isinstance(result, int) else len(result)
+    return seconds, peak / (1024 * 1024), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DOT and DDL generation")
+    parser.add_argument("--tables", type=int, default=1000, help="Tables in the synthetic schema")
+    parser.add_argument("--columns", type=int, default=200, help="Columns per table")
+    parser.add_argument("--key-ratio", type=float, default=0.1,
+                        help="Share of each table's columns that are foreign keys")
+    args = parser.parse_args()
+
+    print("\n🖨️  ERD Emitter Benchmark")
+    print("=" * 84)
+    print(f"   {args.tables:,} tables · up to {args.columns} columns · "
+          f"{args.key_ratio:.0%} foreign-key columns")
+    print(f"\n   {'Columns/table':>13} {'Output':>6} {'Mode':>8} {'Time (s)':>9} {'µs/column':>10}"
+          f" {'Output (MiB)':>13} {'Peak (MiB)':>11}")
+
+    results = {}
+    for n_columns in sorted({max(4, args.columns // 4), max(4, args.columns // 2), max(4, args.columns)}):
+        tables, _ = build_tables(synthetic_snapshot(args.tables, n_columns, args.key_ratio))
+        total = args.tables * n_columns
+        for output, (joined, fragments) in emitters(tables).items():
+            for mode, fn in (("joined", joined), ("streamed", lambda: stream_to_file(fragments()))):
+                seconds, peak, size = measure(fn)
+                results[output, mode, n_columns] = seconds
+                print(f"   {n_columns:>13} {output:>6} {mode:>8} {seconds:>9.2f} {seconds / total * 1e6:>10.2f}"
+                      f" {size / (1024 * 1024):>13.1f} {peak:>11.2f}", flush=True)
+        del tables
+
+    largest = max(key[2] for key in results)
+    smallest = min(key[2] for key in results)
+    print("\n📊 Summary")
+    print("=" * 84)
+    for output in ("DOT", "DDL"):
+        for mode in ("joined", "streamed"):
+            growth = results[output, mode, largest] / results[output, mode, smallest]
+            print(f"   {output} {mode:>8}: {largest // smallest}x columns -> {growth:.1f}x time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Synthetic benchmark for building the ERD object graph.
+
+Runs build_tables() from erd_model.py on a generated metadata snapshot (no
+Snowflake connection and no Streamlit needed) at 1/4, 1/2 and all of
+--columns per table. Build time and memory per column should stay flat.
+Key rows grow with the column count, so it also replays the build's
+getColumn lookups against a linear scan of the column list (the previous
+lookup), which makes key wiring quadratic per table, and compares the
+memory of a __slots__ Column with a plain per-instance __dict__ record.
+
+Usage:
+    python bench_metadata.py [--tables N] [--columns N] [--key-ratio R]
+    python bench_metadata.py --tables 5000 --columns 200   # ~1M columns, a few minutes
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from erd_model import Column, build_tables
+
+
+class DictColumn:
+    """Column's fields on a plain class with a per-instance __dict__ (the previous record)."""
+
+    def __init__(self, table, name, comment):
+        self.table = table
+        self.name = name
+        self.comment = comment if comment and comment != 'None' else ''
+        self.nullable = True
+        self.datatype = None
+        self.identity = False
+        self.isunique = False
+        self.ispk = False
+        self.pkconstraint = None
+        self.fkof = None
+
+
+def synthetic_snapshot(n_tables: int, n_columns: int, key_ratio: float) -> dict:
+    """
+    A metadata snapshot shaped like the app's get_metadata_snapshot().
+
+    Every table has a one-column primary key (C0) and unique key (C1), and
+    `key_ratio` of its columns, spread over the table, are single-column
+    foreign keys to the next table's primary key.
+    """
+    datatypes = [
+        json.dumps({"type": "FIXED", "precision": 38, "scale": 0, "nullable": False}),
+        json.dumps({"type": "TEXT", "length": 255, "fixed": False, "nullable": True}),
+        json.dumps({"type": "TIMESTAMP_NTZ", "precision": 0, "scale": 9, "nullable": True}),
+    ]
+    n_fks = min(n_columns - 2, int(n_columns * key_ratio))
+    stride = max(1, (n_columns - 2) // max(1, n_fks))
+    rows = {kind: [] for kind in ("TABLES", "VIEWS", "COLUMNS", "UNIQUE KEYS", "PRIMARY KEYS", "IMPORTED KEYS")}
+
+    for t in range(n_tables):
+        table = f"T{t}"
+        rows["TABLES"].append({"name": table, "comment": None})
+        for c in range(n_columns):
+            rows["COLUMNS"].append({"table_name": table, "column_name": f"C{c}", "comment": None,
+                                    "autoincrement": "", "data_type": datatypes[c % len(datatypes)]})
+        rows["PRIMARY KEYS"].append({"table_name": table, "column_name": "C0",
+                                     "constraint_name": f"PK_{table}", "key_sequence": 1})
+        rows["UNIQUE KEYS"].append({"table_name": table, "column_name": "C1",
+                                    "constraint_name": f"UQ_{table}"})
+        target = f"T{(t + 1) % n_tables}"
+        for k in range(n_fks):
+            rows["IMPORTED KEYS"].append({
+                "pk_schema_name": "PUBLIC", "pk_table_name": target, "pk_column_name": "C0",
+                "fk_schema_name": "PUBLIC", "fk_table_name": table,
+                "fk_column_name": f"C{2 + k * stride}", "fk_name": f"FK_{table}_{k}"
+            })
+    return {"rows": rows, "errors": {}, "metadata_ms": 0, "fetched_at": "00:00:00"}
+
+
+def key_lookups(snapshot: dict) -> list[tuple[str, str]]:
+    """(table, column) pairs build_tables() resolves with getColumn, in order."""
+    rows = snapshot["rows"]
+    pairs = [(r["table_name"], r["column_name"]) for r in rows["UNIQUE KEYS"] + rows["PRIMARY KEYS"]]
+    for r in rows["IMPORTED KEYS"]:
+        pairs.append((r["pk_table_name"], r["pk_column_name"]))
+        pairs.append((r["fk_table_name"], r["fk_column_name"]))
+    return pairs
+
+
+def scan_column(table, name):
+    """The previous Table.getColumn: a linear scan of the column list."""
+    for column in table.columns:
+        if column.name == name:
+            return column
+    return None
+
+
+def measure(snapshot: dict) -> dict:
+    """Build time, key lookup times (index and scan) and the MiB the graph holds."""
+    gc.collect()
+    start = time.perf_counter()
+    tables, _ = build_tables(snapshot)
+    build = time.perf_counter() - start
+
+    pairs = key_lookups(snapshot)
+    start = time.perf_counter()
+    for table, column in pairs:
+        tables[table].getColumn(column)
+    index = time.perf_counter() - start
+    start = time.perf_counter()
+    for table, column in pairs:
+        scan_column(tables[table], column)
+    scan = time.perf_counter() - start
+    del tables
+    gc.collect()
+
+    tracemalloc.start()
+    tables, _ = build_tables(snapshot)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tables
+    return {"build": build, "index": index, "scan": scan, "mib": current / (1024 * 1024)}
+
+
+def record_bytes(cls, count: int = 100000) -> float:
+    """Traced bytes per instance of a column record class."""
+    # Names are created first, so only the records and their list are traced
+    names = [f"C{i}" for i in range(count)]
+    gc.collect()
+    tracemalloc.start()
+    records = [cls(None, name, None) for name in names]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return current / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark building the ERD object graph")
+    parser.add_argument("--tables", type=int, default=1000, help="Tables in the synthetic schema")
+    parser.add_argument("--columns", type=int, default=200, help="Columns per table")
+    parser.add_argument("--key-ratio", type=float, default=0.1,
+                        help="Share of each table's columns that are foreign keys")
+    args = parser.parse_args()
+
+    print("\n🧮 ERD Metadata Benchmark")
+    print("=" * 84)
+    print(f"   {args.tables:,} tables · up to {args.columns} columns · "
+          f"{args.key_ratio:.0%} foreign-key columns")
+    print(f"\n   {'Columns/table':>13} {'Build (s)':>10} {'µs/column':>10} {'Index (s)':>10} {'Scan (s)':>9}"
+          f" {'Graph (MiB)':>12} {'B/column':>9}", flush=True)
+
+    results = {}
+    for n_columns in sorted({max(4, args.columns // 4), max(4, args.columns // 2), max(4, args.columns)}):
+        snapshot = synthetic_snapshot(args.tables, n_columns, args.key_ratio)
+        total = args.tables * n_columns
+        r = results[n_columns] = measure(snapshot)
+        print(f"   {n_columns:>13} {r['build']:>10.2f} {r['build'] / total * 1e6:>10.2f} {r['index']:>10.3f}"
+              f" {r['scan']:>9.3f} {r['mib']:>12.1f} {r['mib'] * 1024 * 1024 / total:>9.0f}", flush=True)
+        del snapshot
+
+    largest = max(results)
+    smallest = min(results)
+    print("\n📊 Summary")
+    print("=" * 84)
+    print(f"   {largest // smallest}x columns -> {results[largest]['build'] / results[smallest]['build']:.1f}x build time, "
+          f"{results[largest]['mib'] / results[smallest]['mib']:.1f}x memory")
+    print(f"   Key lookups: {results[largest]['index'] / results[smallest]['index']:.1f}x (index) vs "
+          f"{results[largest]['scan'] / results[smallest]['scan']:.1f}x (scan); index "
+          f"{results[largest]['scan'] / results[largest]['index']:.1f}x faster at {largest} columns/table")
+    print(f"   Column record: {record_bytes(Column):.0f} B with __slots__, "
+          f"{record_bytes(DictColumn):.0f} B with a __dict__")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+"""
+ERD model: tables and columns, the graph builders for metadata snapshots
+and the DOT / DDL emitters. No Streamlit or Snowpark imports, so the
+benchmarks (and anything else) can import it directly.
+"""
+
+import json
+import re
+
+class Theme:
+    def __init__(self, color, fillcolor, fillcolorC, bgcolor, icolor, tcolor, style, shape, pencolor, penwidth):
+        self.color = color
+        self.fillcolor = fillcolor
+        self.fillcolorC = fillcolorC
+        self.bgcolor = bgcolor
+        self.icolor = icolor
+        self.tcolor = tcolor
+        self.style = style
+        self.shape = shape
+        self.pencolor = pencolor
+        self.penwidth = penwidth
+
+class Column:
+    # Compact records: a large catalog holds one per column
+    __slots__ = ("table", "name", "comment", "nullable", "datatype", "identity",
+                 "isunique", "ispk", "pkconstraint", "fkof")
+
+    def __init__(self, table, name, comment):
+        self.table = table
+        self.name = name
+        self.comment = comment if comment and comment != 'None' else ''
+        self.nullable = True
+        self.datatype = None
+        self.identity = False
+        self.isunique = False
+        self.ispk = False
+        self.pkconstraint = None
+        self.fkof = None
+
+    def getName(self, useUpperCase, withQuotes=True):
+        return Table.getClassName(self.name, useUpperCase, withQuotes)
+
+    def setDataType(self, datatype):
+        self.datatype = datatype.get("type", "")
+        self.nullable = bool(datatype.get("nullable", True))
+        if self.datatype == "FIXED":
+            self.datatype = "NUMBER"
+        elif "fixed" in datatype:
+            fixed = bool(datatype.get("fixed", False))
+            if self.datatype == "TEXT":
+                self.datatype = "CHAR" if fixed else "VARCHAR"
+        if "length" in datatype:
+            self.datatype += f"({datatype['length']})"
+        elif "precision" in datatype:
+            prec = int(datatype.get('precision', 0))
+            scale = int(datatype.get('scale', 0))
+            if prec > 0:
+                if scale == 0:
+                    self.datatype += f"({prec})"
+                else:
+                    self.datatype += f"({prec},{scale})"
+        self.datatype = self.datatype.lower()
+
+class Table:
+    __slots__ = ("name", "schema", "comment", "label", "columns", "columnsByName", "uniques", "pks", "fks")
+
+    def __init__(self, name, comment, schema=None):
+        self.name = name
+        # Set in whole-database diagrams, where names are schema-qualified
+        self.schema = schema
+        self.comment = comment if comment and comment != 'None' else ''
+        self.label = None
+        self.columns = []
+        # Name -> column index next to the ordered list, for key wiring
+        self.columnsByName = {}
+        self.uniques = {}
+        self.pks = []
+        self.fks = {}
+
+    @classmethod
+    def getClassName(cls, name, useUpperCase, withQuotes=True):
+        if re.match("^[A-Z_0-9]*$", name) is None:
+            return f'"{name}"' if withQuotes else name
+        return name.upper() if useUpperCase else name.lower()
+
+    def getName(self, useUpperCase, withQuotes=True):
+        name = Table.getClassName(self.name, useUpperCase, withQuotes)
+        if self.schema is None:
+            return name
+        return f"{Table.getClassName(self.schema, useUpperCase, withQuotes)}.{name}"
+
+    def addColumn(self, column):
+        self.columns.append(column)
+        self.columnsByName.setdefault(column.name, column)
+
+    def getColumn(self, name):
+        return self.columnsByName.get(name)
+
+    def getDotShape(self, theme, showColumns, showTypes, useUpperCase):
+        return "".join(self.iterDotShape(theme, showColumns, showTypes, useUpperCase))
+
+    def iterDotShape(self, theme, showColumns, showTypes, useUpperCase):
+        fillcolor = theme.fillcolorC if showColumns else theme.fillcolor
+        colspan = "2" if showTypes else "1"
+        tableName = self.getName(useUpperCase, False)
+        yield (f'  {self.label} [\n'
+            + f'    fillcolor="{fillcolor}" color="{theme.color}" penwidth="1"\n'
+            + f'    label=<<table style="{theme.style}" border="0" cellborder="0" cellspacing="0" cellpadding="1">\n'
+            + f'      <tr><td bgcolor="{theme.bgcolor}" align="center"'
+            + f' colspan="{colspan}"><font color="{theme.tcolor}"><b>{tableName}</b></font></td></tr>\n')
+
+        if showColumns:
+            for column in self.columns:
+                name = column.getName(useUpperCase, False)
+                if column.ispk:
+                    name = f"<u>{name}</u>"
+                if column.fkof is not None:
+                    name = f"<i>{name}</i>"
+                if column.nullable:
+                    name = f"{name}*"
+                if column.identity:
+                    name = f"{name} I"
+                if column.isunique:
+                    name = f"{name} U"
+                datatype = column.datatype
+                if useUpperCase:
+                    datatype = datatype.upper()
+
+                if showTypes:
+                    yield (f'      <tr><td align="left"><font color="{theme.icolor}">{name}&nbsp;</font></td>\n'
+                        + f'        <td align="left"><font color="{theme.icolor}">{datatype}</font></td></tr>\n')
+                else:
+                    yield f'      <tr><td align="left"><font color="{theme.icolor}">{name}</font></td></tr>\n'
+
+        yield '    </table>>\n  ]\n'
+
+    def getDotLinks(self, theme):
+        return "".join(self.iterDotLinks(theme))
+
+    def iterDotLinks(self, theme):
+        for constraint in self.fks:
+            fks = self.fks[constraint]
+            fk1 = fks[0]
+            dashed = "" if not fk1.nullable else ' style="dashed"'
+            arrow = "" if fk1.ispk and len(self.pks) == len(fk1.fkof.table.pks) else ' arrowtail="crow"'
+            yield (f'  {self.label} -> {fk1.fkof.table.label}'
+                + f' [ penwidth="{theme.penwidth}" color="{theme.pencolor}"{dashed}{arrow} ]\n')
+
+def safe_get(row, key, default=""):
+    try:
+        val = row[key]
+        return str(val) if val is not None else default
+    except:
+        return default
+
+def rows_of(snapshot, kind):
+    if kind in snapshot["errors"]:
+        raise RuntimeError(snapshot["errors"][kind])
+    return snapshot["rows"].get(kind, [])
+
+def build_tables(snapshot):
+    # Object graph from a metadata snapshot; runs in memory on every rerun
+    tables = {}
+    debug_info = {"tables": 0, "views": 0, "columns": 0, "pks": 0, "fks": 0, "fk_rows": [],
+                  "metadata_ms": snapshot["metadata_ms"], "fetched_at": snapshot["fetched_at"]}
+
+    for row in rows_of(snapshot, "TABLES"):
+        tableName = str(row["name"])
+        table = Table(tableName, safe_get(row, "comment", ""))
+        tables[tableName] = table
+        table.label = f"n{len(tables)}"
+    debug_info["tables"] = len(tables)
+
+    try:
+        view_count = 0
+        for row in rows_of(snapshot, "VIEWS"):
+            viewName = str(row["name"])
+            if viewName not in tables:
+                table = Table(viewName, safe_get(row, "comment", ""))
+                tables[viewName] = table
+                table.label = f"n{len(tables)}"
+                view_count += 1
+        debug_info["views"] = view_count
+    except:
+        pass
+
+    col_count = 0
+    for row in rows_of(snapshot, "COLUMNS"):
+        tableName = str(row["table_name"])
+        if tableName in tables:
+            table = tables[tableName]
+            name = str(row["column_name"])
+            column = Column(table, name, safe_get(row, "comment", ""))
+            table.addColumn(column)
+            column.identity = safe_get(row, "autoincrement", "") != ''
+            col_count += 1
+            try:
+                column.setDataType(json.loads(str(row["data_type"])))
+            except:
+                column.datatype = "unknown"
+    debug_info["columns"] = col_count
+
+    wire_keys(tables, snapshot, debug_info, qualified=False)
+    return tables, debug_info
+
+def wire_keys(tables, snapshot, debug_info, qualified):
+    # Unique, primary and foreign keys from the SHOW ... KEYS rows. `tables`
+    # is keyed by "SCHEMA.TABLE" when `qualified`, which also keeps
+    # cross-schema foreign keys; otherwise by table name.
+    def tableKey(row, prefix=""):
+        name = str(row[f"{prefix}table_name"])
+        return f"{row[f'{prefix}schema_name']}.{name}" if qualified else name
+
+    try:
+        for row in rows_of(snapshot, "UNIQUE KEYS"):
+            tableName = tableKey(row)
+            if tableName in tables:
+                table = tables[tableName]
+                column = table.getColumn(str(row["column_name"]))
+                if column:
+                    constraint = str(row["constraint_name"])
+                    if constraint not in table.uniques:
+                        table.uniques[constraint] = []
+                    table.uniques[constraint].append(column)
+                    column.isunique = True
+    except:
+        pass
+
+    try:
+        pk_count = 0
+        for row in rows_of(snapshot, "PRIMARY KEYS"):
+            tableName = tableKey(row)
+            if tableName in tables:
+                table = tables[tableName]
+                column = table.getColumn(str(row["column_name"]))
+                if column:
+                    column.ispk = True
+                    column.pkconstraint = str(row["constraint_name"])
+                    pk_count += 1
+                    pos = int(row["key_sequence"]) - 1
+                    while len(table.pks) <= pos:
+                        table.pks.append(None)
+                    table.pks[pos] = column
+        for table in tables.values():
+            table.pks = [pk for pk in table.pks if pk is not None]
+        debug_info["pks"] = pk_count
+    except:
+        pass
+
+    try:
+        fk_count = 0
+        for row in rows_of(snapshot, "IMPORTED KEYS"):
+            debug_info["fk_rows"].append(row)
+            pktableName = tableKey(row, "pk_")
+            fktableName = tableKey(row, "fk_")
+            if pktableName in tables and fktableName in tables:
+                pktable = tables[pktableName]
+                pkcolumn = pktable.getColumn(str(row["pk_column_name"]))
+                fktable = tables[fktableName]
+                fkcolumn = fktable.getColumn(str(row["fk_column_name"]))
+                if pkcolumn and fkcolumn:
+                    if qualified or safe_get(row, "pk_schema_name", "") == safe_get(row, "fk_schema_name", ""):
+                        constraint = str(row["fk_name"])
+                        if constraint not in fktable.fks:
+                            fktable.fks[constraint] = []
+                        fktable.fks[constraint].append(fkcolumn)
+                        fkcolumn.fkof = pkcolumn
+                        fk_count += 1
+        debug_info["fks"] = fk_count
+    except Exception as e:
+        debug_info["fk_error"] = str(e)
+
+def info_schema_datatype(row):
+    # INFORMATION_SCHEMA.COLUMNS in the shape of SHOW COLUMNS' data_type
+    datatype = {"type": str(row["DATA_TYPE"]), "nullable": row["IS_NULLABLE"] == "YES"}
+    if datatype["type"] == "TEXT":
+        datatype["fixed"] = False
+    if row["CHARACTER_MAXIMUM_LENGTH"] is not None:
+        datatype["length"] = row["CHARACTER_MAXIMUM_LENGTH"]
+    elif datatype["type"] == "NUMBER" and row["NUMERIC_PRECISION"] is not None:
+        datatype["precision"] = row["NUMERIC_PRECISION"]
+        datatype["scale"] = row["NUMERIC_SCALE"] or 0
+    return datatype
+
+def build_database_tables(snapshot):
+    # Object graph for every schema in one pass, keyed by "SCHEMA.TABLE"
+    tables = {}
+    debug_info = {"tables": 0, "views": 0, "columns": 0, "pks": 0, "fks": 0, "fk_rows": [],
+                  "metadata_ms": snapshot["metadata_ms"], "fetched_at": snapshot["fetched_at"]}
+
+    schemas = set()
+    for row in rows_of(snapshot, "TABLES"):
+        schemaName = str(row["TABLE_SCHEMA"])
+        table = Table(str(row["TABLE_NAME"]), safe_get(row, "COMMENT", ""), schemaName)
+        tables[f"{schemaName}.{table.name}"] = table
+        table.label = f"n{len(tables)}"
+        schemas.add(schemaName)
+        if row["TABLE_TYPE"] == "VIEW":
+            debug_info["views"] += 1
+        else:
+            debug_info["tables"] += 1
+    debug_info["schemas"] = len(schemas)
+
+    col_count = 0
+    for row in rows_of(snapshot, "COLUMNS"):
+        table = tables.get(f"{row['TABLE_SCHEMA']}.{row['TABLE_NAME']}")
+        if table is not None:
+            column = Column(table, str(row["COLUMN_NAME"]), safe_get(row, "COMMENT", ""))
+            table.addColumn(column)
+            column.identity = row["IS_IDENTITY"] == "YES"
+            col_count += 1
+            try:
+                column.setDataType(info_schema_datatype(row))
+            except:
+                column.datatype = "unknown"
+    debug_info["columns"] = col_count
+
+    wire_keys(tables, snapshot, debug_info, qualified=True)
+    return tables, debug_info
+
+# The emitters yield fragments: join them once (create_graph, create_script)
+# or write them straight to a file, without building the document piecewise
+def iter_graph(tables, theme, showColumns, showTypes, useUpperCase):
+    yield ('digraph {\n'
+        + '  graph [ rankdir="LR" bgcolor="#ffffff" ]\n'
+        + f'  node [ style="filled" shape="{theme.shape}" gradientangle="180" ]\n'
+        + '  edge [ arrowhead="none" arrowtail="none" dir="both" ]\n\n')
+
+    for table in tables.values():
+        yield from table.iterDotShape(theme, showColumns, showTypes, useUpperCase)
+    yield "\n"
+    for table in tables.values():
+        yield from table.iterDotLinks(theme)
+    yield "}\n"
+
+def create_graph(tables, theme, showColumns, showTypes, useUpperCase):
+    return "".join(iter_graph(tables, theme, showColumns, showTypes, useUpperCase))
+
+def iter_script(tables, database, schema, useUpperCase):
+    # `schema` None scripts every schema the (schema-qualified) tables live in
+    db = Table.getClassName(database, useUpperCase)
+    schemas = [schema] if schema else list(dict.fromkeys(t.schema for t in tables.values()))
+    yield f"USE DATABASE {db};\n" if useUpperCase else f"use database {db};\n"
+    for name in schemas:
+        sch = f'{db}.{Table.getClassName(name, useUpperCase)}'
+        if useUpperCase:
+            yield f"CREATE OR REPLACE SCHEMA {sch};\n"
+        else:
+            yield f"create or replace schema {sch};\n"
+    yield "\n"
+
+    for table in tables.values():
+        if useUpperCase:
+            yield f"CREATE OR REPLACE TABLE {table.getName(useUpperCase)} (\n"
+        else:
+            yield f"create or replace table {table.getName(useUpperCase)} (\n"
+
+        separator = ""
+        for column in table.columns:
+            nullable = "" if column.nullable else " NOT NULL" if useUpperCase else " not null"
+            datatype = column.datatype.upper() if useUpperCase else column.datatype
+            yield f"{separator}  {column.getName(useUpperCase)} {datatype}{nullable}"
+            separator = ",\n"
+
+        if table.pks:
+            pks = [col.getName(useUpperCase) for col in table.pks]
+            pklist = ", ".join(pks)
+            if useUpperCase:
+                yield f",\n  PRIMARY KEY ({pklist})"
+            else:
+                yield f",\n  primary key ({pklist})"
+
+        yield "\n);\n\n"
+
+    for table in tables.values():
+        for constraint in table.fks:
+            fks = table.fks[constraint]
+            pktable = fks[0].fkof.table
+            fklist = ", ".join([col.getName(useUpperCase) for col in fks])
+            pklist = ", ".join([col.fkof.getName(useUpperCase) for col in fks])
+            if useUpperCase:
+                yield (f"ALTER TABLE {table.getName(useUpperCase)}\n"
+                    + f"  ADD CONSTRAINT {Table.getClassName(constraint, useUpperCase)}\n"
+                    + f"  FOREIGN KEY ({fklist})\n"
+                    + f"  REFERENCES {pktable.getName(useUpperCase)} ({pklist});\n\n")
+            else:
+                yield (f"alter table {table.getName(useUpperCase)}\n"
+                    + f"  add constraint {Table.getClassName(constraint, useUpperCase)}\n"
+                    + f"  foreign key ({fklist})\n"
+                    + f"  references {pktable.getName(useUpperCase)} ({pklist});\n\n")
+
+def create_script(tables, database, schema, useUpperCase):
+    return "".join(iter_script(tables, database, schema, useUpperCase))
@@ -4,132 +4,14 @@ https://github.com/cristiscu/streamlit-erd-viewer
 """
 
 import streamlit as st
-import json
-import re
+import time
 from snowflake.snowpark.context import get_active_session
+from erd_model import Theme, build_tables, build_database_tables, create_graph, create_script
 
 st.set_page_config(page_title="ERD Viewer", page_icon=":material/schema:", layout="wide")
 
-class Theme:
-    def __init__(self, color, fillcolor, fillcolorC, bgcolor, icolor, tcolor, style, shape, pencolor, penwidth):
-        self.color = color
-        self.fillcolor = fillcolor
-        self.fillcolorC = fillcolorC
-        self.bgcolor = bgcolor
-        self.icolor = icolor
-        self.tcolor = tcolor
-        self.style = style
-        self.shape = shape
-        self.pencolor = pencolor
-        self.penwidth = penwidth
-
-class Column:
-    def __init__(self, table, name, comment):
-        self.table = table
-        self.name = name
-        self.comment = comment if comment and comment != 'None' else ''
-        self.nullable = True
-        self.datatype = None
-        self.identity = False
-        self.isunique = False
-        self.ispk = False
-        self.pkconstraint = None
-        self.fkof = None
-
-    def getName(self, useUpperCase, withQuotes=True):
-        return Table.getClassName(self.name, useUpperCase, withQuotes)
-
-    def setDataType(self, datatype):
-        self.datatype = datatype.get("type", "")
-        self.nullable = bool(datatype.get("nullable", True))
-        if self.datatype == "FIXED":
-            self.datatype = "NUMBER"
-        elif "fixed" in datatype:
-            fixed = bool(datatype.get("fixed", False))
-            if self.datatype == "TEXT":
-                self.datatype = "CHAR" if fixed else "VARCHAR"
-        if "length" in datatype:
-            self.datatype += f"({datatype['length']})"
-        elif "precision" in datatype:
-            prec = int(datatype.get('precision', 0))
-            scale = int(datatype.get('scale', 0))
-            if prec > 0:
-                if scale == 0:
-                    self.datatype += f"({prec})"
-                else:
-                    self.datatype += f"({prec},{scale})"
-        self.datatype = self.datatype.lower()
-
-class Table:
-    def __init__(self, name, comment):
-        self.name = name
-        self.comment = comment if comment and comment != 'None' else ''
-        self.label = None
-        self.columns = []
-        self.uniques = {}
-        self.pks = []
-        self.fks = {}
-
-    @classmethod
-    def getClassName(cls, name, useUpperCase, withQuotes=True):
-        if re.match("^[A-Z_0-9]*$", name) is None:
-            return f'"{name}"' if withQuotes else name
-        return name.upper() if useUpperCase else name.lower()
-
-    def getName(self, useUpperCase, withQuotes=True):
-        return Table.getClassName(self.name, useUpperCase, withQuotes)
-
-    def getColumn(self, name):
-        for column in self.columns:
-            if column.name == name:
-                return column
-        return None
-
-    def getDotShape(self, theme, showColumns, showTypes, useUpperCase):
-        fillcolor = theme.fillcolorC if showColumns else theme.fillcolor
-        colspan = "2" if showTypes else "1"
-        tableName = self.getName(useUpperCase, False)
-        s = (f'  {self.label} [\n'
-            + f'    fillcolor="{fillcolor}" color="{theme.color}" penwidth="1"\n'
-            + f'    label=<<table style="{theme.style}" border="0" cellborder="0" cellspacing="0" cellpadding="1">\n'
-            + f'      <tr><td bgcolor="{theme.bgcolor}" align="center"'
-            + f' colspan="{colspan}"><font color="{theme.tcolor}"><b>{tableName}</b></font></td></tr>\n')
-
-        if showColumns:
-            for column in self.columns:
-                name = column.getName(useUpperCase, False)
-                if column.ispk:
-                    name = f"<u>{name}</u>"
-                if column.fkof is not None:
-                    name = f"<i>{name}</i>"
-                if column.nullable:
-                    name = f"{name}*"
-                if column.identity:
-                    name = f"{name} I"
-                if column.isunique:
-                    name = f"{name} U"
-                datatype = column.datatype
-                if useUpperCase:
-                    datatype = datatype.upper()
-
-                if showTypes:
-                    s += (f'      <tr><td align="left"><font color="{theme.icolor}">{name}&nbsp;</font></td>\n'
-                        + f'        <td align="left"><font color="{theme.icolor}">{datatype}</font></td></tr>\n')
-                else:
-                    s += f'      <tr><td align="left"><font color="{theme.icolor}">{name}</font></td></tr>\n'
-
-        return s + '    </table>>\n  ]\n'
-
-    def getDotLinks(self, theme):
-        s = ""
-        for constraint in self.fks:
-            fks = self.fks[constraint]
-            fk1 = fks[0]
-            dashed = "" if not fk1.nullable else ' style="dashed"'
-            arrow = "" if fk1.ispk and len(self.pks) == len(fk1.fkof.table.pks) else ' arrowtail="crow"'
-            s += (f'  {self.label} -> {fk1.fkof.table.label}'
-                + f' [ penwidth="{theme.penwidth}" color="{theme.pencolor}"{dashed}{arrow} ]\n')
-        return s
+def quote_name(name):
+    return name.upper() if name.upper() == name else f'"{name}"'
 
 @st.cache_resource
 def get_session():
@@ -146,199 +28,120 @@ def get_schemas(database):
     if not database:
         return []
     session = get_session()
-    db_name = database.upper() if database.upper() == database else f'"{database}"'
-    query = f"SHOW SCHEMAS IN DATABASE {db_name}"
+    query = f"SHOW SCHEMAS IN DATABASE {quote_name(database)}"
     results = session.sql(query).collect()
     return [str(row["name"]) for row in results if str(row["name"]) != "INFORMATION_SCHEMA"]
 
-def safe_get(row, key, default=""):
+# SHOW statements behind one diagram, submitted together
+METADATA_QUERIES = ("TABLES", "VIEWS", "COLUMNS", "UNIQUE KEYS", "PRIMARY KEYS", "IMPORTED KEYS")
+
+def fetch_metadata(session, queries):
+    # Submit every statement as an async job first, then wait for them all:
+    # the round trips overlap, so the total is the slowest one, not the sum.
+    # A failed statement is returned as its exception.
+    jobs = {}
+    for kind, query in queries.items():
+        try:
+            jobs[kind] = session.sql(query).collect_nowait()
+        except Exception as e:
+            jobs[kind] = e
+    results = {}
+    for kind, job in jobs.items():
+        if isinstance(job, Exception):
+            results[kind] = job
+            continue
+        try:
+            results[kind] = job.result()
+        except Exception as e:
+            results[kind] = e
+    return results
+
+# The diagram cannot be built without these
+REQUIRED_QUERIES = ("TABLES", "COLUMNS")
+
+def get_schema_fingerprint(database, schema):
+    # Changes whenever an object in the schema (or in the whole database when
+    # `schema` is None) is created, dropped or altered
+    session = get_session()
+    if schema:
+        literal = schema.replace("'", "''")
+        condition = f"TABLE_SCHEMA = '{literal}'"
+    else:
+        condition = "TABLE_SCHEMA <> 'INFORMATION_SCHEMA'"
+    query = (f"SELECT COUNT(*) AS N, MAX(LAST_ALTERED) AS LAST_ALTERED"
+             f" FROM {quote_name(database)}.INFORMATION_SCHEMA.TABLES WHERE {condition}")
     try:
-        val = row[key]
-        return str(val) if val is not None else default
+        row = session.sql(query).collect()[0]
+        return f"{row['N']}:{row['LAST_ALTERED']}"
     except:
-        return default
+        return None
 
-def import_metadata(database, schema):
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def get_metadata_snapshot(database, schema, fingerprint):
+    # A plain-dict copy of the SHOW results for one schema; `fingerprint`
+    # only keys the cache so a schema change reads the metadata again.
+    # Cleared by the "Refresh cache" button.
+    suffix = f"IN SCHEMA {quote_name(database)}.{quote_name(schema)}"
+    return take_snapshot({kind: f"SHOW {kind} {suffix}" for kind in METADATA_QUERIES})
+
+# Whole-database metadata: objects and columns in two set-based INFORMATION_SCHEMA
+# queries (SHOW COLUMNS stops at 10,000 rows), keys from SHOW ... IN DATABASE since
+# Snowflake's INFORMATION_SCHEMA has no key column usage view
+DATABASE_QUERIES = {
+    "TABLES": ("SELECT TABLE_SCHEMA, TABLE_NAME, TABLE_TYPE, COMMENT FROM {db}.INFORMATION_SCHEMA.TABLES"
+               " WHERE TABLE_SCHEMA <> 'INFORMATION_SCHEMA' ORDER BY TABLE_SCHEMA, TABLE_NAME"),
+    "COLUMNS": ("SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, IS_NULLABLE, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH,"
+                " NUMERIC_PRECISION, NUMERIC_SCALE, IS_IDENTITY, COMMENT FROM {db}.INFORMATION_SCHEMA.COLUMNS"
+                " WHERE TABLE_SCHEMA <> 'INFORMATION_SCHEMA' ORDER BY TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION"),
+    "UNIQUE KEYS": "SHOW UNIQUE KEYS IN DATABASE {db}",
+    "PRIMARY KEYS": "SHOW PRIMARY KEYS IN DATABASE {db}",
+    "IMPORTED KEYS": "SHOW IMPORTED KEYS IN DATABASE {db}",
+}
+
+@st.cache_data(ttl=3600, max_entries=8, show_spinner=False)
+def get_database_snapshot(database, fingerprint):
+    # Same as get_metadata_snapshot, for every schema of the database at once
+    db = quote_name(database)
+    return take_snapshot({kind: query.format(db=db) for kind, query in DATABASE_QUERIES.items()})
+
+def take_snapshot(queries):
     session = get_session()
+    start = time.perf_counter()
+    results = fetch_metadata(session, queries)
+    snapshot = {
+        "rows": {},
+        "errors": {},
+        "metadata_ms": round((time.perf_counter() - start) * 1000),
+        "fetched_at": time.strftime("%H:%M:%S"),
+    }
+    for kind, rows in results.items():
+        if isinstance(rows, Exception):
+            # Never cache a snapshot that is missing what the diagram needs
+            if kind in REQUIRED_QUERIES:
+                raise rows
+            snapshot["errors"][kind] = str(rows)
+        else:
+            snapshot["rows"][kind] = [row.as_dict() for row in rows]
+    return snapshot
+
+def import_metadata(database, schema):
+    # `schema` None imports every schema of the database
     tables = {}
     debug_info = {"tables": 0, "views": 0, "columns": 0, "pks": 0, "fks": 0, "fk_rows": []}
-    if not database or not schema:
+    if not database:
         return tables, debug_info
-    
-    db_name = database.upper() if database.upper() == database else f'"{database}"'
-    sch_name = schema.upper() if schema.upper() == schema else f'"{schema}"'
-    suffix = f"IN SCHEMA {db_name}.{sch_name}"
 
-    results = session.sql(f"SHOW TABLES {suffix}").collect()
-    for row in results:
-        tableName = str(row["name"])
-        table = Table(tableName, safe_get(row, "comment", ""))
-        tables[tableName] = table
-        table.label = f"n{len(tables)}"
-    debug_info["tables"] = len(tables)
-
-    try:
-        results = session.sql(f"SHOW VIEWS {suffix}").collect()
-        view_count = 0
-        for row in results:
-            viewName = str(row["name"])
-            if viewName not in tables:
-                table = Table(viewName, safe_get(row, "comment", ""))
-                tables[viewName] = table
-                table.label = f"n{len(tables)}"
-                view_count += 1
-        debug_info["views"] = view_count
-    except:
-        pass
-
-    results = session.sql(f"SHOW COLUMNS {suffix}").collect()
-    col_count = 0
-    for row in results:
-        tableName = str(row["table_name"])
-        if tableName in tables:
-            table = tables[tableName]
-            name = str(row["column_name"])
-            column = Column(table, name, safe_get(row, "comment", ""))
-            table.columns.append(column)
-            column.identity = safe_get(row, "autoincrement", "") != ''
-            col_count += 1
-            try:
-                column.setDataType(json.loads(str(row["data_type"])))
-            except:
-                column.datatype = "unknown"
-    debug_info["columns"] = col_count
-
-    try:
-        results = session.sql(f"SHOW UNIQUE KEYS {suffix}").collect()
-        for row in results:
-            tableName = str(row["table_name"])
-            if tableName in tables:
-                table = tables[tableName]
-                column = table.getColumn(str(row["column_name"]))
-                if column:
-                    constraint = str(row["constraint_name"])
-                    if constraint not in table.uniques:
-                        table.uniques[constraint] = []
-                    table.uniques[constraint].append(column)
-                    column.isunique = True
-    except:
-        pass
-
-    try:
-        results = session.sql(f"SHOW PRIMARY KEYS {suffix}").collect()
-        pk_count = 0
-        for row in results:
-            tableName = str(row["table_name"])
-            if tableName in tables:
-                table = tables[tableName]
-                column = table.getColumn(str(row["column_name"]))
-                if column:
-                    column.ispk = True
-                    column.pkconstraint = str(row["constraint_name"])
-                    pk_count += 1
-                    pos = int(row["key_sequence"]) - 1
-                    while len(table.pks) <= pos:
-                        table.pks.append(None)
-                    table.pks[pos] = column
-        for table in tables.values():
-            table.pks = [pk for pk in table.pks if pk is not None]
-        debug_info["pks"] = pk_count
-    except:
-        pass
-
-    try:
-        results = session.sql(f"SHOW IMPORTED KEYS {suffix}").collect()
-        fk_count = 0
-        for row in results:
-            debug_info["fk_rows"].append(dict(row))
-            pktableName = str(row["pk_table_name"])
-            fktableName = str(row["fk_table_name"])
-            if pktableName in tables and fktableName in tables:
-                pktable = tables[pktableName]
-                pkcolumn = pktable.getColumn(str(row["pk_column_name"]))
-                fktable = tables[fktableName]
-                fkcolumn = fktable.getColumn(str(row["fk_column_name"]))
-                if pkcolumn and fkcolumn:
-                    if safe_get(row, "pk_schema_name", "") == safe_get(row, "fk_schema_name", ""):
-                        constraint = str(row["fk_name"])
-                        if constraint not in fktable.fks:
-                            fktable.fks[constraint] = []
-                        fktable.fks[constraint].append(fkcolumn)
-                        fkcolumn.fkof = pkcolumn
-                        fk_count += 1
-        debug_info["fks"] = fk_count
-    except Exception as e:
-        debug_info["fk_error"] = str(e)
-
-    return tables, debug_info
-
-def create_graph(tables, theme, showColumns, showTypes, useUpperCase):
-    s = ('digraph {\n'
-        + '  graph [ rankdir="LR" bgcolor="#ffffff" ]\n'
-        + f'  node [ style="filled" shape="{theme.shape}" gradientangle="180" ]\n'
-        + '  edge [ arrowhead="none" arrowtail="none" dir="both" ]\n\n')
-
-    for name in tables:
-        s += tables[name].getDotShape(theme, showColumns, showTypes, useUpperCase)
-    s += "\n"
-    for name in tables:
-        s += tables[name].getDotLinks(theme)
-    s += "}\n"
-    return s
-
-def create_script(tables, database, schema, useUpperCase):
-    db = Table.getClassName(database, useUpperCase)
-    sch = f'{db}.{Table.getClassName(schema, useUpperCase)}'
-    if useUpperCase:
-        s = f"USE DATABASE {db};\nCREATE OR REPLACE SCHEMA {sch};\n\n"
-    else:
-        s = f"use database {db};\ncreate or replace schema {sch};\n\n"
-
-    for name in tables:
-        table = tables[name]
-        if useUpperCase:
-            s += f"CREATE OR REPLACE TABLE {table.getName(useUpperCase)} (\n"
-        else:
-            s += f"create or replace table {table.getName(useUpperCase)} (\n"
-        
-        first = True
-        for column in table.columns:
-            if first:
-                first = False
-            else:
-                s += ",\n"
-            nullable = "" if column.nullable else " NOT NULL" if useUpperCase else " not null"
-            datatype = column.datatype.upper() if useUpperCase else column.datatype
-            s += f"  {column.getName(useUpperCase)} {datatype}{nullable}"
-        
-        if table.pks:
-            pks = [col.getName(useUpperCase) for col in table.pks]
-            pklist = ", ".join(pks)
-            if useUpperCase:
-                s += f",\n  PRIMARY KEY ({pklist})"
-            else:
-                s += f",\n  primary key ({pklist})"
-        
-        s += "\n);\n\n"
-
-    for name in tables:
-        table = tables[name]
-        for constraint in table.fks:
-            fks = table.fks[constraint]
-            pktable = fks[0].fkof.table
-            fklist = ", ".join([col.getName(useUpperCase) for col in fks])
-            pklist = ", ".join([col.fkof.getName(useUpperCase) for col in fks])
-            if useUpperCase:
-                s += f"ALTER TABLE {table.getName(useUpperCase)}\n"
-                s += f"  ADD CONSTRAINT {Table.getClassName(constraint, useUpperCase)}\n"
-                s += f"  FOREIGN KEY ({fklist})\n"
-                s += f"  REFERENCES {pktable.getName(useUpperCase)} ({pklist});\n\n"
-            else:
-                s += f"alter table {table.getName(useUpperCase)}\n"
-                s += f"  add constraint {Table.getClassName(constraint, useUpperCase)}\n"
-                s += f"  foreign key ({fklist})\n"
-                s += f"  references {pktable.getName(useUpperCase)} ({pklist});\n\n"
-    return s
+    # Read once per session and schema (and again after Refresh cache), so
+    # display-only reruns go straight to the cached snapshot
+    if "fingerprints" not in st.session_state:
+        st.session_state["fingerprints"] = {}
+    fingerprints = st.session_state["fingerprints"]
+    if (database, schema) not in fingerprints:
+        fingerprints[(database, schema)] = get_schema_fingerprint(database, schema)
+    fingerprint = fingerprints[(database, schema)]
+    if schema is None:
+        return build_database_tables(get_database_snapshot(database, fingerprint))
+    return build_tables(get_metadata_snapshot(database, schema, fingerprint))
 
 def get_themes():
     return {
@@ -366,7 +169,11 @@ with st.sidebar:
     
     schemas = get_schemas(database) if database else []
     default_idx = schemas.index("PUBLIC") if "PUBLIC" in schemas else (0 if schemas else None)
-    schema = st.selectbox('Schema', schemas, index=default_idx, key="schema_select")
+    allSchemas = st.toggle('All schemas', value=False, key="all_schemas",
+        help="Draw every schema of the database, including cross-schema relationships")
+    schema = st.selectbox('Schema', schemas, index=default_idx, key="schema_select", disabled=allSchemas)
+    if allSchemas:
+        schema = None
     
     st.write("")
     
@@ -380,27 +187,30 @@ with st.sidebar:
     
     if st.button(":material/refresh: Refresh cache", use_container_width=True):
         st.cache_data.clear()
+        if "fingerprints" in st.session_state:
+            del st.session_state["fingerprints"]
         st.rerun()
 
 st.title("ERD Viewer")
 
-if not database or not schema:
+if not database or not (schema or allSchemas):
     with st.container(border=True):
         st.markdown(":material/info: Select a database and schema from the sidebar to view the ERD.")
 else:
     col1, col2 = st.columns([3, 1])
     with col1:
-        st.caption(f":material/database: {database} :material/chevron_right: {schema}")
+        st.caption(f":material/database: {database} :material/chevron_right: {schema or 'All schemas'}")
     
     with st.spinner('Reading metadata...'):
         tables, debug_info = import_metadata(database, schema)
 
     if len(tables) == 0:
         with st.container(border=True):
-            st.markdown(f":material/warning: No tables found in **{database}.{schema}**")
+            st.markdown(f":material/warning: No tables found in **{database}.{schema or '*'}**")
     else:
         with col2:
-            st.caption(f"{len(tables)} objects")
+            scope = f" in {debug_info['schemas']} schemas" if "schemas" in debug_info else ""
+            st.caption(f"{len(tables)} objects{scope} · metadata read in {debug_info['metadata_ms']} ms at {debug_info['fetched_at']}")
         
         with st.spinner('Generating diagram and script...'):
             graph = create_graph(tables, themes[theme], showColumns, showTypes, useUpperCase)
@@ -411,10 +221,14 @@ else:
         with tabERD:
             st.graphviz_chart(graph)
         
+        fileName = f"{database}_{schema}" if schema else database
+
         with tabDOT:
+            st.download_button(":material/download: Download DOT", graph, file_name=f"{fileName}.dot", mime="text/vnd.graphviz")
             st.code(graph, language="dot", line_numbers=True)
         
         with tabScript:
+            st.download_button(":material/download: Download script", script, file_name=f"{fileName}.sql", mime="application/sql")
             st.code(script, language="sql", line_numbers=True)
         
         with tabStats:
@@ -10,15 +10,14 @@ Usage:
     python test_keypair_auth.py
 """
 
-import jwt
-import time
-import hashlib
-import base64
-import requests
+import os
+import sys
 import json
-from datetime import datetime, timedelta
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.backends import default_backend
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "a2a"))
+from snowflake_client import TokenProvider, account_url, mcp_server_url  # noqa: E402
+from snowflake_client.mcp import McpClient  # noqa: E402
+from snowflake_client.session import create_session  # noqa: E402
 
 # ============================================================================
 # Configuration
@@ -26,128 +25,42 @@ from cryptography.hazmat.backends import default_backend
 SNOWFLAKE_ACCOUNT = "SFSEEUROPE-PJOSE_AWS3"
 SNOWFLAKE_ACCOUNT_LOCATOR = "RA19199"
 SNOWFLAKE_USER = "SERVICENOW_SVC_USER"
-PRIVATE_KEY_PATH = "keys/servicenow_rsa_key.p8"
+PRIVATE_KEY_PATH = os.getenv("PRIVATE_KEY_PATH", "keys/servicenow_rsa_key.p8")
 
 # MCP Endpoint
-MCP_ENDPOINT = f"https://ra19199.eu-west-3.aws.snowflakecomputing.com/api/v2/databases/TELCO_AI_DB/schemas/NETWORK_ASSURANCE/mcp-servers/TELCO_ASSURANCE_MCP"
-
-
-def load_private_key(key_path):
-    """Load private key from file."""
-    with open(key_path, "rb") as key_file:
-        private_key = serialization.load_pem_private_key(
-            key_file.read(),
-            password=None,
-            backend=default_backend()
-        )
-    return private_key
-
-
-def get_public_key_fingerprint(private_key):
-    """Calculate SHA256 fingerprint of the public key."""
-    public_key = private_key.public_key()
-    public_key_bytes = public_key.public_bytes(
-        encoding=serialization.Encoding.DER,
-        format=serialization.PublicFormat.SubjectPublicKeyInfo
-    )
-    sha256_hash = hashlib.sha256(public_key_bytes).digest()
-    fingerprint = base64.b64encode(sha256_hash).decode('utf-8')
-    return f"SHA256:{fingerprint}"
-
-
-def generate_jwt_token(account, user, private_key, lifetime_minutes=60):
-    """Generate JWT token for Snowflake authentication."""
-    
-    # Get the public key fingerprint
-    fingerprint = get_public_key_fingerprint(private_key)
-    
-    # Qualified username
-    qualified_username = f"{account.upper()}.{user.upper()}"
-    
-    # Current time
-    now = datetime.utcnow()
-    
-    # JWT payload
-    payload = {
-        "iss": f"{qualified_username}.{fingerprint}",
-        "sub": qualified_username,
-        "iat": now,
-        "exp": now + timedelta(minutes=lifetime_minutes)
-    }
-    
-    # Sign the token
-    token = jwt.encode(
-        payload,
-        private_key,
-        algorithm="RS256"
-    )
-    
-    return token
+MCP_ENDPOINT = mcp_server_url(account_url("ra19199.eu-west-3.aws"), "TELCO_AI_DB", "NETWORK_ASSURANCE", "TELCO_ASSURANCE_MCP")
 
 
-def test_mcp_tools_list(token):
-    """Test MCP tools/list endpoint."""
-    print("\n[TEST] MCP tools/list")
-    print("-" * 50)
-    
-    response = requests.post(
-        MCP_ENDPOINT,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {token}",
-            "X-Snowflake-Authorization-Token-Type": "KEYPAIR_JWT"
-        },
-        json={
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tools/list",
-            "params": {}
-        }
-    )
-    
+def print_response(response):
+    """Print an MCP response; True on HTTP 200."""
     print(f"Status: {response.status_code}")
     try:
-        result = response.json()
-        print(json.dumps(result, indent=2))
+        print(json.dumps(response.json(), indent=2))
         return response.status_code == 200
-    except:
+    except ValueError:
         print(response.text[:500])
         return False
 
 
-def test_mcp_sql_query(token, query, query_name="SQL Query"):
+def test_mcp_tools_list(mcp):
+    """Test MCP tools/list endpoint."""
+    print("\n[TEST] MCP tools/list")
+    print("-" * 50)
+    
+    return print_response(mcp.post(mcp.request_body("tools/list")))
+
+
+def test_mcp_sql_query(mcp, query, query_name="SQL Query"):
     """Test MCP SQL execution."""
     print(f"\n[TEST] {query_name}")
     print("-" * 50)
     
-    response = requests.post(
-        MCP_ENDPOINT,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {token}",
-            "X-Snowflake-Authorization-Token-Type": "KEYPAIR_JWT"
-        },
-        json={
-            "jsonrpc": "2.0",
-            "id": 2,
-            "method": "tools/call",
-            "params": {
-                "name": "sql_exec_tool",
-                "arguments": {
-                    "sql": query
-                }
-            }
+    return print_response(mcp.post(mcp.request_body("tools/call", {
+        "name": "sql_exec_tool",
+        "arguments": {
+            "sql": query
         }
-    )
-    
-    print(f"Status: {response.status_code}")
-    try:
-        result = response.json()
-        print(json.dumps(result, indent=2))
-        return response.status_code == 200
-    except:
-        print(response.text[:500])
-        return False
+    })))
 
 
 def main():
@@ -157,8 +70,10 @@ def main():
     
     # Step 1: Load private key
     print("\n[STEP 1] Loading private key...")
+    tokens = TokenProvider(SNOWFLAKE_ACCOUNT, SNOWFLAKE_USER, PRIVATE_KEY_PATH)
     try:
-        private_key = load_private_key(PRIVATE_KEY_PATH)
+        # Loads and fingerprints the key once; tokens are signed from it
+        fingerprint = tokens.fingerprint
         print("SUCCESS: Private key loaded")
     except Exception as e:
         print(f"ERROR: Failed to load private key - {e}")
@@ -166,24 +81,24 @@ def main():
     
     # Step 2: Calculate fingerprint
     print("\n[STEP 2] Calculating public key fingerprint...")
-    fingerprint = get_public_key_fingerprint(private_key)
     print(f"Fingerprint: {fingerprint}")
     
     # Step 3: Generate JWT token
     print("\n[STEP 3] Generating JWT token...")
     try:
-        token = generate_jwt_token(SNOWFLAKE_ACCOUNT, SNOWFLAKE_USER, private_key)
+        token = tokens.get_token()
         print(f"SUCCESS: JWT token generated ({len(token)} chars)")
         print(f"Token preview: {token[:50]}...")
     except Exception as e:
         print(f"ERROR: Failed to generate token - {e}")
         return
     
-    # Step 4: Test MCP endpoints
+    # Step 4: Test MCP endpoints (one pooled session, the cached token)
     print("\n[STEP 4] Testing MCP endpoints...")
+    mcp = McpClient(create_session(tokens), MCP_ENDPOINT)
     
     # Test tools/list
-    test_mcp_tools_list(token)
+    test_mcp_tools_list(mcp)
     
     # Test SQL queries
     queries = [
@@ -193,7 +108,7 @@ def main():
     ]
     
     for name, query in queries:
-        test_mcp_sql_query(token, query, name)
+        test_mcp_sql_query(mcp, query, name)
     
     print("\n" + "=" * 60)
     print("Test Complete")
@@ -6,88 +6,67 @@ Comprehensive test suite for Snowflake MCP Server connectivity and queries.
 Requirements:
     pip install PyJWT cryptography requests
 
+Tests run concurrently on a worker pool that shares one pooled, retrying
+HTTP session and one cached JWT (both from a2a/snowflake_client). The report keeps the definition order and
+records the wall time next to the sum of per-test latencies.
+
 Usage:
-    python test/test_mcp_battery.py
+    python test/test_mcp_battery.py [--workers N] [--timeout SECONDS]
+    python test/test_mcp_battery.py --workers 1    # sequential, as before
+
+Benchmark mode runs every SQL query several times, cold (result cache
+bypassed) and warm, and checks the timings against a saved baseline:
+    python test/test_mcp_battery.py --benchmark --runs 10 --save-baseline test/mcp_baseline.json
+    python test/test_mcp_battery.py --benchmark --runs 10 --baseline test/mcp_baseline.json --threshold 20
+
+Offline, against the local stand-in (a2a/cortex_stub.py):
+    SNOWFLAKE_API_BASE_URL=http://localhost:9000 PRIVATE_KEY_PATH=any_key.p8 python test/test_mcp_battery.py
 """
 
-import jwt
+import os
+import sys
 import time
-import hashlib
-import base64
-import requests
+import argparse
+import statistics
 import json
-from datetime import datetime, timedelta
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.backends import default_backend
+import math
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from requests.exceptions import Timeout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "a2a"))
+from snowflake_client import TokenProvider, account_url, mcp_server_url  # noqa: E402
+from snowflake_client.mcp import McpClient  # noqa: E402
+from snowflake_client.session import create_session  # noqa: E402
 
 # Configuration
 SNOWFLAKE_ACCOUNT = "SFSEEUROPE-PJOSE_AWS3"
 SNOWFLAKE_USER = "SERVICENOW_SVC_USER"
-PRIVATE_KEY_PATH = "keys/servicenow_rsa_key.p8"
-MCP_ENDPOINT = "https://ra19199.eu-west-3.aws.snowflakecomputing.com/api/v2/databases/TELCO_AI_DB/schemas/NETWORK_ASSURANCE/mcp-servers/TELCO_ASSURANCE_MCP"
+PRIVATE_KEY_PATH = os.getenv("PRIVATE_KEY_PATH", "keys/servicenow_rsa_key.p8")
+BASE_URL = account_url("ra19199.eu-west-3.aws")
+MCP_ENDPOINT = mcp_server_url(BASE_URL, "TELCO_AI_DB", "NETWORK_ASSURANCE", "TELCO_ASSURANCE_MCP")
+WORKERS = int(os.getenv("MCP_TEST_WORKERS", "8"))
+TIMEOUT = float(os.getenv("MCP_TEST_TIMEOUT", "60"))
+RETRIES = int(os.getenv("MCP_TEST_RETRIES", "3"))
 
-# Test Results
+
+# Test Results (in definition order once the battery has run)
 results = []
 request_responses = []
+run_stats = {}
 
 
-def load_private_key(key_path):
-    with open(key_path, "rb") as key_file:
-        return serialization.load_pem_private_key(
-            key_file.read(), password=None, backend=default_backend()
-        )
-
-
-def get_public_key_fingerprint(private_key):
-    public_key = private_key.public_key()
-    public_key_bytes = public_key.public_bytes(
-        encoding=serialization.Encoding.DER,
-        format=serialization.PublicFormat.SubjectPublicKeyInfo
-    )
-    sha256_hash = hashlib.sha256(public_key_bytes).digest()
-    fingerprint = base64.b64encode(sha256_hash).decode('utf-8')
-    return f"SHA256:{fingerprint}"
-
-
-def generate_jwt_token(account, user, private_key):
-    fingerprint = get_public_key_fingerprint(private_key)
-    qualified_username = f"{account.upper()}.{user.upper()}"
-    now = datetime.utcnow()
-    
-    payload = {
-        "iss": f"{qualified_username}.{fingerprint}",
-        "sub": qualified_username,
-        "iat": now,
-        "exp": now + timedelta(minutes=60)
-    }
-    
-    return jwt.encode(payload, private_key, algorithm="RS256")
-
-
-def run_test(token, test_name, category, method, params):
-    """Run a single test and record results."""
+def run_test(mcp, test_id, test_name, category, method, params, timeout=TIMEOUT):
+    """Run a single test; returns its (result, request/response) records."""
     start_time = time.time()
     
-    request_body = {
-        "jsonrpc": "2.0",
-        "id": len(results) + 1,
-        "method": method,
-        "params": params
-    }
+    request_body = mcp.request_body(method, params, test_id)
     
     response_body = None
     
     try:
-        response = requests.post(
-            MCP_ENDPOINT,
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {token}",
-                "X-Snowflake-Authorization-Token-Type": "KEYPAIR_JWT"
-            },
-            json=request_body,
-            timeout=60
-        )
+        response = mcp.post(request_body, timeout=timeout)
         
         elapsed = round((time.time() - start_time) * 1000)
         status = response.status_code
@@ -107,11 +86,11 @@ def run_test(token, test_name, category, method, params):
             details = response.text[:200]
             response_body = {"raw": response.text[:500]}
             
-    except requests.exceptions.Timeout:
-        elapsed = 60000
+    except Timeout:
+        elapsed = round(timeout * 1000)
         status = 0
         result = "TIMEOUT"
-        details = "Request timed out after 60s"
+        details = f"Request timed out after {timeout:g}s"
         response_body = {"error": "Timeout"}
     except Exception as e:
         elapsed = round((time.time() - start_time) * 1000)
@@ -120,30 +99,203 @@ def run_test(token, test_name, category, method, params):
         details = str(e)[:200]
         response_body = {"error": str(e)}
     
-    results.append({
+    record = {
         "test_name": test_name,
         "category": category,
         "status": status,
         "result": result,
         "time_ms": elapsed,
         "details": details
-    })
+    }
     
-    # Store request/response
-    request_responses.append({
+    # Request/response for the detailed log
+    exchange = {
         "test_name": test_name,
         "category": category,
         "request": request_body,
         "response": response_body,
         "status_code": status,
         "time_ms": elapsed
-    })
+    }
     
-    # Print progress
-    icon = "✅" if result == "PASS" else "❌" if result == "FAIL" else "⏱️"
-    print(f"  {icon} {test_name} ({elapsed}ms)")
+    return record, exchange
+
+
+def open_client(tokens, workers, timeout, retries):
+    """One pooled, retrying session sized for `workers`, wrapped in an McpClient."""
+    session = create_session(tokens, pool_size=workers, retries=retries, timeout=timeout)
+    return McpClient(session, MCP_ENDPOINT)
+
+
+def run_battery(tests, workers=WORKERS, timeout=TIMEOUT, tokens=None, retries=RETRIES):
+    """
+    Run all tests on a worker pool and fill `results` in definition order.
+
+    Args:
+        tests: (test_name, category, method, params) tuples
+        workers: Tests in flight at once (1 runs them sequentially)
+        timeout: Per-request timeout in seconds
+        tokens: TokenProvider shared by the workers
+        retries: Retries on 429/503 responses and connect errors
+
+    Returns:
+        Wall time in seconds
+    """
+    records = [None] * len(tests)
+    exchanges = [None] * len(tests)
+    start_time = time.time()
     
-    return result == "PASS"
+    mcp = open_client(tokens, workers, timeout, retries)
+    with mcp.session, ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(run_test, mcp, i + 1, name, category, method, params, timeout): i
+            for i, (name, category, method, params) in enumerate(tests)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            records[i], exchanges[i] = future.result()
+            record = records[i]
+            # Print progress as tests finish
+            icon = "✅" if record["result"] == "PASS" else "❌" if record["result"] == "FAIL" else "⏱️"
+            print(f"  {icon} [{record['category']}] {record['test_name']} ({record['time_ms']}ms)")
+    
+    wall = time.time() - start_time
+    results[:] = records
+    request_responses[:] = exchanges
+    return wall
+
+
+def timing_stats(times_ms):
+    """mean/median/p95/stddev/min/max of a list of millisecond timings."""
+    if not times_ms:
+        return {"samples": 0}
+    ordered = sorted(times_ms)
+    return {
+        "samples": len(ordered),
+        "mean": round(statistics.mean(ordered), 1),
+        "median": round(statistics.median(ordered), 1),
+        "p95": ordered[max(0, math.ceil(len(ordered) * 0.95) - 1)],
+        "stddev": round(statistics.stdev(ordered), 1) if len(ordered) > 1 else 0.0,
+        "min": ordered[0],
+        "max": ordered[-1],
+    }
+
+
+def benchmark_query(mcp, test_id, name, category, params, runs, warmup, timeout):
+    """
+    Time one SQL query cold and warm.
+
+    Warm-up runs (cache allowed) are discarded. Then `runs` cold runs and
+    `runs` warm runs are timed. sql_exec_tool takes a single statement, so
+    each cold run gets a unique leading comment instead of a session
+    parameter: the result cache only reuses identical query text.
+
+    Returns:
+        {"category", "cold": timing_stats, "warm": timing_stats, "failures"}
+    """
+    sql = params["arguments"]["sql"]
+    failures = 0
+    timings = {"cold": [], "warm": []}
+    
+    for _ in range(warmup):
+        run_test(mcp, test_id, name, category, "tools/call", params, timeout)
+    for mode in ("cold", "warm"):
+        for _ in range(runs):
+            mode_params = params
+            if mode == "cold":
+                mode_params = {**params, "arguments": {"sql": f"/* cold run {uuid.uuid4().hex} */\n{sql}"}}
+            record, _ = run_test(mcp, test_id, name, category, "tools/call", mode_params, timeout)
+            if record["result"] == "PASS":
+                timings[mode].append(record["time_ms"])
+            else:
+                failures += 1
+    
+    return {
+        "category": category,
+        "cold": timing_stats(timings["cold"]),
+        "warm": timing_stats(timings["warm"]),
+        "failures": failures
+    }
+
+
+def run_benchmark(tests, runs, warmup, workers=1, timeout=TIMEOUT, tokens=None):
+    """
+    Benchmark every sql_exec_tool test; runs of one query never overlap.
+
+    Args:
+        tests: (test_name, category, method, params) tuples; others are skipped
+        runs: Timed runs per query and mode
+        warmup: Untimed runs per query before timing
+        workers: Queries benchmarked at once (1 gives the steadiest numbers)
+        timeout: Per-request timeout in seconds
+        tokens: TokenProvider shared by the workers
+
+    Returns:
+        The benchmark document (saved as a baseline with --save-baseline)
+    """
+    queries = [(i + 1, name, category, params) for i, (name, category, method, params) in enumerate(tests)
+               if method == "tools/call" and params.get("name") == "sql_exec_tool"]
+    timings = {}
+    
+    # No retries: a retried run would be timed as one slow run
+    mcp = open_client(tokens, workers, timeout, retries=0)
+    with mcp.session, ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(benchmark_query, mcp, test_id, name, category, params,
+                        runs, warmup, timeout): name
+            for test_id, name, category, params in queries
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            timings[name] = future.result()
+            t = timings[name]
+            icon = "✅" if not t["failures"] else "❌"
+            print(f"  {icon} {name}: cold median {t['cold'].get('median', '-')}ms, "
+                  f"warm median {t['warm'].get('median', '-')}ms")
+    
+    return {
+        "generated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "endpoint": MCP_ENDPOINT,
+        "runs": runs,
+        "warmup": warmup,
+        "workers": workers,
+        # Definition order, like the battery report
+        "queries": {name: timings[name] for _, name, _, _ in queries}
+    }
+
+
+def compare_to_baseline(benchmark, baseline, threshold_pct, min_delta_ms):
+    """
+    Print median changes per query and mode against a baseline.
+
+    A query regresses when its median is more than `threshold_pct` percent
+    and at least `min_delta_ms` slower than the baseline median.
+
+    Returns:
+        Names of regressed or failing queries ("name (mode)")
+    """
+    regressions = []
+    print(f"\n{'Query':<26} {'Mode':<5} {'Baseline':>9} {'Now':>9} {'Change':>8}")
+    print("-" * 60)
+    for name, current in benchmark["queries"].items():
+        if current["failures"]:
+            regressions.append(f"{name} (failures)")
+        previous = baseline.get("queries", {}).get(name)
+        if previous is None:
+            print(f"{name[:26]:<26} {'-':<5} {'new query':>9}")
+            continue
+        for mode in ("cold", "warm"):
+            old = previous[mode].get("median")
+            new = current[mode].get("median")
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else 0.0
+            regressed = change > threshold_pct and new - old >= min_delta_ms
+            if regressed:
+                regressions.append(f"{name} ({mode})")
+            icon = "❌" if regressed else "  "
+            print(f"{name[:26]:<26} {mode:<5} {old:>7}ms {new:>7}ms {change:>+7.1f}% {icon}")
+    return regressions
 
 
 def extract_result_summary(body):
@@ -168,6 +320,8 @@ def generate_report(start_time, end_time):
     passed = sum(1 for r in results if r["result"] == "PASS")
     failed = sum(1 for r in results if r["result"] == "FAIL")
     errors = sum(1 for r in results if r["result"] in ("ERROR", "TIMEOUT"))
+    wall_ms = round((end_time - start_time) * 1000)
+    latency_sum = sum(r["time_ms"] for r in results)
     
     report = f"""# MCP Server Test Report
 
@@ -186,6 +340,10 @@ def generate_report(start_time, end_time):
 | Failed | {failed} |
 | Errors/Timeouts | {errors} |
 | Success Rate | {round(passed/total*100, 1)}% |
+| Workers | {run_stats.get("workers", 1)} |
+| Wall Time (ms) | {wall_ms} |
+| Sum of Test Latencies (ms) | {latency_sum} |
+| Speedup | {round(latency_sum / wall_ms, 2) if wall_ms else 0}x |
 
 ---
 
@@ -275,6 +433,30 @@ def generate_report(start_time, end_time):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="MCP Server Battery Test Suite")
+    parser.add_argument("--workers", type=int,
+                        help=f"Tests run concurrently (default: {WORKERS}, env MCP_TEST_WORKERS; "
+                             "1 in benchmark mode)")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT,
+                        help=f"Per-request timeout in seconds (default: {TIMEOUT:g}, env MCP_TEST_TIMEOUT)")
+    parser.add_argument("--retries", type=int, default=RETRIES,
+                        help=f"Retries on 429/503 responses and connect errors (default: {RETRIES}, "
+                             "env MCP_TEST_RETRIES; benchmark mode never retries)")
+    bench = parser.add_argument_group("benchmark mode")
+    bench.add_argument("--benchmark", action="store_true",
+                       help="Time each SQL query cold and warm instead of running the battery once")
+    bench.add_argument("--runs", type=int, default=5, help="Timed runs per query and mode (default: 5)")
+    bench.add_argument("--warmup", type=int, default=1, help="Untimed runs per query first (default: 1)")
+    bench.add_argument("--save-baseline", metavar="PATH", help="Write the benchmark as a JSON baseline")
+    bench.add_argument("--baseline", metavar="PATH", help="Compare with a JSON baseline; exit 1 on regressions")
+    bench.add_argument("--threshold", type=float, default=20.0,
+                       help="Median slowdown in percent that counts as a regression (default: 20)")
+    bench.add_argument("--min-delta-ms", type=float, default=20.0,
+                       help="Ignore slowdowns smaller than this many ms (default: 20)")
+    args = parser.parse_args()
+    if args.workers is None:
+        args.workers = 1 if args.benchmark else WORKERS
+    
     print("=" * 60)
     print("MCP Server Battery Test Suite")
     print("=" * 60)
@@ -282,29 +464,23 @@ def main():
     # Load key and generate token
     print("\n[SETUP] Loading credentials...")
     try:
-        private_key = load_private_key(PRIVATE_KEY_PATH)
-        token = generate_jwt_token(SNOWFLAKE_ACCOUNT, SNOWFLAKE_USER, private_key)
+        tokens = TokenProvider(SNOWFLAKE_ACCOUNT, SNOWFLAKE_USER, PRIVATE_KEY_PATH)
+        tokens.get_token()
         print("  ✅ JWT token generated")
     except Exception as e:
         print(f"  ❌ Failed: {e}")
         return
     
-    start_time = time.time()
+    tests = []
     
     # =========================================================================
     # TEST CATEGORY 1: Connectivity
     # =========================================================================
-    print("\n[CATEGORY] Connectivity Tests")
-    print("-" * 40)
-    
-    run_test(token, "tools/list", "Connectivity", "tools/list", {})
+    tests.append(("tools/list", "Connectivity", "tools/list", {}))
     
     # =========================================================================
     # TEST CATEGORY 2: Table Queries
     # =========================================================================
-    print("\n[CATEGORY] Table Query Tests")
-    print("-" * 40)
-    
     table_tests = [
         ("ALARMS - Count", "SELECT COUNT(*) as cnt FROM TELCO_AI_DB.NETWORK_ASSURANCE.ALARMS"),
         ("NETWORK_KPI - Count", "SELECT COUNT(*) as cnt FROM TELCO_AI_DB.NETWORK_ASSURANCE.NETWORK_KPI"),
@@ -316,17 +492,14 @@ def main():
     ]
     
     for name, sql in table_tests:
-        run_test(token, name, "Table Queries", "tools/call", {
+        tests.append((name, "Table Queries", "tools/call", {
             "name": "sql_exec_tool",
             "arguments": {"sql": sql}
-        })
+        }))
     
     # =========================================================================
     # TEST CATEGORY 3: Aggregation Queries
     # =========================================================================
-    print("\n[CATEGORY] Aggregation Query Tests")
-    print("-" * 40)
-    
     agg_tests = [
         ("Alarms by Severity", "SELECT severity, COUNT(*) as cnt FROM TELCO_AI_DB.NETWORK_ASSURANCE.ALARMS GROUP BY severity"),
         ("Alarms by Region", "SELECT region, COUNT(*) as cnt FROM TELCO_AI_DB.NETWORK_ASSURANCE.ALARMS GROUP BY region"),
@@ -336,17 +509,14 @@ def main():
     ]
     
     for name, sql in agg_tests:
-        run_test(token, name, "Aggregations", "tools/call", {
+        tests.append((name, "Aggregations", "tools/call", {
             "name": "sql_exec_tool",
             "arguments": {"sql": sql}
-        })
+        }))
     
     # =========================================================================
     # TEST CATEGORY 4: Filter Queries
     # =========================================================================
-    print("\n[CATEGORY] Filter Query Tests")
-    print("-" * 40)
-    
     filter_tests = [
         ("Major Alarms", "SELECT cell_id, description FROM TELCO_AI_DB.NETWORK_ASSURANCE.ALARMS WHERE severity='MAJOR' LIMIT 5"),
         ("High Anomaly Scores", "SELECT element_id, kpi_name, score FROM TELCO_AI_DB.NETWORK_ASSURANCE.ANOMALY_SCORES WHERE score > 0.8 LIMIT 5"),
@@ -355,17 +525,14 @@ def main():
     ]
     
     for name, sql in filter_tests:
-        run_test(token, name, "Filters", "tools/call", {
+        tests.append((name, "Filters", "tools/call", {
             "name": "sql_exec_tool",
             "arguments": {"sql": sql}
-        })
+        }))
     
     # =========================================================================
     # TEST CATEGORY 5: Join Queries
     # =========================================================================
-    print("\n[CATEGORY] Join Query Tests")
-    print("-" * 40)
-    
     join_tests = [
         ("Alarms + Topology", """
             SELECT a.severity, t.element_type, COUNT(*) as cnt 
@@ -382,17 +549,14 @@ def main():
     ]
     
     for name, sql in join_tests:
-        run_test(token, name, "Joins", "tools/call", {
+        tests.append((name, "Joins", "tools/call", {
             "name": "sql_exec_tool",
             "arguments": {"sql": sql}
-        })
+        }))
     
     # =========================================================================
     # TEST CATEGORY 6: View Queries
     # =========================================================================
-    print("\n[CATEGORY] View Query Tests")
-    print("-" * 40)
-    
     view_tests = [
         ("RADIO_KPI_V", "SELECT * FROM TELCO_AI_DB.NETWORK_ASSURANCE.RADIO_KPI_V LIMIT 5"),
         ("CORE_KPI_V", "SELECT * FROM TELCO_AI_DB.NETWORK_ASSURANCE.CORE_KPI_V LIMIT 5"),
@@ -401,29 +565,38 @@ def main():
     ]
     
     for name, sql in view_tests:
-        run_test(token, name, "Views", "tools/call", {
+        tests.append((name, "Views", "tools/call", {
             "name": "sql_exec_tool",
             "arguments": {"sql": sql}
-        })
+        }))
     
     # =========================================================================
     # TEST CATEGORY 7: Edge Cases
     # =========================================================================
-    print("\n[CATEGORY] Edge Case Tests")
-    print("-" * 40)
-    
     edge_tests = [
         ("Empty Result", "SELECT * FROM TELCO_AI_DB.NETWORK_ASSURANCE.ALARMS WHERE severity='NONEXISTENT'"),
         ("Large Result (Limited)", "SELECT * FROM TELCO_AI_DB.NETWORK_ASSURANCE.NETWORK_KPI LIMIT 100"),
     ]
     
     for name, sql in edge_tests:
-        run_test(token, name, "Edge Cases", "tools/call", {
+        tests.append((name, "Edge Cases", "tools/call", {
             "name": "sql_exec_tool",
             "arguments": {"sql": sql}
-        })
+        }))
+    
+    if args.benchmark:
+        sys.exit(benchmark_main(tests, args, tokens))
     
+    # =========================================================================
+    # Run all categories on the worker pool
+    # =========================================================================
+    print(f"\n[RUN] {len(tests)} tests on {args.workers} worker(s)")
+    print("-" * 40)
+    
+    start_time = time.time()
+    run_battery(tests, args.workers, args.timeout, tokens, args.retries)
     end_time = time.time()
+    run_stats["workers"] = args.workers
     
     # Generate report
     print("\n" + "=" * 60)
@@ -441,7 +614,39 @@ def main():
     # Summary
     total = len(results)
     passed = sum(1 for r in results if r["result"] == "PASS")
+    wall_ms = round((end_time - start_time) * 1000)
+    latency_sum = sum(r["time_ms"] for r in results)
     print(f"\n📊 Summary: {passed}/{total} tests passed ({round(passed/total*100, 1)}%)")
+    print(f"⏱️  Wall time: {wall_ms}ms, sum of test latencies: {latency_sum}ms "
+          f"({round(latency_sum / wall_ms, 2) if wall_ms else 0}x)")
+
+
+def benchmark_main(tests, args, tokens):
+    """Run benchmark mode; returns the process exit code."""
+    print(f"\n[BENCHMARK] {args.warmup} warm-up + {args.runs} cold + {args.runs} warm runs per query, "
+          f"{args.workers} worker(s)")
+    print("-" * 40)
+    
+    benchmark = run_benchmark(tests, args.runs, args.warmup, args.workers, args.timeout, tokens)
+    
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(benchmark, f, indent=2)
+        print(f"\n✅ Baseline saved to: {args.save_baseline}")
+    
+    failing = [name for name, t in benchmark["queries"].items() if t["failures"]]
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(benchmark, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) past {args.threshold:g}%: {', '.join(regressions)}")
+            return 1
+        print(f"\n✅ No query regressed past {args.threshold:g}% of its baseline median")
+    elif failing:
+        print(f"\n❌ Queries with failed runs: {', '.join(failing)}")
+        return 1
+    return 0
 
 
 if __name__ == "__main__":
@@ -5,15 +5,15 @@ Generates JWT token and runs test queries against both endpoints.
 """
 
 import json
-import time
-import requests
-from datetime import datetime, timedelta
+import os
+import sys
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.backends import default_backend
-import jwt
-import hashlib
-import base64
-import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "a2a"))
+from snowflake_client import TokenProvider, account_url, agent_run_url, mcp_server_url  # noqa: E402
+from snowflake_client.mcp import McpClient  # noqa: E402
+from snowflake_client.session import create_session  # noqa: E402
 
 # =============================================================================
 # CONFIGURATION
@@ -25,58 +25,30 @@ SCHEMA = "NETWORK_ASSURANCE"
 
 # Service account for testing (update these)
 USER = "A2A_SVC_USER"  # or "SERVICENOW_SVC_USER" for MCP
-PRIVATE_KEY_PATH = os.path.expanduser("~/.ssh/snowflake_a2a_key.pem")
-
-# Endpoints
-BASE_URL = f"https://{ACCOUNT_LOCATOR.lower()}.{REGION}.snowflakecomputing.com"
-MCP_ENDPOINT = f"{BASE_URL}/api/v2/databases/{DATABASE}/schemas/{SCHEMA}/mcp-servers/TELCO_ASSURANCE_MCP"
-AGENT_ENDPOINT = f"{BASE_URL}/api/v2/databases/{DATABASE}/schemas/{SCHEMA}/agents/TELCO_ASSURANCE_AGENT:run"
-
-
-def load_private_key(key_path: str):
-    """Load RSA private key from file."""
-    with open(key_path, "rb") as key_file:
-        private_key = serialization.load_pem_private_key(
-            key_file.read(),
-            password=None,
-            backend=default_backend()
-        )
-    return private_key
-
+PRIVATE_KEY_PATH = os.path.expanduser(os.getenv("PRIVATE_KEY_PATH", "~/.ssh/snowflake_a2a_key.pem"))
 
-def get_public_key_fingerprint(private_key) -> str:
-    """Generate SHA256 fingerprint of the public key."""
-    public_key = private_key.public_key()
-    public_key_bytes = public_key.public_bytes(
-        encoding=serialization.Encoding.DER,
-        format=serialization.PublicFormat.SubjectPublicKeyInfo
-    )
-    sha256_hash = hashlib.sha256(public_key_bytes).digest()
-    fingerprint = base64.b64encode(sha256_hash).decode("utf-8")
-    return f"SHA256:{fingerprint}"
+# Endpoints (SNOWFLAKE_API_BASE_URL targets a local stand-in, e.g. a2a/cortex_stub.py)
+BASE_URL = account_url(f"{ACCOUNT_LOCATOR}.{REGION}")
+MCP_ENDPOINT = mcp_server_url(BASE_URL, DATABASE, SCHEMA, "TELCO_ASSURANCE_MCP")
+AGENT_ENDPOINT = agent_run_url(BASE_URL, DATABASE, SCHEMA, "TELCO_ASSURANCE_AGENT")
+# Agent runs can take up to the agent's 120 s budget; the session default (60 s) is for MCP calls
+AGENT_TIMEOUT = 150
 
 
-def generate_jwt(account: str, user: str, private_key, lifetime_minutes: int = 60) -> str:
-    """Generate JWT token for Snowflake key-pair authentication."""
-    account_upper = account.upper()
-    user_upper = user.upper()
-    
-    qualified_username = f"{account_upper}.{user_upper}"
-    fingerprint = get_public_key_fingerprint(private_key)
-    
-    now = datetime.utcnow()
-    payload = {
-        "iss": f"{qualified_username}.{fingerprint}",
-        "sub": qualified_username,
-        "iat": now,
-        "exp": now + timedelta(minutes=lifetime_minutes)
-    }
+def print_response(response) -> dict:
+    """Print a response and return its JSON body (or the raw text as an error)."""
+    print(f"Status: {response.status_code}")
     
-    token = jwt.encode(payload, private_key, algorithm="RS256")
-    return token
+    try:
+        result = response.json()
+        print(f"Response: {json.dumps(result, indent=2)}")
+        return result
+    except ValueError:
+        print(f"Response: {response.text}")
+        return {"error": response.text}
 
 
-def test_mcp_tools_list(token: str) -> dict:
+def test_mcp_tools_list(mcp: McpClient) -> dict:
     """Test MCP Server - List available tools."""
     print("\n" + "=" * 60)
     print("TEST: MCP Server - tools/list")
@@ -89,25 +61,10 @@ def test_mcp_tools_list(token: str) -> dict:
         "params": {}
     }
     
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-        "X-Snowflake-Authorization-Token-Type": "KEYPAIR_JWT"
-    }
-    
-    response = requests.post(MCP_ENDPOINT, headers=headers, json=payload)
-    print(f"Status: {response.status_code}")
-    
-    try:
-        result = response.json()
-        print(f"Response: {json.dumps(result, indent=2)}")
-        return result
-    except:
-        print(f"Response: {response.text}")
-        return {"error": response.text}
+    return print_response(mcp.post(payload))
 
 
-def test_mcp_sql_exec(token: str, query: str) -> dict:
+def test_mcp_sql_exec(mcp: McpClient, query: str) -> dict:
     """Test MCP Server - Execute SQL via sql_exec_tool."""
     print("\n" + "=" * 60)
     print("TEST: MCP Server - sql_exec_tool")
@@ -126,25 +83,10 @@ def test_mcp_sql_exec(token: str, query: str) -> dict:
         }
     }
     
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-        "X-Snowflake-Authorization-Token-Type": "KEYPAIR_JWT"
-    }
-    
-    response = requests.post(MCP_ENDPOINT, headers=headers, json=payload)
-    print(f"Status: {response.status_code}")
-    
-    try:
-        result = response.json()
-        print(f"Response: {json.dumps(result, indent=2)}")
-        return result
-    except:
-        print(f"Response: {response.text}")
-        return {"error": response.text}
+    return print_response(mcp.post(payload))
 
 
-def test_mcp_analyst(token: str, question: str) -> dict:
+def test_mcp_analyst(mcp: McpClient, question: str) -> dict:
     """Test MCP Server - Natural language query via analyst_tool."""
     print("\n" + "=" * 60)
     print("TEST: MCP Server - analyst_tool")
@@ -163,25 +105,10 @@ def test_mcp_analyst(token: str, question: str) -> dict:
         }
     }
     
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-        "X-Snowflake-Authorization-Token-Type": "KEYPAIR_JWT"
-    }
-    
-    response = requests.post(MCP_ENDPOINT, headers=headers, json=payload)
-    print(f"Status: {response.status_code}")
-    
-    try:
-        result = response.json()
-        print(f"Response: {json.dumps(result, indent=2)}")
-        return result
-    except:
-        print(f"Response: {response.text}")
-        return {"error": response.text}
+    return print_response(mcp.post(payload))
 
 
-def test_cortex_agent(token: str, message: str) -> dict:
+def test_cortex_agent(session, message: str) -> dict:
     """Test Cortex Agent (A2A) - Natural language conversation."""
     print("\n" + "=" * 60)
     print("TEST: Cortex Agent (A2A)")
@@ -202,22 +129,7 @@ def test_cortex_agent(token: str, message: str) -> dict:
         ]
     }
     
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-        "X-Snowflake-Authorization-Token-Type": "KEYPAIR_JWT"
-    }
-    
-    response = requests.post(AGENT_ENDPOINT, headers=headers, json=payload)
-    print(f"Status: {response.status_code}")
-    
-    try:
-        result = response.json()
-        print(f"Response: {json.dumps(result, indent=2)}")
-        return result
-    except:
-        print(f"Response: {response.text}")
-        return {"error": response.text}
+    return print_response(session.post(AGENT_ENDPOINT, json=payload, timeout=AGENT_TIMEOUT))
 
 
 def generate_rsa_keypair():
@@ -284,12 +196,16 @@ def main():
         return
     
     print(f"\nLoading private key from: {PRIVATE_KEY_PATH}")
-    private_key = load_private_key(PRIVATE_KEY_PATH)
+    tokens = TokenProvider(ACCOUNT_LOCATOR, USER, PRIVATE_KEY_PATH)
     
     print("Generating JWT token...")
-    token = generate_jwt(ACCOUNT_LOCATOR, USER, private_key)
+    token = tokens.get_token()
     print(f"JWT Token (first 50 chars): {token[:50]}...")
     
+    # One pooled session for every call below; the token is reused
+    session = create_session(tokens)
+    mcp = McpClient(session, MCP_ENDPOINT)
+    
     # ==========================================================================
     # MCP SERVER TESTS
     # ==========================================================================
@@ -297,13 +213,13 @@ def main():
     print("# MCP SERVER TESTS")
     print("#" * 60)
     
-    test_mcp_tools_list(token)
+    test_mcp_tools_list(mcp)
     
-    test_mcp_sql_exec(token, 
+    test_mcp_sql_exec(mcp, 
         "SELECT state, COUNT(*) as cnt FROM TELCO_AI_DB.NETWORK_ASSURANCE.INCIDENTS GROUP BY state"
     )
     
-    test_mcp_analyst(token, "How many open incidents are there?")
+    test_mcp_analyst(mcp, "How many open incidents are there?")
     
     # ==========================================================================
     # CORTEX AGENT (A2A) TESTS
@@ -312,11 +228,11 @@ def main():
     print("# CORTEX AGENT (A2A) TESTS")
     print("#" * 60)
     
-    test_cortex_agent(token, "What data sources do you have access to?")
+    test_cortex_agent(session, "What data sources do you have access to?")
     
-    test_cortex_agent(token, "Show me the open incidents in the network")
+    test_cortex_agent(session, "Show me the open incidents in the network")
     
-    test_cortex_agent(token, "What regions have the highest anomaly scores?")
+    test_cortex_agent(session, "What regions have the highest anomaly scores?")
     
     print("\n" + "=" * 60)
     print("TESTS COMPLETED")